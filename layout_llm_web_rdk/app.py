@@ -13,6 +13,7 @@ import uuid
 import signal
 import glob
 from operator import itemgetter
+from remote.worker_daemon import WorkerJob, is_worker_available
 
 app = Flask(__name__)
 
@@ -398,10 +399,14 @@ def cancel_process(process_id):
     if process_obj and process_obj.poll() is None:
         # 尝试终止进程
         try:
-            os.kill(process_obj.pid, signal.SIGTERM)
+            # 子进程发送SIGTERM，常驻服务中的任务则被取消
+            process_obj.terminate()
             process_info['status'] = 'terminated'
             process_info['progress'] = 0
             
+            # 常驻服务中正在运行的任务会在当前步骤结束后停止
+            if getattr(process_obj, 'cancel_pending', False):
+                return jsonify({'success': True, 'message': '已请求取消，任务将在当前步骤结束后终止'})
             return jsonify({'success': True, 'message': '进程已终止'})
         except Exception as e:
             logger.error(f"终止进程时出错: {e}")
@@ -546,13 +551,24 @@ def run_document_processing(process_id, input_file, output_capture_file):
         
         # 打开输出捕获文件
         with open(output_capture_file, 'w') as output_file:
-            # 创建子进程
-            process = subprocess.Popen(
-                ['python', os.path.join(BASE_DIR, 'remote', 'exe.py')],
-                stdout=output_file,
-                stderr=subprocess.STDOUT,
-                env=dict(os.environ, PDF_FILE_PATH=input_file)
-            )
+            process = None
+            
+            # 优先提交到常驻服务（模型已加载，省去每次启动的模型加载时间）
+            if is_worker_available():
+                try:
+                    process = WorkerJob(input_file, output_capture_file)
+                    logger.info(f"任务[{process_id}]已提交到常驻文档处理服务")
+                except Exception as e:
+                    logger.warning(f"提交到常驻服务失败，改为启动子进程: {e}")
+            
+            # 常驻服务不可用时创建子进程
+            if process is None:
+                process = subprocess.Popen(
+                    ['python', os.path.join(BASE_DIR, 'remote', 'exe.py')],
+                    stdout=output_file,
+                    stderr=subprocess.STDOUT,
+                    env=dict(os.environ, PDF_FILE_PATH=input_file)
+                )
             
             # 保存进程对象
             active_processes[process_id]['process'] = process
@@ -646,7 +662,7 @@ def run_document_processing(process_id, input_file, output_capture_file):
                             logger.info(f"已删除原始PDF文件: {input_file}")
                     except Exception as e:
                         logger.error(f"删除原始PDF文件失败: {e}")
-                else:
+                elif active_processes[process_id]['status'] != 'terminated':
                     active_processes[process_id]['status'] = 'failed'
             except subprocess.TimeoutExpired:
                 # 进程超时，尝试终止
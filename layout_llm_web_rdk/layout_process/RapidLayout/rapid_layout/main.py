@@ -4,7 +4,7 @@
 import argparse
 import time
 from pathlib import Path
-from typing import Optional, Tuple, Union
+from typing import List, Optional, Tuple, Union
 
 import cv2
 import numpy as np
@@ -23,6 +23,13 @@ from .utils import (
     get_logger,
 )
 
+# Process-wide session registry provided by layout_process
+# (absent when used standalone).
+try:
+    import onnx_sessions
+except ImportError:
+    onnx_sessions = None
+
 ROOT_DIR = Path(__file__).resolve().parent
 logger = get_logger("rapid_layout")
 
@@ -41,6 +48,11 @@ KEY_TO_MODEL_URL = {
 }
 DEFAULT_MODEL_PATH = str(ROOT_DIR / "models" / "layout_cdla.onnx")
 
+# doclayout input: square letterbox, or the page aspect ratio padded to the stride
+INPUT_MODES = ("square", "rect")
+# pages with a smaller share of dark pixels are sparse and may use fast_input_size
+SPARSE_INK_RATIO = 0.01
+
 
 class RapidLayout:
     def __init__(
@@ -51,6 +63,10 @@ class RapidLayout:
         iou_thres: float = 0.5,
         use_cuda: bool = False,
         use_dml: bool = False,
+        intra_op_num_threads: int = -1,
+        precision: str = "fp32",
+        input_mode: str = "square",
+        fast_input_size: Optional[int] = None,
     ):
         if not self.check_of(conf_thres):
             raise ValueError(f"conf_thres {conf_thres} is outside of range [0, 1]")
@@ -58,11 +74,20 @@ class RapidLayout:
         if not self.check_of(iou_thres):
             raise ValueError(f"iou_thres {conf_thres} is outside of range [0, 1]")
 
+        if input_mode not in INPUT_MODES:
+            raise ValueError(f"input_mode {input_mode} is not in {INPUT_MODES}")
+
         self.model_type = model_type
+        self.precision = precision
+        # the model file actually loaded, which may be fp32 when no int8 variant exists
+        self.model_path = self.get_precision_model_path(
+            self.get_model_path(model_type, model_path), precision
+        )
         config = {
-            "model_path": self.get_model_path(model_type, model_path),
+            "model_path": self.model_path,
             "use_cuda": use_cuda,
             "use_dml": use_dml,
+            "intra_op_num_threads": intra_op_num_threads,
         }
         self.session = OrtInferSession(config)
         labels = self.session.get_character_list()
@@ -83,8 +108,21 @@ class RapidLayout:
             img_size=self.doclayout_input_shape
         )
         self.doclayout_postprocess = DocLayoutPostProcess(labels, conf_thres, iou_thres)
+        self.input_mode = input_mode
+        self.fast_input_size = fast_input_size
+        if (input_mode != "square" or fast_input_size) and None not in (
+            self.session.get_input_shape()[2:]
+        ):
+            logger.warning(
+                "%s has a fixed input size, using the square %s input.",
+                model_type,
+                self.doclayout_input_shape,
+            )
+            self.input_mode, self.fast_input_size = "square", None
 
         self.load_img = LoadImage()
+        # reusable float32 NCHW model input, see get_input_buffer
+        self.input_buffer = None
 
         self.pp_layout_type = [k for k in KEY_TO_MODEL_URL if k.startswith("pp")]
         self.yolov8_layout_type = [
@@ -109,10 +147,163 @@ class RapidLayout:
 
         raise ValueError(f"{self.model_type} is not supported.")
 
+    def batch(
+        self,
+        img_contents: List[Union[str, np.ndarray, bytes, Path]],
+        batch_size: int = 4,
+    ) -> List[
+        Tuple[Optional[np.ndarray], Optional[np.ndarray], Optional[np.ndarray], float]
+    ]:
+        """Layout analysis of several pages with one session call per batch.
+
+        Pages are resized to their model input shape, and pages with the same
+        shape are stacked along the batch axis. A dynamic batch axis takes up
+        to batch_size pages per call, a model exported with a fixed batch size
+        takes exactly that many (the last batch is padded). Boxes are scaled
+        back to each page's own size.
+
+        Returns:
+            One (boxes, scores, class_names, elapse) tuple per page, the same as
+            __call__; elapse is the page's share of its batch time.
+        """
+        if self.model_type not in (
+            self.pp_layout_type + self.yolov8_layout_type + self.doclayout_type
+        ):
+            raise ValueError(f"{self.model_type} is not supported.")
+
+        model_batch_size = self.session.get_batch_size()
+        if model_batch_size is not None:
+            batch_size = model_batch_size
+        batch_size = max(1, batch_size)
+
+        imgs = [self.load_img(content) for content in img_contents]
+        # only pages with the same input shape can share a session call
+        groups = {}
+        for idx, img in enumerate(imgs):
+            groups.setdefault(self.get_input_shape(img), []).append(idx)
+
+        results = [None] * len(imgs)
+        for input_shape, indices in groups.items():
+            for start in range(0, len(indices), batch_size):
+                s_time = time.time()
+
+                chunk = indices[start : start + batch_size]
+                input_tensor = self.get_input_buffer(
+                    model_batch_size or len(chunk), input_shape
+                )
+                for row, idx in enumerate(chunk):
+                    self.preprocess(imgs[idx], out=input_tensor[row : row + 1])
+                # a fixed batch axis must be filled completely
+                input_tensor[len(chunk) :] = input_tensor[len(chunk) - 1]
+                outputs = self.session(input_tensor)
+
+                chunk_results = []
+                for row, idx in enumerate(chunk):
+                    page_outputs = [output[row : row + 1] for output in outputs]
+                    chunk_results.append(
+                        self.postprocess(
+                            page_outputs,
+                            imgs[idx].shape[:2],
+                            input_tensor[row : row + 1],
+                        )
+                    )
+
+                elapse = (time.time() - s_time) / len(chunk)
+                for idx, result in zip(chunk, chunk_results):
+                    results[idx] = (*result, elapse)
+        return results
+
+    def get_input_shape(self, img: Optional[np.ndarray] = None) -> Tuple[int, int]:
+        """(h, w) of the model input, for the given page when it depends on the page."""
+        if self.model_type in self.pp_layout_type:
+            return tuple(self.pp_preprocess.size)
+
+        if self.model_type in self.yolov8_layout_type:
+            # cv2.resize takes (w, h)
+            return tuple(self.yolov8_input_shape[::-1])
+
+        if img is None:
+            return tuple(self.doclayout_input_shape)
+        return self.get_doclayout_input_shape(img)
+
+    def get_doclayout_input_shape(self, img: np.ndarray) -> Tuple[int, int]:
+        """(h, w) of the doclayout input for a page.
+
+        square: doclayout_input_shape. rect: the page scaled to fit the same
+        size, with its sides rounded up to the stride instead of padded to a
+        square. With fast_input_size, sparse pages are fitted to that smaller
+        size first.
+        """
+        size = self.doclayout_input_shape
+        if self.fast_input_size and self.ink_ratio(img) < SPARSE_INK_RATIO:
+            size = (self.fast_input_size, self.fast_input_size)
+        if self.input_mode == "square":
+            return tuple(size)
+
+        stride = self.doclayout_preprocess.letterbox.stride
+        height, width = img.shape[:2]
+        r = min(size[0] / height, size[1] / width)
+        return (
+            int(np.ceil(round(height * r) / stride) * stride),
+            int(np.ceil(round(width * r) / stride) * stride),
+        )
+
+    @staticmethod
+    def ink_ratio(img: np.ndarray) -> float:
+        """Share of dark pixels, sampled on every 4th row and column."""
+        sample = np.ascontiguousarray(img[::4, ::4])
+        if sample.ndim == 3:
+            sample = cv2.cvtColor(sample, cv2.COLOR_BGR2GRAY)
+        return np.count_nonzero(sample < 128) / sample.size
+
+    def get_input_buffer(
+        self, batch_size: int = 1, input_shape: Optional[Tuple[int, int]] = None
+    ) -> np.ndarray:
+        """Float32 (batch_size, 3, h, w) input tensor reused across calls.
+
+        The preprocessors write into it directly, so a page costs no float
+        temporaries. Its contents are only valid until the next call.
+        """
+        shape = (3, *(input_shape or self.get_input_shape()))
+        if (
+            self.input_buffer is None
+            or self.input_buffer.shape[1:] != shape
+            or self.input_buffer.shape[0] < batch_size
+        ):
+            self.input_buffer = np.empty((batch_size, *shape), dtype=np.float32)
+        return self.input_buffer[:batch_size]
+
+    def preprocess(
+        self, img: np.ndarray, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        if self.model_type in self.pp_layout_type:
+            return self.pp_preprocess(img, out=out)
+
+        if self.model_type in self.yolov8_layout_type:
+            return self.yolov8_preprocess(img, out=out)
+
+        new_shape = out.shape[2:] if out is not None else self.get_input_shape(img)
+        return self.doclayout_preprocess(img, out=out, new_shape=new_shape)
+
+    def postprocess(
+        self, outputs, ori_img_shape: Tuple[int, int], input_tensor: np.ndarray
+    ):
+        if self.model_type in self.pp_layout_type:
+            return self.pp_postprocess(ori_img_shape, input_tensor, outputs)
+
+        if self.model_type in self.yolov8_layout_type:
+            return self.yolov8_postprocess(
+                outputs, ori_img_shape, self.yolov8_input_shape
+            )
+
+        return self.doclayout_postprocess(
+            outputs, ori_img_shape, input_tensor.shape[2:]
+        )
+
     def pp_layout(self, img: np.ndarray, ori_img_shape: Tuple[int, int]):
         s_time = time.time()
 
-        img = self.pp_preprocess(img)
+        img = self.pp_preprocess(img, out=self.get_input_buffer())
         preds = self.session(img)
         boxes, scores, class_names = self.pp_postprocess(ori_img_shape, img, preds)
 
@@ -122,7 +313,7 @@ class RapidLayout:
     def yolov8_layout(self, img: np.ndarray, ori_img_shape: Tuple[int, int]):
         s_time = time.time()
 
-        input_tensor = self.yolov8_preprocess(img)
+        input_tensor = self.yolov8_preprocess(img, out=self.get_input_buffer())
         outputs = self.session(input_tensor)
         boxes, scores, class_names = self.yolov8_postprocess(
             outputs, ori_img_shape, self.yolov8_input_shape
@@ -133,10 +324,12 @@ class RapidLayout:
     def doclayout_layout(self, img: np.ndarray, ori_img_shape: Tuple[int, int]):
         s_time = time.time()
 
-        input_tensor = self.doclayout_preprocess(img)
+        input_tensor = self.preprocess(
+            img, out=self.get_input_buffer(1, self.get_input_shape(img))
+        )
         outputs = self.session(input_tensor)
         boxes, scores, class_names = self.doclayout_postprocess(
-            outputs, ori_img_shape, self.doclayout_input_shape
+            outputs, ori_img_shape, input_tensor.shape[2:]
         )
         elapse = time.time() - s_time
         return boxes, scores, class_names, elapse
@@ -154,6 +347,17 @@ class RapidLayout:
         logger.info("model url is None, using the default model %s", DEFAULT_MODEL_PATH)
         return DEFAULT_MODEL_PATH
 
+    @staticmethod
+    def get_precision_model_path(model_path: Union[str, Path], precision: str) -> str:
+        if onnx_sessions is not None:
+            return onnx_sessions.resolve_model_path(model_path, precision)
+
+        if precision != "fp32":
+            logger.warning(
+                "%s models need layout_process, using the fp32 model.", precision
+            )
+        return str(model_path)
+
     @staticmethod
     def check_of(thres: float) -> bool:
         if 0 <= thres <= 1.0:
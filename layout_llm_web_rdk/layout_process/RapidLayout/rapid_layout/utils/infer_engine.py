@@ -6,7 +6,7 @@ import sys
 import traceback
 from enum import Enum
 from pathlib import Path
-from typing import Any, Dict, List, Tuple, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import numpy as np
 from onnxruntime import (
@@ -19,6 +19,13 @@ from onnxruntime import (
 
 from .logger import get_logger
 
+# Process-wide session registry provided by layout_process
+# (absent when used standalone).
+try:
+    import onnx_sessions
+except ImportError:
+    onnx_sessions = None
+
 
 class EP(Enum):
     CPU_EP = "CPUExecutionProvider"
@@ -39,12 +46,21 @@ class OrtInferSession:
         self.had_providers: List[str] = get_available_providers()
         EP_list = self._get_ep_list()
 
-        sess_opt = self._init_sess_opts(config)
-        self.session = InferenceSession(
-            model_path,
-            sess_options=sess_opt,
-            providers=EP_list,
-        )
+        if onnx_sessions is not None:
+            self.session = onnx_sessions.get_shared_session(
+                model_path,
+                EP_list,
+                config.get("session_group", "layout"),
+                config.get("intra_op_num_threads", -1),
+                config.get("inter_op_num_threads", -1),
+            )
+        else:
+            sess_opt = self._init_sess_opts(config)
+            self.session = InferenceSession(
+                model_path,
+                sess_options=sess_opt,
+                providers=EP_list,
+            )
         self._verify_providers()
 
     @staticmethod
@@ -69,6 +85,8 @@ class OrtInferSession:
         cpu_provider_opts = {
             "arena_extend_strategy": "kSameAsRequested",
         }
+        if onnx_sessions is not None:
+            cpu_provider_opts = onnx_sessions.cpu_provider_options()
         EP_list = [(EP.CPU_EP.value, cpu_provider_opts)]
 
         cuda_provider_opts = {
@@ -204,6 +222,17 @@ class OrtInferSession:
     def get_output_names(self) -> List[str]:
         return [v.name for v in self.session.get_outputs()]
 
+    def get_input_shape(self) -> List[Optional[int]]:
+        """Shape of the model input, None for dynamic axes."""
+        return [
+            dim if isinstance(dim, int) and dim > 0 else None
+            for dim in self.session.get_inputs()[0].shape
+        ]
+
+    def get_batch_size(self) -> Optional[int]:
+        """Fixed batch size of the model input, None if the batch axis is dynamic."""
+        return self.get_input_shape()[0]
+
     def get_character_list(self, key: str = "character") -> List[str]:
         meta_dict = self.session.get_modelmeta().custom_metadata_map
         return meta_dict[key].splitlines()
@@ -65,32 +65,29 @@ class PPPostProcess:
                 select_scores.append(score)
                 decode_boxes.append(decode_box)
 
-            # nms
+            # nms: every (box, class) pair above conf_thres is a candidate,
+            # all classes are suppressed in one batched pass
             bboxes = np.concatenate(decode_boxes, axis=0)
             confidences = np.concatenate(select_scores, axis=0)
-            picked_box_probs, picked_labels = [], []
-            for class_index in range(0, confidences.shape[1]):
-                probs = confidences[:, class_index]
-                mask = probs > self.conf_thres
-                probs = probs[mask]
-                if probs.shape[0] == 0:
-                    continue
-
-                subset_boxes = bboxes[mask, :]
-                box_probs = np.concatenate([subset_boxes, probs.reshape(-1, 1)], axis=1)
-                box_probs = self.hard_nms(
-                    box_probs,
-                    iou_thres=self.iou_thres,
-                    top_k=self.keep_top_k,
-                )
-                picked_box_probs.append(box_probs)
-                picked_labels.extend([class_index] * box_probs.shape[0])
+            box_ids, class_ids = np.nonzero(confidences > self.conf_thres)
+            probs = confidences[box_ids, class_ids]
+            keep = batched_nms(
+                bboxes[box_ids],
+                probs,
+                class_ids,
+                self.iou_thres,
+                top_k=self.keep_top_k,
+                candidate_size=200,
+            )
+            picked_labels = class_ids[keep].tolist()
 
-            if len(picked_box_probs) == 0:
-                out_boxes_list.append(np.empty((0, 4)))
+            if len(keep) == 0:
+                out_boxes_list.append(np.empty((0, 6)))
                 out_boxes_num.append(0)
             else:
-                picked_box_probs = np.concatenate(picked_box_probs)
+                picked_box_probs = np.concatenate(
+                    [bboxes[box_ids[keep]], probs[keep].reshape(-1, 1)], axis=1
+                )
 
                 # resize output boxes
                 picked_box_probs[:, :4] = self.warp_boxes(
@@ -193,27 +190,16 @@ class PPPostProcess:
             top_k: keep top_k results. If k <= 0, keep all the results.
             candidate_size: only consider the candidates with the highest scores.
         Returns:
-            picked: a list of indexes of the kept boxes
+            picked (K, 5): the kept boxes
         """
-        scores = box_scores[:, -1]
-        boxes = box_scores[:, :-1]
-        picked = []
-        indexes = np.argsort(scores)
-        indexes = indexes[-candidate_size:]
-        while len(indexes) > 0:
-            current = indexes[-1]
-            picked.append(current)
-            if 0 < top_k == len(picked) or len(indexes) == 1:
-                break
-            current_box = boxes[current, :]
-            indexes = indexes[:-1]
-            rest_boxes = boxes[indexes, :]
-            iou = self.iou_of(
-                rest_boxes,
-                np.expand_dims(current_box, axis=0),
-            )
-            indexes = indexes[iou <= iou_thres]
-
+        picked = batched_nms(
+            box_scores[:, :-1],
+            box_scores[:, -1],
+            None,
+            iou_thres,
+            top_k=top_k,
+            candidate_size=candidate_size,
+        )
         return box_scores[picked, :]
 
     def iou_of(self, boxes0, boxes1, eps=1e-5):
@@ -251,6 +237,8 @@ class YOLOv8PostProcess:
         self.labels = labels
         self.conf_threshold = conf_thres
         self.iou_threshold = iou_thres
+        # top-k pre-filter per class before NMS
+        self.nms_top_k = 3000
         self.input_width, self.input_height = None, None
         self.img_width, self.img_height = None, None
 
@@ -277,8 +265,9 @@ class YOLOv8PostProcess:
         boxes = self.extract_boxes(predictions)
 
         # Apply non-maxima suppression to suppress weak, overlapping bounding boxes
-        # indices = nms(boxes, scores, self.iou_threshold)
-        indices = multiclass_nms(boxes, scores, class_ids, self.iou_threshold)
+        indices = batched_nms(
+            boxes, scores, class_ids, self.iou_threshold, candidate_size=self.nms_top_k
+        )
 
         labels = [self.labels[i] for i in class_ids[indices]]
         return boxes[indices], scores[indices], labels
@@ -320,6 +309,12 @@ class DocLayoutPostProcess:
         boxes = preds[:, :4]
         confidences = preds[:, 4]
         class_ids = preds[:, 5].astype(int)
+
+        # The NMS-free head can still emit near-duplicate boxes of the same class
+        indices = batched_nms(boxes, confidences, class_ids, self.iou_threshold)
+        boxes, confidences = boxes[indices], confidences[indices]
+        class_ids = class_ids[indices]
+
         labels = [self.labels[i] for i in class_ids]
         return boxes, confidences, labels
 
@@ -380,41 +375,180 @@ def clip_boxes(boxes, shape):
     return boxes
 
 
-def nms(boxes, scores, iou_threshold):
-    # Sort by score
-    sorted_indices = np.argsort(scores)[::-1]
+def batched_nms(
+    boxes,
+    scores,
+    class_ids,
+    iou_threshold,
+    top_k=-1,
+    candidate_size=-1,
+    block_size=512,
+):
+    """Per-class hard NMS over all classes in a single score-ordered pass.
 
-    keep_boxes = []
-    while sorted_indices.size > 0:
-        # Pick the last box
-        box_id = sorted_indices[0]
-        keep_boxes.append(box_id)
+    Candidates are keyed by class_id * (coordinate range + 1) + x, so sorting
+    along that key finds the same-class pairs that can overlap without a loop
+    over classes. Candidates are taken in blocks of descending score: IoU is
+    computed for all candidate pairs inside a block at once, a greedy pass keeps
+    the unsuppressed boxes, and the kept boxes then remove every lower-scored
+    box they suppress before the next block is processed.
 
-        # Compute IoU of the picked box with the rest
-        ious = compute_iou(boxes[box_id, :], boxes[sorted_indices[1:], :])
+    Args:
+        boxes (N, 4): boxes in corner-form.
+        scores (N): confidences.
+        class_ids (N): class of each box, None for class-agnostic NMS.
+        iou_threshold: boxes with IoU >= iou_threshold against a kept box are
+            removed.
+        top_k: keep at most top_k boxes per class. If k <= 0, keep all the
+            results.
+        candidate_size: only consider the candidate_size highest-scoring boxes
+            per class. If <= 0, consider all boxes.
+        block_size: number of candidates compared pairwise at a time.
+    Returns:
+        keep (K): indexes of the kept boxes, grouped by class id and sorted by
+            descending score within each class.
+    """
+    boxes = np.asarray(boxes).reshape(-1, 4)
+    if not np.issubdtype(boxes.dtype, np.floating):
+        boxes = boxes.astype(np.float32)
+    scores = np.asarray(scores).reshape(-1)
+    if class_ids is None:
+        class_ids = np.zeros(len(scores), dtype=np.int64)
+    class_ids = np.asarray(class_ids).astype(np.int64).reshape(-1)
+    if len(scores) == 0:
+        return np.empty(0, dtype=np.int64)
+
+    # sort by class, then by descending score
+    order = np.lexsort((-scores, class_ids))
+    if candidate_size > 0:
+        order = order[_rank_in_class(class_ids[order]) < candidate_size]
+    # the greedy pass runs in global score order
+    order = order[np.argsort(-scores[order], kind="stable")]
+    cand_boxes = boxes[order]
+    sweep = _SweepKeys(cand_boxes, class_ids[order], iou_threshold)
+
+    keep = []
+    alive = np.arange(len(order))
+    while len(alive):
+        block, alive = alive[:block_size], alive[block_size:]
+        block_keep = block[_greedy_keep(cand_boxes, sweep, block, iou_threshold)]
+        keep.append(block_keep)
+        if len(alive) == 0:
+            break
+        # remove the remaining candidates suppressed by this block
+        kept_pos, alive_pos = sweep.pairs(block_keep, alive)
+        alive_pos2, kept_pos2 = sweep.pairs(alive, block_keep)
+        kept_pos = np.concatenate([kept_pos, kept_pos2])
+        alive_pos = np.concatenate([alive_pos, alive_pos2])
+        iou = _pair_iou(cand_boxes, block_keep[kept_pos], alive[alive_pos])
+        suppressed = np.zeros(len(alive), dtype=bool)
+        suppressed[alive_pos[iou >= iou_threshold]] = True
+        alive = alive[~suppressed]
+
+    keep = order[np.concatenate(keep)]
+    # regroup by class
+    keep = keep[np.lexsort((-scores[keep], class_ids[keep]))]
+    if top_k > 0:
+        keep = keep[_rank_in_class(class_ids[keep]) < top_k]
+    return keep
+
+
+def _rank_in_class(sorted_class_ids):
+    """Position of each element within its run of equal class ids."""
+    starts = np.r_[0, np.flatnonzero(np.diff(sorted_class_ids)) + 1]
+    run_lengths = np.diff(np.r_[starts, len(sorted_class_ids)])
+    return np.arange(len(sorted_class_ids)) - np.repeat(starts, run_lengths)
+
+
+class _SweepKeys:
+    """Sort keys for finding same-class box pairs that can reach an IoU threshold.
+
+    IoU >= t needs the intersection to cover at least t of each box's width and
+    height, so box j must start before x2_i - t * w_i and the pair must overlap
+    vertically by at least t * max(h_i, h_j). The bound is loosened slightly so
+    that rounding never drops a pair.
+    """
 
-        # Remove boxes with IoU over the threshold
-        keep_indices = np.where(ious < iou_threshold)[0]
+    def __init__(self, boxes, class_ids, iou_threshold):
+        ratio = max(iou_threshold, 0) * (1 - 1e-4)
+        x1 = boxes[:, 0].astype(np.float64)
+        x2 = boxes[:, 2].astype(np.float64)
+        offset = float(boxes.max()) - float(boxes.min()) + 1
+        self.x_start = class_ids * offset + x1
+        self.x_end = class_ids * offset + x2 - ratio * (x2 - x1)
+        self.y1 = boxes[:, 1]
+        self.y2 = boxes[:, 3]
+        self.min_overlap = ratio * (self.y2 - self.y1)
+
+    def pairs(self, ids_a, ids_b):
+        """Positions (p, q) such that box ids_b[q] starts within reach of ids_a[p]."""
+        sorted_b = np.argsort(self.x_start[ids_b], kind="stable")
+        start_b = self.x_start[ids_b][sorted_b]
+        lo = np.searchsorted(start_b, self.x_start[ids_a], side="left")
+        hi = np.searchsorted(start_b, self.x_end[ids_a], side="right")
+        counts = np.maximum(hi - lo, 0)
+
+        total = counts.sum()
+        pos_a = np.repeat(np.arange(len(ids_a)), counts)
+        # offset of each pair's position from its run in sorted_b
+        offsets = np.repeat(lo - (np.cumsum(counts) - counts), counts)
+        pos_b = sorted_b[np.arange(total) + offsets]
+
+        first, second = ids_a[pos_a], ids_b[pos_b]
+        top = np.maximum(self.y1[first], self.y1[second])
+        overlap_h = np.minimum(self.y2[first], self.y2[second]) - top
+        mask = overlap_h >= np.maximum(
+            self.min_overlap[first], self.min_overlap[second]
+        )
+        return pos_a[mask], pos_b[mask]
+
+
+def _greedy_keep(boxes, sweep, block, iou_threshold):
+    """Hard NMS inside one score-ordered block, returns kept positions."""
+    first, second = sweep.pairs(block, block)
+    mask = first != second
+    first, second = first[mask], second[mask]
+    iou = _pair_iou(boxes, block[first], block[second])
+    mask = iou >= iou_threshold
+    # suppression edges from the higher-scored box to the lower-scored one
+    src = np.minimum(first, second)[mask]
+    dst = np.maximum(first, second)[mask]
+    edge_order = np.argsort(src, kind="stable")
+    src, dst = src[edge_order], dst[edge_order]
+    starts = np.searchsorted(src, np.arange(len(block) + 1)).tolist()
+
+    suppressed = np.zeros(len(block), dtype=bool)
+    keep = []
+    for i in range(len(block)):
+        if suppressed[i]:
+            continue
+        keep.append(i)
+        if starts[i] < starts[i + 1]:
+            suppressed[dst[starts[i] : starts[i + 1]]] = True
+    return np.asarray(keep, dtype=np.int64)
+
+
+def _pair_iou(boxes, first, second):
+    """IoU between boxes[first] and boxes[second], pair by pair."""
+    boxes0, boxes1 = boxes[first], boxes[second]
+    xmin = np.maximum(boxes0[:, 0], boxes1[:, 0])
+    ymin = np.maximum(boxes0[:, 1], boxes1[:, 1])
+    xmax = np.minimum(boxes0[:, 2], boxes1[:, 2])
+    ymax = np.minimum(boxes0[:, 3], boxes1[:, 3])
+    intersection = np.maximum(0, xmax - xmin) * np.maximum(0, ymax - ymin)
+    area0 = (boxes0[:, 2] - boxes0[:, 0]) * (boxes0[:, 3] - boxes0[:, 1])
+    area1 = (boxes1[:, 2] - boxes1[:, 0]) * (boxes1[:, 3] - boxes1[:, 1])
+    # boxes clipped to zero area give 0 / 0, which never suppresses
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return intersection / (area0 + area1 - intersection)
 
-        # print(keep_indices.shape, sorted_indices.shape)
-        sorted_indices = sorted_indices[keep_indices + 1]
 
-    return keep_boxes
+def nms(boxes, scores, iou_threshold):
+    return batched_nms(boxes, scores, None, iou_threshold).tolist()
 
 
 def multiclass_nms(boxes, scores, class_ids, iou_threshold):
-    unique_class_ids = np.unique(class_ids)
-
-    keep_boxes = []
-    for class_id in unique_class_ids:
-        class_indices = np.where(class_ids == class_id)[0]
-        class_boxes = boxes[class_indices, :]
-        class_scores = scores[class_indices]
-
-        class_keep_boxes = nms(class_boxes, class_scores, iou_threshold)
-        keep_boxes.extend(class_indices[class_keep_boxes])
-
-    return keep_boxes
+    return batched_nms(boxes, scores, class_ids, iou_threshold).tolist()
 
 
 def compute_iou(box, boxes):
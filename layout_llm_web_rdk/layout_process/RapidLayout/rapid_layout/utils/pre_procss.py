@@ -18,16 +18,24 @@ class PPPreProcess:
         self.mean = np.array([0.485, 0.456, 0.406])
         self.std = np.array([0.229, 0.224, 0.225])
         self.scale = 1 / 255.0
-
-    def __call__(self, img: Optional[np.ndarray] = None) -> np.ndarray:
+        # normalized value of every uint8 level per channel, (3, 256)
+        self.lut = np.ascontiguousarray(
+            self.normalize(np.arange(256, dtype=np.uint8)[:, None]).astype(np.float32).T
+        )
+
+    def __call__(
+        self, img: Optional[np.ndarray] = None, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Resize and normalize into out (1, 3, H, W) float32, allocated when None."""
         if img is None:
             raise ValueError("img is None.")
 
         img = self.resize(img)
-        img = self.normalize(img)
-        img = self.permute(img)
-        img = np.expand_dims(img, axis=0)
-        return img.astype(np.float32)
+        if out is None:
+            out = np.empty((1, 3, *img.shape[:2]), dtype=np.float32)
+        for c in range(3):
+            cv2.LUT(img[..., c], self.lut[c], dst=out[0, c])
+        return out
 
     def resize(self, img: np.ndarray) -> np.ndarray:
         resize_h, resize_w = self.size
@@ -41,16 +49,32 @@ class PPPreProcess:
         return img.transpose((2, 0, 1))
 
 
+# uint8 level -> level / 255 as float32, same rounding as (img / 255).astype(np.float32)
+UNIT_SCALE_LUT = (np.arange(256) / 255).astype(np.float32)
+
+
+def scale_to_unit(img: np.ndarray, out: np.ndarray, channels=(0, 1, 2)):
+    """Write img[..., channels[c]] / 255 into out[c] for each c, no temporaries."""
+    for c, src_c in enumerate(channels):
+        cv2.LUT(img[..., src_c], UNIT_SCALE_LUT, dst=out[c])
+
+
 class YOLOv8PreProcess:
     def __init__(self, img_size: Tuple[int, int]):
         self.img_size = img_size
 
-    def __call__(self, image: np.ndarray) -> np.ndarray:
+    def __call__(
+        self, image: np.ndarray, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Resize and scale to [0, 1] into out (1, 3, H, W) float32.
+
+        out is allocated when None.
+        """
         input_img = cv2.resize(image, self.img_size)
-        input_img = input_img / 255.0
-        input_img = input_img.transpose(2, 0, 1)
-        input_tensor = input_img[np.newaxis, :, :, :].astype(np.float32)
-        return input_tensor
+        if out is None:
+            out = np.empty((1, 3, *input_img.shape[:2]), dtype=np.float32)
+        scale_to_unit(input_img, out[0])
+        return out
 
 
 class DocLayoutPreProcess:
@@ -58,11 +82,38 @@ class DocLayoutPreProcess:
         self.img_size = img_size
         self.letterbox = LetterBox(new_shape=img_size, auto=False, stride=32)
 
-    def __call__(self, image: np.ndarray) -> np.ndarray:
-        input_img = self.letterbox(image=image)
-        input_img = input_img[None, ...]
-        input_img = input_img[..., ::-1].transpose(0, 3, 1, 2)
-        input_img = np.ascontiguousarray(input_img)
-        input_img = input_img / 255
-        input_tensor = input_img.astype(np.float32)
-        return input_tensor
+    def __call__(
+        self,
+        image: np.ndarray,
+        out: Optional[np.ndarray] = None,
+        new_shape: Optional[Tuple[int, int]] = None,
+    ) -> np.ndarray:
+        """Letterbox, BGR -> RGB and scale to [0, 1] into out (1, 3, H, W) float32.
+
+        out is allocated when None. The resized page is written straight into
+        the inner region of out and only the border is filled, so no padded
+        uint8 image is built. new_shape overrides img_size, e.g. for a
+        rectangular input.
+        """
+        _, new_unpad, (top, bottom, left, right), _, _ = self.letterbox.get_params(
+            image.shape[:2], new_shape
+        )
+        height, width = new_unpad[1] + top + bottom, new_unpad[0] + left + right
+        if out is None:
+            out = np.empty((1, 3, height, width), dtype=np.float32)
+
+        if image.shape[:2][::-1] != new_unpad:
+            image = cv2.resize(image, new_unpad, interpolation=cv2.INTER_LINEAR)
+
+        border = UNIT_SCALE_LUT[114]
+        out[0, :, :top] = border
+        out[0, :, height - bottom :] = border
+        out[0, :, top : height - bottom, :left] = border
+        out[0, :, top : height - bottom, width - right :] = border
+        # channels reversed: BGR -> RGB
+        scale_to_unit(
+            image,
+            out[0, :, top : height - bottom, left : width - right],
+            channels=(2, 1, 0),
+        )
+        return out
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CTC解码微基准
+用模拟的识别模型输出对比CTCLabelDecode逐行解码（decode）与向量化解码（decode_batch）的结果与耗时
+
+用法:
+    python benchmark_ctc_decode.py
+    python benchmark_ctc_decode.py --batch-size 24 --seq-len 160 --repeat 200
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+# ppocr内部模块使用顶层导入
+OCR_DIR = Path(__file__).resolve().parent / "ppocr"
+if str(OCR_DIR) not in sys.path:
+    sys.path.append(str(OCR_DIR))
+
+from ocr_conf import OCRConfig
+from process.postprocess_rec import CTCLabelDecode
+
+
+def simulate_preds(batch_size, seq_len, num_classes, rng, blank_ratio=0.6):
+    """生成模拟的softmax输出：大部分时间步为blank，字符随机重复出现"""
+    labels = rng.integers(1, num_classes, size=(batch_size, seq_len))
+    labels[rng.random((batch_size, seq_len)) < blank_ratio] = 0
+    # 随机重复上一时间步的标签，模拟CTC的连续重复
+    repeat = rng.random((batch_size, seq_len)) < 0.3
+    repeat[:, 0] = False
+    labels[:, 1:] = np.where(repeat[:, 1:], labels[:, :-1], labels[:, 1:])
+
+    preds = rng.random((batch_size, seq_len, num_classes), dtype=np.float32) * 0.01
+    np.put_along_axis(preds, labels[:, :, np.newaxis], rng.uniform(0.5, 1.0, (batch_size, seq_len, 1)).astype(np.float32), axis=2)
+    return preds
+
+
+def time_decode(func, preds_idx, preds_prob, repeat):
+    start_time = time.perf_counter()
+    for _ in range(repeat):
+        result = func(preds_idx, preds_prob, is_remove_duplicate=True)
+    return result, (time.perf_counter() - start_time) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CTC解码微基准")
+    parser.add_argument("--batch-size", type=int, default=24, help="批大小（默认：24）")
+    parser.add_argument("--seq-len", type=int, default=80, help="时间步数，输入宽度/8（默认：80）")
+    parser.add_argument("--repeat", type=int, default=100, help="重复次数（默认：100）")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子（默认：0）")
+    args = parser.parse_args()
+
+    conf = OCRConfig()
+    decoder = CTCLabelDecode(
+        character_dict_path=str(OCR_DIR / conf.rec_char_dict_path),
+        use_space_char=conf.use_space_char
+    )
+
+    rng = np.random.default_rng(args.seed)
+    preds = simulate_preds(args.batch_size, args.seq_len, len(decoder.character), rng)
+    preds_idx = preds.argmax(axis=2)
+    preds_prob = preds.max(axis=2)
+
+    loop_result, loop_time = time_decode(decoder.decode, preds_idx, preds_prob, args.repeat)
+    batch_result, batch_time = time_decode(decoder.decode_batch, preds_idx, preds_prob, args.repeat)
+
+    text_mismatches = sum(a[0] != b[0] for a, b in zip(loop_result, batch_result))
+    max_conf_diff = max(abs(a[1] - b[1]) for a, b in zip(loop_result, batch_result))
+
+    print(f"批大小: {args.batch_size}, 时间步数: {args.seq_len}, 字符数: {len(decoder.character)}")
+    print(f"逐行解码: {loop_time * 1000:.3f}毫秒/批")
+    print(f"向量化解码: {batch_time * 1000:.3f}毫秒/批, 加速比 {loop_time / batch_time:.2f}x")
+    print(f"文本不一致的行数: {text_mismatches}, 置信度最大误差: {max_conf_diff:.2e}")
+
+    if text_mismatches == 0 and max_conf_diff <= 1e-6:
+        print("✅ 结果一致")
+        return 0
+    print("❌ 结果不一致")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
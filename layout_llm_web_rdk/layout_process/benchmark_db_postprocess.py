@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DB后处理基准
+在合成的检测概率图上对比DBPostProcess各配置的文本行召回率与每页耗时：
+    loop:    逐轮廓实现（shapely/pyclipper）
+    fast:    向量化的quad实现
+    stages:  fast + 分数容差 + 低阈值补检 + 同行文本框合并
+
+合成页面包含三类文本行：正常文本行、断成多个词块的文本行、低置信度的浅色文本行
+
+用法:
+    python benchmark_db_postprocess.py
+    python benchmark_db_postprocess.py --pages 20 --lines 120
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+# ppocr内部模块使用顶层导入
+current_dir = Path(__file__).resolve().parent
+OCR_DIR = current_dir / "ppocr"
+for path in (current_dir, OCR_DIR):
+    if str(path) not in sys.path:
+        sys.path.append(str(path))
+
+from benchmark_precision import match_boxes, points_to_box
+from process.postprocess_db import DBPostProcess
+
+# 与OCRConfig默认值一致
+DB_PARAMS = {"thresh": 0.3, "box_thresh": 0.3, "unclip_ratio": 1.8}
+
+VARIANTS = {
+    "loop": dict(DB_PARAMS, fast_quad=False),
+    "fast": dict(DB_PARAMS),
+    "stages": dict(DB_PARAMS, box_score_thres_delta=0.05, merge_lines=True,
+                   detect_missing=True, missing_thresh=0.2, missing_box_thresh=0.2),
+}
+
+
+def synthesize_page(rng, height, width, num_lines, ratio=2.0):
+    """
+    生成一页合成的检测概率图
+
+    Returns:
+        (pred, gt_boxes): 概率图 (H, W) 与目标图像坐标下的文本行框 [x1, y1, x2, y2]
+    """
+    pred = rng.random((height, width), dtype=np.float32) * 0.1
+    gt_boxes = []
+    line_height = 10
+    rows = np.arange(8, height - line_height - 8, line_height * 2)
+    for y in rng.choice(rows, size=min(num_lines, len(rows)), replace=False):
+        x1 = int(rng.integers(4, width // 3))
+        x2 = int(rng.integers(width // 2, width - 4))
+        kind = rng.choice(["normal", "fragmented", "faint"], p=[0.6, 0.25, 0.15])
+        if kind == "faint":
+            # 整行低于二值化阈值
+            pred[y:y + line_height, x1:x2] = rng.uniform(0.23, 0.28) + rng.uniform(-0.01, 0.01, (line_height, x2 - x1))
+        else:
+            pred[y:y + line_height, x1:x2] = rng.uniform(0.6, 0.95)
+            if kind == "fragmented":
+                # 词间空隙低于二值化阈值，单个文本行被切成多个连通域
+                for gap in rng.integers(x1 + 10, x2 - 10, size=4):
+                    pred[y:y + line_height, gap:gap + 3] = 0.05
+
+        # DB模型输出的是收缩后的文本区域，真实文本行约为概率图区域unclip后的大小
+        pad = line_height * 0.6
+        gt_boxes.append([(x1 - pad) * ratio, (y - pad) * ratio,
+                         (x2 + pad) * ratio, (y + line_height + pad) * ratio])
+    return pred, gt_boxes
+
+
+def run_variant(post_process, pred, dest_width, dest_height):
+    shape_list = np.array([[dest_height, dest_width, 1.0, 1.0]])
+    start_time = time.perf_counter()
+    result = post_process({"maps": pred[np.newaxis, np.newaxis]}, shape_list)
+    return result[0]["points"], time.perf_counter() - start_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DB后处理基准")
+    parser.add_argument("--pages", type=int, default=10, help="合成页面数（默认：10）")
+    parser.add_argument("--lines", type=int, default=80, help="每页文本行数（默认：80）")
+    parser.add_argument("--height", type=int, default=1280, help="概率图高度（默认：1280）")
+    parser.add_argument("--width", type=int, default=960, help="概率图宽度（默认：960）")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子（默认：0）")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    dest_width, dest_height = args.width * 2, args.height * 2
+    post_processes = {name: DBPostProcess(**params) for name, params in VARIANTS.items()}
+    stats = {name: {"matched": 0, "detected": 0, "time": 0.0} for name in VARIANTS}
+
+    num_gt = 0
+    for _ in range(args.pages):
+        pred, gt_boxes = synthesize_page(rng, args.height, args.width, args.lines)
+        num_gt += len(gt_boxes)
+        for name, post_process in post_processes.items():
+            boxes, elapsed = run_variant(post_process, pred, dest_width, dest_height)
+            matches = match_boxes(gt_boxes, [points_to_box(box) for box in boxes])
+            stats[name]["matched"] += len(matches)
+            stats[name]["detected"] += len(boxes)
+            stats[name]["time"] += elapsed
+
+    print(f"页面数: {args.pages}, 文本行数: {num_gt}, 概率图尺寸: {args.width}x{args.height}")
+    for name, stat in stats.items():
+        precision = stat["matched"] / stat["detected"] if stat["detected"] else 0.0
+        print(f"{name:>7}: 召回率 {stat['matched'] / num_gt:.2%}, 精确率 {precision:.2%}, "
+              f"{stat['time'] / args.pages * 1000:.2f}毫秒/页")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+版面分析NMS微基准
+在模拟的密集页面候选框上对比逐类别、逐保留框循环的NMS（原实现）与batched_nms的结果与耗时：
+    yolov8: multiclass_nms（每个候选框一个类别）
+    pp:     PPPostProcess（每个 (框, 类别) 组合一个候选，每类先取前200个候选、最多保留100个）
+
+用法:
+    python benchmark_layout_nms.py
+    python benchmark_layout_nms.py --objects 300 --candidates 30 --repeat 20
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+# 添加模块路径
+current_dir = Path(__file__).resolve().parent
+if str(current_dir) not in sys.path:
+    sys.path.append(str(current_dir))
+
+from RapidLayout.rapid_layout.utils.post_prepross import batched_nms, compute_iou
+
+
+def reference_nms(boxes, scores, iou_threshold, top_k=-1, candidate_size=-1):
+    """原实现：每保留一个框，与剩余的全部候选框计算一次IoU"""
+    sorted_indices = np.argsort(scores)[::-1]
+    if candidate_size > 0:
+        sorted_indices = sorted_indices[:candidate_size]
+
+    keep_boxes = []
+    while sorted_indices.size > 0:
+        box_id = sorted_indices[0]
+        keep_boxes.append(box_id)
+        if 0 < top_k == len(keep_boxes):
+            break
+        ious = compute_iou(boxes[box_id, :], boxes[sorted_indices[1:], :])
+        sorted_indices = sorted_indices[np.where(ious < iou_threshold)[0] + 1]
+    return keep_boxes
+
+
+def reference_multiclass_nms(boxes, scores, class_ids, iou_threshold, top_k=-1, candidate_size=-1):
+    """原实现：按类别循环调用reference_nms"""
+    keep_boxes = []
+    for class_id in np.unique(class_ids):
+        class_indices = np.where(class_ids == class_id)[0]
+        class_keep_boxes = reference_nms(boxes[class_indices], scores[class_indices],
+                                         iou_threshold, top_k, candidate_size)
+        keep_boxes.extend(class_indices[class_keep_boxes])
+    return keep_boxes
+
+
+def simulate_candidates(rng, num_objects, num_candidates, num_classes, page_size=1024):
+    """每个目标周围生成num_candidates个抖动的候选框，模拟检测头在密集页面上的输出"""
+    centers = rng.uniform(0, page_size, (num_objects, 2))
+    sizes = rng.uniform(20, 300, (num_objects, 2))
+    classes = rng.integers(0, num_classes, num_objects)
+
+    jitter = rng.normal(0, 0.08, (num_objects, num_candidates, 4))
+    ctr = centers[:, None, :] + jitter[..., :2] * sizes[:, None, :]
+    wh = sizes[:, None, :] * np.exp(jitter[..., 2:])
+    boxes = np.concatenate([ctr - wh / 2, ctr + wh / 2], axis=-1).reshape(-1, 4).astype(np.float32)
+    scores = rng.uniform(0.2, 1.0, num_objects * num_candidates).astype(np.float32)
+    class_ids = np.repeat(classes, num_candidates)
+    return boxes, scores, class_ids
+
+
+def timed(func, repeat):
+    start_time = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return result, (time.perf_counter() - start_time) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="版面分析NMS微基准")
+    parser.add_argument("--objects", type=int, default=200, help="每页目标数（默认：200）")
+    parser.add_argument("--candidates", type=int, default=20, help="每个目标的候选框数（默认：20）")
+    parser.add_argument("--classes", type=int, default=10, help="类别数（默认：10）")
+    parser.add_argument("--iou", type=float, default=0.5, help="IoU阈值（默认：0.5）")
+    parser.add_argument("--repeat", type=int, default=10, help="重复次数（默认：10）")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子（默认：0）")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    boxes, scores, class_ids = simulate_candidates(rng, args.objects, args.candidates, args.classes)
+    print(f"候选框数: {len(boxes)}, 类别数: {args.classes}")
+
+    settings = {
+        "yolov8": {},
+        "pp": {"top_k": 100, "candidate_size": 200},
+    }
+    consistent = True
+    for name, kwargs in settings.items():
+        ref_keep, ref_time = timed(
+            lambda: reference_multiclass_nms(boxes, scores, class_ids, args.iou, **kwargs), args.repeat)
+        keep, batched_time = timed(
+            lambda: batched_nms(boxes, scores, class_ids, args.iou, **kwargs), args.repeat)
+
+        same = sorted(ref_keep) == sorted(keep.tolist())
+        consistent &= same
+        print(f"{name:>6}: 保留 {len(keep)} 个框, 原实现 {ref_time * 1000:.2f}毫秒, "
+              f"batched_nms {batched_time * 1000:.2f}毫秒, 加速比 {ref_time / batched_time:.2f}x, "
+              f"结果{'一致' if same else '不一致'}")
+
+    if consistent:
+        print("✅ 结果一致")
+        return 0
+    print("❌ 结果不一致")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
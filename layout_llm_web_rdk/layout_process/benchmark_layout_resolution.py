@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+版面分析输入尺寸基准
+在固定的本地语料上分别运行以下输入模式，报告每页耗时、平均输入像素数，
+以及各模式相对square基线的召回率、精确率与匹配框平均IoU：
+    square:     正方形输入（基线）
+    rect:       按页面宽高比的矩形输入
+    rect_fast:  rect + 稀疏页面低分辨率输入
+
+用法:
+    python benchmark_layout_resolution.py --corpus /path/to/corpus
+    python benchmark_layout_resolution.py --corpus /path/to/corpus --fast-size 640 -o layout_resolution.json
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+# 添加模块路径
+current_dir = Path(__file__).resolve().parent
+if str(current_dir) not in sys.path:
+    sys.path.append(str(current_dir))
+
+from quantize_models import iter_corpus_pages
+from benchmark_precision import box_iou, match_boxes
+
+
+def mode_settings(fast_size):
+    """各输入模式的LayoutAnalyzer参数"""
+    return {
+        "square": {},
+        "rect": {"input_mode": "rect"},
+        "rect_fast": {"input_mode": "rect", "fast_input_size": fast_size},
+    }
+
+
+def compare_blocks(ref_blocks, test_blocks):
+    """
+    按类别与IoU匹配同一页面的版面块
+
+    Returns:
+        (matched, ious): 匹配数与匹配框的IoU列表
+    """
+    ref_boxes = [block.box.tolist() for block in ref_blocks]
+    test_boxes = [block.box.tolist() for block in test_blocks]
+    matches = match_boxes(
+        ref_boxes,
+        test_boxes,
+        [block.class_name for block in ref_blocks],
+        [block.class_name for block in test_blocks],
+    )
+    return len(matches), [box_iou(ref_boxes[i], test_boxes[j]) for i, j in matches]
+
+
+def run_benchmark(corpus_dir, dpi=200, max_pages=None, fast_size=640, intra_op_num_threads=-1):
+    """
+    运行基准测试
+
+    Returns:
+        dict: 各模式的页面数、每页耗时、平均输入像素数与相对square的一致性
+    """
+    from layout_analyzer.layout_analyzer import LayoutAnalyzer
+
+    analyzers = {
+        mode: LayoutAnalyzer(intra_op_num_threads=intra_op_num_threads, **kwargs)
+        for mode, kwargs in mode_settings(fast_size).items()
+    }
+    stats = {
+        mode: {"latency": [], "input_pixels": [], "ref_boxes": 0, "test_boxes": 0, "matched": 0, "ious": []}
+        for mode in analyzers
+    }
+
+    for page_idx, (page_name, img) in enumerate(iter_corpus_pages(corpus_dir, dpi=dpi, max_pages=max_pages)):
+        print(f"处理页面: {page_name}")
+        results = {}
+        for mode, analyzer in analyzers.items():
+            start_time = time.perf_counter()
+            results[mode] = analyzer.analyze_page(img, page_idx).blocks
+            stats[mode]["latency"].append(time.perf_counter() - start_time)
+            input_shape = analyzer.layout_engine.get_input_shape(img)
+            stats[mode]["input_pixels"].append(input_shape[0] * input_shape[1])
+
+        for mode in analyzers:
+            matched, ious = compare_blocks(results["square"], results[mode])
+            stats[mode]["ref_boxes"] += len(results["square"])
+            stats[mode]["test_boxes"] += len(results[mode])
+            stats[mode]["matched"] += matched
+            stats[mode]["ious"].extend(ious)
+
+    report = {}
+    baseline_latency = float(np.mean(stats["square"]["latency"])) if stats["square"]["latency"] else 0.0
+    for mode, stat in stats.items():
+        latency = float(np.mean(stat["latency"])) if stat["latency"] else 0.0
+        report[mode] = {
+            "pages": len(stat["latency"]),
+            "sec_per_page": latency,
+            "speedup": baseline_latency / latency if latency else 0.0,
+            "mean_input_pixels": float(np.mean(stat["input_pixels"])) if stat["input_pixels"] else 0.0,
+            "recall": stat["matched"] / stat["ref_boxes"] if stat["ref_boxes"] else 1.0,
+            "precision": stat["matched"] / stat["test_boxes"] if stat["test_boxes"] else 1.0,
+            "mean_iou": float(np.mean(stat["ious"])) if stat["ious"] else 1.0,
+        }
+    return report
+
+
+def print_report(report):
+    print("\n" + "=" * 60)
+    print("版面分析输入尺寸对比（以square为基线）")
+    print("=" * 60)
+    for mode, result in report.items():
+        print(f"{mode}（{result['pages']} 页）:")
+        print(f"  每页耗时: {result['sec_per_page']:.3f}秒, 加速比 {result['speedup']:.2f}x, "
+              f"平均输入像素 {result['mean_input_pixels'] / 1e6:.2f}M")
+        print(f"  召回率: {result['recall']:.2%}, 精确率: {result['precision']:.2%}, "
+              f"匹配框平均IoU: {result['mean_iou']:.3f}")
+    print("=" * 60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="版面分析输入尺寸基准")
+    parser.add_argument("--corpus", required=True, help="基准语料目录（PDF或图片）")
+    parser.add_argument("--dpi", type=int, default=200, help="PDF渲染分辨率（默认：200）")
+    parser.add_argument("--max-pages", type=int, help="最多测试的页面数")
+    parser.add_argument("--fast-size", type=int, default=640, help="稀疏页面的低分辨率输入边长（默认：640）")
+    parser.add_argument("--threads", type=int, default=-1, help="ONNX Runtime算子内线程数（默认：-1）")
+    parser.add_argument("-o", "--output", help="将结果保存为JSON文件")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.corpus, args.dpi, args.max_pages, args.fast_size, args.threads)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"结果已保存: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
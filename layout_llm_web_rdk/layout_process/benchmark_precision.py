@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+INT8量化模型的速度与精度基准
+在固定的本地语料上分别运行fp32与int8的OCR和版面分析，报告每页耗时，
+以及int8结果相对fp32基线的字符级一致率和框级一致率
+
+用法:
+    python benchmark_precision.py --corpus /path/to/corpus
+    python benchmark_precision.py --corpus /path/to/corpus --max-pages 20 -o benchmark.json
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+# 添加模块路径
+current_dir = Path(__file__).resolve().parent
+if str(current_dir) not in sys.path:
+    sys.path.append(str(current_dir))
+
+from quantize_models import iter_corpus_pages
+
+# 判定两个框为同一目标的IoU阈值
+MATCH_IOU = 0.5
+
+
+def box_iou(box_a, box_b):
+    """计算两个 [x1, y1, x2, y2] 框的IoU"""
+    x1 = max(box_a[0], box_b[0])
+    y1 = max(box_a[1], box_b[1])
+    x2 = min(box_a[2], box_b[2])
+    y2 = min(box_a[3], box_b[3])
+    inter = max(0.0, x2 - x1) * max(0.0, y2 - y1)
+    area_a = max(0.0, box_a[2] - box_a[0]) * max(0.0, box_a[3] - box_a[1])
+    area_b = max(0.0, box_b[2] - box_b[0]) * max(0.0, box_b[3] - box_b[1])
+    union = area_a + area_b - inter
+    return inter / union if union > 0 else 0.0
+
+
+def match_boxes(ref_boxes, test_boxes, ref_labels=None, test_labels=None, iou_thres=MATCH_IOU):
+    """
+    按IoU从高到低贪心匹配两组框（给出类别时只匹配同类别的框）
+
+    Returns:
+        list: [(ref_idx, test_idx), ...]
+    """
+    candidates = []
+    for i, ref_box in enumerate(ref_boxes):
+        for j, test_box in enumerate(test_boxes):
+            if ref_labels is not None and ref_labels[i] != test_labels[j]:
+                continue
+            iou = box_iou(ref_box, test_box)
+            if iou >= iou_thres:
+                candidates.append((iou, i, j))
+
+    matches = []
+    used_ref, used_test = set(), set()
+    for _, i, j in sorted(candidates, reverse=True):
+        if i in used_ref or j in used_test:
+            continue
+        used_ref.add(i)
+        used_test.add(j)
+        matches.append((i, j))
+    return matches
+
+
+def edit_distance(a, b):
+    """字符级编辑距离"""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+def points_to_box(points):
+    """四边形顶点转换为外接矩形"""
+    points = np.asarray(points, dtype=np.float64)
+    return [points[:, 0].min(), points[:, 1].min(), points[:, 0].max(), points[:, 1].max()]
+
+
+class AgreementCounter:
+    """累计框级与字符级一致性统计"""
+
+    def __init__(self):
+        self.ref_boxes = 0
+        self.test_boxes = 0
+        self.matched_boxes = 0
+        self.ref_chars = 0
+        self.char_errors = 0
+
+    def add_boxes(self, num_ref, num_test, num_matched):
+        self.ref_boxes += num_ref
+        self.test_boxes += num_test
+        self.matched_boxes += num_matched
+
+    def add_text(self, ref_text, test_text):
+        self.ref_chars += len(ref_text)
+        self.char_errors += edit_distance(ref_text, test_text)
+
+    @property
+    def box_agreement(self):
+        """框级一致率：匹配框数的F1"""
+        total = self.ref_boxes + self.test_boxes
+        return 2 * self.matched_boxes / total if total else 1.0
+
+    @property
+    def char_agreement(self):
+        """字符级一致率：1 - 编辑距离 / fp32字符数"""
+        if not self.ref_chars:
+            return 1.0
+        return max(0.0, 1 - self.char_errors / self.ref_chars)
+
+
+def compare_ocr_lines(ref_lines, test_lines, counter):
+    """对比同一页面fp32与int8的OCR文本行"""
+    ref_boxes = [points_to_box(line["points"]) for line in ref_lines]
+    test_boxes = [points_to_box(line["points"]) for line in test_lines]
+    matches = match_boxes(ref_boxes, test_boxes)
+    counter.add_boxes(len(ref_boxes), len(test_boxes), len(matches))
+
+    # 未匹配的行按整行漏识/多识计入字符错误
+    matched_ref = {i for i, _ in matches}
+    matched_test = {j for _, j in matches}
+    for i, j in matches:
+        counter.add_text(ref_lines[i]["transcription"], test_lines[j]["transcription"])
+    for i, line in enumerate(ref_lines):
+        if i not in matched_ref:
+            counter.add_text(line["transcription"], "")
+    for j, line in enumerate(test_lines):
+        if j not in matched_test:
+            counter.add_text("", line["transcription"])
+
+
+def compare_layout_blocks(ref_blocks, test_blocks, counter):
+    """对比同一页面fp32与int8的版面块（类别相同且IoU达到阈值视为一致）"""
+    matches = match_boxes(
+        [block.box.tolist() for block in ref_blocks],
+        [block.box.tolist() for block in test_blocks],
+        [block.class_name for block in ref_blocks],
+        [block.class_name for block in test_blocks],
+    )
+    counter.add_boxes(len(ref_blocks), len(test_blocks), len(matches))
+
+
+def timed(func, *args):
+    start_time = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start_time
+
+
+def run_benchmark(corpus_dir, dpi=200, max_pages=None, stages=("ocr", "layout"), intra_op_num_threads=-1):
+    """
+    运行基准测试
+
+    Returns:
+        dict: 各阶段的页面数、每页耗时与一致率
+    """
+    models = {}
+    if "ocr" in stages:
+        from ppocr.ocr_stage import OCRStage
+        models["ocr"] = {
+            precision: OCRStage(use_angle_cls=True, use_gpu=False, precision=precision,
+                                intra_op_num_threads=intra_op_num_threads)
+            for precision in ("fp32", "int8")
+        }
+    if "layout" in stages:
+        from layout_analyzer.layout_analyzer import LayoutAnalyzer
+        models["layout"] = {
+            precision: LayoutAnalyzer(precision=precision, intra_op_num_threads=intra_op_num_threads)
+            for precision in ("fp32", "int8")
+        }
+
+    latencies = {stage: {"fp32": [], "int8": []} for stage in models}
+    counters = {stage: AgreementCounter() for stage in models}
+
+    for page_idx, (page_name, img) in enumerate(iter_corpus_pages(corpus_dir, dpi=dpi, max_pages=max_pages)):
+        print(f"处理页面: {page_name}")
+        if "ocr" in models:
+            results = {}
+            for precision, stage in models["ocr"].items():
+                results[precision], elapsed = timed(stage.recognize_image, img, page_idx)
+                latencies["ocr"][precision].append(elapsed)
+            compare_ocr_lines(results["fp32"], results["int8"], counters["ocr"])
+
+        if "layout" in models:
+            results = {}
+            for precision, analyzer in models["layout"].items():
+                page_result, elapsed = timed(analyzer.analyze_page, img, page_idx)
+                results[precision] = page_result.blocks
+                latencies["layout"][precision].append(elapsed)
+            compare_layout_blocks(results["fp32"], results["int8"], counters["layout"])
+
+    report = {}
+    for stage, stage_latencies in latencies.items():
+        num_pages = len(stage_latencies["fp32"])
+        fp32_latency = float(np.mean(stage_latencies["fp32"])) if num_pages else 0.0
+        int8_latency = float(np.mean(stage_latencies["int8"])) if num_pages else 0.0
+        report[stage] = {
+            "pages": num_pages,
+            "fp32_sec_per_page": fp32_latency,
+            "int8_sec_per_page": int8_latency,
+            "speedup": fp32_latency / int8_latency if int8_latency else 0.0,
+            "box_agreement": counters[stage].box_agreement,
+        }
+        if stage == "ocr":
+            report[stage]["char_agreement"] = counters[stage].char_agreement
+    return report
+
+
+def print_report(report):
+    print("\n" + "=" * 60)
+    print("INT8 与 fp32 对比")
+    print("=" * 60)
+    for stage, result in report.items():
+        print(f"{stage}（{result['pages']} 页）:")
+        print(f"  每页耗时: fp32 {result['fp32_sec_per_page']:.3f}秒, "
+              f"int8 {result['int8_sec_per_page']:.3f}秒, 加速比 {result['speedup']:.2f}x")
+        print(f"  框级一致率: {result['box_agreement']:.2%}")
+        if "char_agreement" in result:
+            print(f"  字符级一致率: {result['char_agreement']:.2%}")
+    print("=" * 60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="INT8量化模型速度与精度基准")
+    parser.add_argument("--corpus", required=True, help="基准语料目录（PDF或图片）")
+    parser.add_argument("--stages", nargs="+", choices=("ocr", "layout"), default=["ocr", "layout"],
+                        help="参与测试的阶段（默认：全部）")
+    parser.add_argument("--dpi", type=int, default=200, help="PDF渲染分辨率（默认：200）")
+    parser.add_argument("--max-pages", type=int, help="最多测试的页面数")
+    parser.add_argument("--threads", type=int, default=-1, help="ONNX Runtime算子内线程数（默认：-1）")
+    parser.add_argument("-o", "--output", help="将结果保存为JSON文件")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.corpus, args.dpi, args.max_pages, args.stages, args.threads)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"结果已保存: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+将LayoutReader（LayoutLMv3ForTokenClassification）导出为ONNX模型，并校验与torch模型的一致性
+导出后的模型默认保存为 <模型目录>/layoutreader.onnx，textbox_reading_order.py检测到该文件时自动使用onnxruntime推理
+
+用法:
+    python export_layoutreader_onnx.py
+    python export_layoutreader_onnx.py --model-path /path/to/layoutreader --merged-json xxx_merged.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+# 添加模块路径
+current_dir = Path(__file__).resolve().parent
+if str(current_dir) not in sys.path:
+    sys.path.append(str(current_dir))
+
+from textbox_reading_order import (
+    DEFAULT_LAYOUTREADER_PATH,
+    LAYOUTREADER_ONNX_NAME,
+    MAX_LEN,
+    boxes2inputs_batch,
+    collect_page_textboxes,
+    load_layoutreader_model,
+    parse_logits,
+    predict_logits,
+)
+
+
+def export_onnx(model, output_path, opset=14):
+    """导出ONNX模型，batch和序列长度为动态维度"""
+    import torch
+
+    class _LogitsOnly(torch.nn.Module):
+        """只输出logits，固定输入顺序为input_ids、bbox、attention_mask"""
+
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, input_ids, bbox, attention_mask):
+            return self.model(input_ids=input_ids, bbox=bbox, attention_mask=attention_mask).logits
+
+    sample = boxes2inputs_batch([[[10, 10, 100, 20]] * 8, [[10, 30, 100, 40]] * 5], model.config.pad_token_id)
+    sample = {k: torch.from_numpy(v) for k, v in sample.items()}
+
+    torch.onnx.export(
+        _LogitsOnly(model.cpu()).eval(),
+        (sample["input_ids"], sample["bbox"], sample["attention_mask"]),
+        str(output_path),
+        input_names=["input_ids", "bbox", "attention_mask"],
+        output_names=["logits"],
+        dynamic_axes={
+            "input_ids": {0: "batch", 1: "seq_len"},
+            "bbox": {0: "batch", 1: "seq_len"},
+            "attention_mask": {0: "batch", 1: "seq_len"},
+            "logits": {0: "batch", 1: "seq_len"},
+        },
+        opset_version=opset,
+        do_constant_folding=True,
+    )
+
+
+def random_page_boxes(num_boxes, rng):
+    """生成模拟的文本行bbox（两栏、自上而下，带随机扰动）"""
+    boxes = []
+    for i in range(num_boxes):
+        column = rng.randint(0, 1)
+        x1 = 60 + column * 480 + rng.randint(0, 30)
+        y1 = min(980, 40 + (i * 900) // max(1, num_boxes) + rng.randint(0, 8))
+        boxes.append([x1, y1, min(1000, x1 + rng.randint(150, 420)), min(1000, y1 + rng.randint(8, 20))])
+    rng.shuffle(boxes)
+    return boxes
+
+
+def load_merged_pages(merged_json):
+    """从合并结果文件中读取真实页面的bbox"""
+    with open(merged_json, "r", encoding="utf-8") as f:
+        merged_data = json.load(f)
+    boxes_list = []
+    for page_data in merged_data.values():
+        _, _, boxes = collect_page_textboxes(page_data)
+        if boxes:
+            boxes_list.append(boxes[:MAX_LEN])
+    return boxes_list
+
+
+def verify_parity(torch_model, onnx_model, boxes_list, batch_size=8, atol=1e-3):
+    """
+    对比torch与onnxruntime的logits和解析出的阅读顺序
+
+    Returns:
+        bool: 所有页面阅读顺序一致且logits误差在容差内
+    """
+    max_diff = 0.0
+    mismatched_pages = 0
+    torch_time = 0.0
+    onnx_time = 0.0
+
+    for start in range(0, len(boxes_list), batch_size):
+        batch = boxes_list[start:start + batch_size]
+        inputs = boxes2inputs_batch(batch, onnx_model.pad_token_id)
+
+        t = time.time()
+        torch_logits = predict_logits(torch_model, inputs)
+        torch_time += time.time() - t
+
+        t = time.time()
+        onnx_logits = predict_logits(onnx_model, inputs)
+        onnx_time += time.time() - t
+
+        for row, boxes in enumerate(batch):
+            length = len(boxes)
+            # 只比较有效位置
+            diff = np.abs(torch_logits[row, 1:length + 1, :length] - onnx_logits[row, 1:length + 1, :length]).max()
+            max_diff = max(max_diff, float(diff))
+            if parse_logits(torch_logits[row], length) != parse_logits(onnx_logits[row], length):
+                mismatched_pages += 1
+
+    print(f"校验页面数: {len(boxes_list)}")
+    print(f"logits最大绝对误差: {max_diff:.6f}")
+    print(f"阅读顺序不一致的页面数: {mismatched_pages}")
+    print(f"torch推理耗时: {torch_time:.3f}秒, onnxruntime推理耗时: {onnx_time:.3f}秒")
+    return mismatched_pages == 0 and max_diff <= atol
+
+
+def main():
+    parser = argparse.ArgumentParser(description="导出LayoutReader为ONNX并校验一致性")
+    parser.add_argument("--model-path", default=DEFAULT_LAYOUTREADER_PATH, help="LayoutReader模型目录")
+    parser.add_argument("-o", "--output", help=f"ONNX输出路径（默认：<模型目录>/{LAYOUTREADER_ONNX_NAME}）")
+    parser.add_argument("--opset", type=int, default=14, help="ONNX opset版本（默认：14）")
+    parser.add_argument("--merged-json", help="用于校验的合并结果文件（*_merged.json），默认使用模拟页面")
+    parser.add_argument("--num-pages", type=int, default=32, help="模拟校验页面数（默认：32）")
+    parser.add_argument("--atol", type=float, default=1e-3, help="logits允许的最大绝对误差（默认：1e-3）")
+    parser.add_argument("--skip-export", action="store_true", help="只校验已导出的模型")
+    args = parser.parse_args()
+
+    output_path = args.output or os.path.join(args.model_path, LAYOUTREADER_ONNX_NAME)
+
+    torch_model = load_layoutreader_model(args.model_path, backend="torch")
+
+    if not args.skip_export:
+        print(f"导出ONNX模型: {output_path}")
+        export_onnx(torch_model, output_path, args.opset)
+
+    onnx_model = load_layoutreader_model(output_path, backend="onnx")
+
+    if args.merged_json:
+        boxes_list = load_merged_pages(args.merged_json)
+    else:
+        rng = random.Random(0)
+        boxes_list = [random_page_boxes(rng.randint(1, 200), rng) for _ in range(args.num_pages)]
+
+    if verify_parity(torch_model, onnx_model, boxes_list, atol=args.atol):
+        print("✅ 一致性校验通过")
+        return 0
+
+    print("❌ 一致性校验未通过")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
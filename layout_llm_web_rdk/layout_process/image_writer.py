@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+后台图像写入线程池
+图像编码与写文件在后台线程执行（OpenCV编码时释放GIL），调用方提交后立即返回；
+需要文件落盘的位置（如记录步骤完成、进程返回结果之前）调用flush等待写入完成
+
+环境变量:
+    CROP_IMAGE_FORMAT: 切割图像格式 png/jpg/webp（默认：png）
+    CROP_PNG_COMPRESSION: PNG压缩级别 0-9（默认：1，编码最快）
+    CROP_JPEG_QUALITY: JPEG/WebP质量 0-100（默认：95）
+    IMAGE_WRITER_THREADS: 写入线程数（默认：2）
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+
+# 格式 -> (文件扩展名, 质量参数)
+IMAGE_FORMATS = {
+    "png": (".png", cv2.IMWRITE_PNG_COMPRESSION),
+    "jpg": (".jpg", cv2.IMWRITE_JPEG_QUALITY),
+    "webp": (".webp", cv2.IMWRITE_WEBP_QUALITY),
+}
+
+
+class ImageWriter:
+    """后台图像写入线程池"""
+
+    def __init__(self, num_threads=2, image_format="png", png_compression=1, jpeg_quality=95):
+        """
+        Args:
+            num_threads: 写入线程数
+            image_format: 图像格式 png/jpg/webp
+            png_compression: PNG压缩级别 0-9
+            jpeg_quality: JPEG/WebP质量 0-100
+        """
+        if image_format not in IMAGE_FORMATS:
+            raise ValueError(f"不支持的图像格式: {image_format}，可选: {', '.join(IMAGE_FORMATS)}")
+        self.extension, quality_flag = IMAGE_FORMATS[image_format]
+        quality = png_compression if image_format == "png" else jpeg_quality
+        self.params = [quality_flag, int(quality)]
+
+        self._executor = ThreadPoolExecutor(max_workers=max(1, num_threads), thread_name_prefix="image_writer")
+        self._pending = []
+        self._lock = threading.Lock()
+
+    def submit(self, path, img):
+        """
+        提交写入任务，提交后调用方不能再修改img
+
+        Args:
+            path: 输出路径（扩展名应与extension一致）
+            img: 图像数组
+
+        Returns:
+            concurrent.futures.Future
+        """
+        future = self._executor.submit(self._write, str(path), img)
+        with self._lock:
+            self._pending.append(future)
+        return future
+
+    def _write(self, path, img):
+        ok, buffer = cv2.imencode(self.extension, img, self.params)
+        if not ok:
+            raise IOError(f"图像编码失败: {path}")
+        buffer.tofile(path)
+
+    def flush(self):
+        """等待已提交的写入全部完成，有写入失败时抛出第一个异常"""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        errors = [future.exception() for future in pending]
+        errors = [error for error in errors if error is not None]
+        if errors:
+            raise errors[0]
+
+    def close(self):
+        """完成剩余写入并关闭线程池"""
+        try:
+            self.flush()
+        finally:
+            self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+_default_writer = None
+_default_writer_lock = threading.Lock()
+
+
+def get_image_writer():
+    """进程内共享的写入线程池（按环境变量配置，首次调用时创建）"""
+    global _default_writer
+    with _default_writer_lock:
+        if _default_writer is None:
+            _default_writer = ImageWriter(
+                num_threads=int(os.environ.get("IMAGE_WRITER_THREADS", "2")),
+                image_format=os.environ.get("CROP_IMAGE_FORMAT", "png").lower(),
+                png_compression=int(os.environ.get("CROP_PNG_COMPRESSION", "1")),
+                jpeg_quality=int(os.environ.get("CROP_JPEG_QUALITY", "95")),
+            )
+        return _default_writer
@@ -11,6 +11,7 @@ import shutil  # 添加这个导入
 import cv2
 
 from layout_analyzer import LayoutAnalyzer
+from image_writer import get_image_writer
 
 
 def save_blocks_info_only(blocks, output_dir, page_idx=None):
@@ -34,10 +35,15 @@ def save_blocks_info_only(blocks, output_dir, page_idx=None):
     return blocks_info
 
 
-def save_blocks_info_with_crops(blocks, img, output_dir, page_idx=None):
-    """保存版面块信息并切割特定类型的块，但不保存完整页面图像"""
-    # 将BGR格式转换为RGB格式
-    img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+def save_blocks_info_with_crops(blocks, img, output_dir, page_idx=None, writer=None):
+    """
+    保存版面块信息并切割特定类型的块，但不保存完整页面图像
+    
+    只转换需要切割的块区域，切割图像交给后台线程写入；
+    切割文件需要落盘时调用writer.flush()（默认使用进程内共享的写入线程池）
+    """
+    if writer is None:
+        writer = get_image_writer()
     
     blocks_info = []
     
@@ -49,11 +55,11 @@ def save_blocks_info_with_crops(blocks, img, output_dir, page_idx=None):
     crop_types = {"figure", "isolate_formula", "table"}
     
     # 保存版面块信息并切割特定类型的块
+    h, w = img.shape[:2]
     for i, block in enumerate(blocks):
         x1, y1, x2, y2 = map(int, block.box)
         
         # 确保坐标在图像范围内
-        h, w = img.shape[:2]
         x1 = max(0, min(x1, w))
         y1 = max(0, min(y1, h))
         x2 = max(0, min(x2, w))
@@ -72,16 +78,17 @@ def save_blocks_info_with_crops(blocks, img, output_dir, page_idx=None):
         if block.class_name.lower() in crop_types:
             # 切割图像区域
             if x2 > x1 and y2 > y1:  # 确保有效的边界框
-                cropped_img = img[y1:y2, x1:x2]
+                # 只将切割区域从BGR格式转换为RGB格式
+                cropped_img = cv2.cvtColor(img[y1:y2, x1:x2], cv2.COLOR_BGR2RGB)
                 
                 # 生成切割图像的文件名
                 if page_idx is not None:
-                    crop_filename = f"page_{page_idx}_{block.class_name}_{i}.png"
+                    crop_filename = f"page_{page_idx}_{block.class_name}_{i}{writer.extension}"
                 else:
-                    crop_filename = f"{block.class_name}_{i}.png"
+                    crop_filename = f"{block.class_name}_{i}{writer.extension}"
                 
                 crop_path = os.path.join(crops_dir, crop_filename)
-                cv2.imwrite(crop_path, cropped_img)
+                writer.submit(crop_path, cropped_img)
                 
                 # 在块信息中添加切割图像路径
                 block_info["crop_image_path"] = crop_path
@@ -221,6 +228,7 @@ def analyze_pdf_demo(pdf_path, output_dir, model_type, conf_thres, iou_thres, us
             page_result.page_idx
         )
         all_blocks_info.extend(page_blocks_info)
+    get_image_writer().flush()
     
     # 打印版面块识别统计信息
     # total_blocks = sum(crop_counts.values())
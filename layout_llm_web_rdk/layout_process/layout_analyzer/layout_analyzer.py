@@ -19,6 +19,9 @@ if parent_dir not in sys.path:
     sys.path.append(parent_dir)
 
 from RapidLayout.rapid_layout import RapidLayout, VisLayout
+from page_images import PDFPageImages
+from page_cache import config_fingerprint
+from onnx_sessions import model_file_fingerprint
 
 
 @dataclass
@@ -168,7 +171,13 @@ class LayoutAnalyzer:
         model_type: str = "doclayout_docstructbench",  # 使用的模型类型
         conf_thres: float = 0.25,  # 置信度阈值
         iou_thres: float = 0.5,  # IOU阈值
-        use_cuda: bool = False  # 是否使用CUDA
+        use_cuda: bool = False,  # 是否使用CUDA
+        intra_op_num_threads: int = -1,  # ONNX Runtime算子内线程数，-1为默认
+        precision: str = "fp32",  # 模型精度：fp32或int8
+        cache=None,  # 页面结果缓存（PageResultCache）
+        batch_size: int = 4,  # analyze_pdf每次推理的页数
+        input_mode: str = "square",  # 输入尺寸：square或rect
+        fast_input_size: Optional[int] = None  # 稀疏页面的低分辨率输入边长，None为不启用
     ):
         """
         初始化版面分析器
@@ -178,25 +187,51 @@ class LayoutAnalyzer:
             conf_thres: 置信度阈值
             iou_thres: IOU阈值
             use_cuda: 是否使用GPU加速
+            intra_op_num_threads: ONNX Runtime算子内线程数，多进程并行时按进程数划分CPU核心
+            precision: 模型精度，int8时使用quantize_models.py生成的量化模型
+            cache: 页面结果缓存，命中时跳过版面分析推理
+            batch_size: analyze_pdf每次推理的页数（模型为固定批大小时以模型为准）
+            input_mode: square为正方形输入（默认1024×1024）；rect按页面宽高比缩放，
+                短边只补齐到stride的整数倍，减少填充区域的计算（需要模型支持动态输入尺寸）
+            fast_input_size: 稀疏页面（深色像素很少）改用该边长的低分辨率输入
         """
         self.model_type = model_type
         self.conf_thres = conf_thres
         self.iou_thres = iou_thres
         self.use_cuda = use_cuda
+        self.precision = precision
+        self.cache = cache
+        self.batch_size = batch_size
         
         # 初始化布局分析引擎
         self.layout_engine = RapidLayout(
             model_type=model_type,
             conf_thres=conf_thres,
             iou_thres=iou_thres,
-            use_cuda=use_cuda
+            use_cuda=use_cuda,
+            intra_op_num_threads=intra_op_num_threads,
+            precision=precision,
+            input_mode=input_mode,
+            fast_input_size=fast_input_size
+        )
+        
+        # 缓存指纹按实际加载的模型文件计算（int8模型缺失时回退为fp32模型）
+        self.cache_fingerprint = config_fingerprint(
+            stage="layout",
+            model_type=model_type,
+            model_file=model_file_fingerprint(self.layout_engine.model_path),
+            conf_thres=conf_thres,
+            iou_thres=iou_thres,
+            input_mode=input_mode,
+            fast_input_size=fast_input_size
         )
     
     def analyze_pdf(
         self, 
         pdf_path: Union[str, Path], 
         page_range: Optional[Tuple[int, int]] = None,
-        dpi: int = 200
+        dpi: int = 200,
+        page_images: Optional[PDFPageImages] = None
     ) -> PDFLayoutResult:
         """
         分析PDF文档的版面
@@ -205,49 +240,96 @@ class LayoutAnalyzer:
             pdf_path: PDF文件路径
             page_range: 页面范围，如(0, 5)表示分析前5页，默认为None表示分析所有页面
             dpi: 转换为图像的DPI，默认200
+            page_images: 共享的页面图像提供器，传入时直接复用其渲染结果，
+                page_range和dpi以提供器的设置为准
         
         Returns:
             PDFLayoutResult: PDF版面分析结果
         """
         pdf_path = str(pdf_path)
         
-        # 打开PDF文件
-        pdf_document = fitz.open(pdf_path)
-        total_pages = len(pdf_document)
-        
-        # 确定要处理的页面范围
-        start_page = 0
-        end_page = total_pages
-        
-        if page_range is not None:
-            start_page = max(0, page_range[0])
-            end_page = min(total_pages, page_range[1])
+        # 没有共享的页面图像时，自行渲染
+        own_page_images = page_images is None
+        if own_page_images:
+            page_images = PDFPageImages(pdf_path, dpi=dpi, page_range=page_range)
         
         # 创建结果对象
         pdf_result = PDFLayoutResult(
             pdf_path=pdf_path,
-            total_pages=total_pages,
+            total_pages=page_images.total_pages,
             page_results=[]
         )
         
-        # 处理每一页
-        for page_idx in range(start_page, end_page):
-            # 将PDF页面转换为图像
-            page = pdf_document.load_page(page_idx)
-            pix = page.get_pixmap(dpi=dpi)
-            
-            # 转换为OpenCV格式
-            img_array = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)
-            
-            # 如果是RGBA格式，转换为BGR格式
-            if pix.n == 4:
-                img_array = cv2.cvtColor(img_array, cv2.COLOR_RGBA2BGR)
-            elif pix.n == 1:
-                img_array = cv2.cvtColor(img_array, cv2.COLOR_GRAY2BGR)
-            
-            # 对图像进行版面分析
-            boxes, scores, class_names, _ = self.layout_engine(img_array)
-            
+        try:
+            # 每攒够batch_size页做一次批量推理
+            pages = []
+            for page_idx, img_array in page_images:
+                pages.append((page_idx, img_array))
+                if len(pages) >= self.batch_size:
+                    pdf_result.page_results.extend(self.analyze_pages(pages))
+                    pages = []
+            if pages:
+                pdf_result.page_results.extend(self.analyze_pages(pages))
+        finally:
+            # 关闭自行打开的PDF文档（页面图像仍由结果对象持有）
+            if own_page_images:
+                page_images.close()
+        
+        return pdf_result
+    
+    def analyze_page(self, img: np.ndarray, page_idx: int = 0) -> PageLayoutResult:
+        """
+        分析单个页面图像的版面
+        
+        Args:
+            img: BGR格式的页面图像
+            page_idx: 页码（从0开始）
+        
+        Returns:
+            PageLayoutResult: 页面版面分析结果
+        """
+        return self.analyze_pages([(page_idx, img)])[0]
+    
+    def analyze_pages(self, pages: List[Tuple[int, np.ndarray]]) -> List[PageLayoutResult]:
+        """
+        批量分析多个页面图像的版面，未命中缓存的页面合并为一次推理
+        
+        Args:
+            pages: [(页码, BGR格式的页面图像), ...]
+        
+        Returns:
+            List[PageLayoutResult]: 与输入顺序一致的页面版面分析结果
+        """
+        # 先查询页面结果缓存
+        cache_keys = [None] * len(pages)
+        layouts = [None] * len(pages)
+        if self.cache is not None:
+            for i, (_, img) in enumerate(pages):
+                cache_keys[i] = self.cache.make_key(img, self.cache_fingerprint)
+                cached = self.cache.get("layout", cache_keys[i])
+                if cached is not None:
+                    layouts[i] = (
+                        [np.array(item["box"]) for item in cached],
+                        [item["score"] for item in cached],
+                        [item["class_name"] for item in cached]
+                    )
+        
+        # 对未命中缓存的页面进行批量版面分析
+        pending = [i for i, layout in enumerate(layouts) if layout is None]
+        if pending:
+            batch_results = self.layout_engine.batch(
+                [pages[i][1] for i in pending], batch_size=self.batch_size
+            )
+            for i, (boxes, scores, class_names, _) in zip(pending, batch_results):
+                layouts[i] = (boxes, scores, class_names)
+                if cache_keys[i] is not None:
+                    self.cache.put("layout", cache_keys[i], [
+                        {"class_name": str(class_name), "box": np.asarray(box).tolist(), "score": float(score)}
+                        for box, score, class_name in zip(boxes, scores, class_names)
+                    ])
+        
+        page_results = []
+        for (page_idx, img), (boxes, scores, class_names) in zip(pages, layouts):
             # 创建版面块列表
             blocks = []
             for i, (box, score, class_name) in enumerate(zip(boxes, scores, class_names)):
@@ -259,17 +341,12 @@ class LayoutAnalyzer:
                     block_idx=i
                 ))
             
-            # 添加到页面结果
-            pdf_result.page_results.append(PageLayoutResult(
+            page_results.append(PageLayoutResult(
                 page_idx=page_idx,
-                img=img_array,
+                img=img,
                 blocks=blocks
             ))
-        
-        # 关闭PDF文档
-        pdf_document.close()
-        
-        return pdf_result
+        return page_results
     
     def analyze_image(
         self,
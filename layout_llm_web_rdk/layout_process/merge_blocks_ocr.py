@@ -126,6 +126,118 @@ def generate_virtual_text_boxes(block_bbox, avg_text_height, line_spacing_ratio=
     return virtual_text_boxes
 
 
+def merge_page_blocks_and_ocr(page_idx, page_blocks, page_ocr_data):
+    """
+    合并单个页面的板块信息和OCR结果
+    
+    Args:
+        page_idx: 页码（从0开始）
+        page_blocks: 该页面的板块信息列表
+        page_ocr_data: 该页面的OCR文本框列表
+    
+    Returns:
+        dict: 该页面的合并结果，包含page_info和blocks
+    """
+    # 找出需要特殊处理的块类型
+    special_block_types = {"figure", "table", "isolate_formula"}
+    special_blocks_bboxes = []
+    
+    # 预过滤置信度低于0.5的块和abandon类型的块，用于计算统计信息
+    filtered_blocks = [
+        block for block in page_blocks 
+        if block.get("score", 0.0) >= 0.5 and block.get("class_name", "").lower() != "abandon"
+    ]
+    
+    for block in filtered_blocks:
+        if block.get("class_name", "").lower() in special_block_types:
+            block_bbox = block.get("bbox", [])
+            if len(block_bbox) >= 4:
+                special_blocks_bboxes.append(block_bbox)
+    
+    # 计算页面中其他文本框的平均高度（排除特殊块内的文本框）
+    avg_text_height = calculate_average_text_height(page_ocr_data, special_blocks_bboxes)
+    
+    # 计算统计信息
+    total_original_blocks = len(page_blocks)
+    low_score_blocks = len([b for b in page_blocks if b.get("score", 0.0) < 0.5])
+    abandon_blocks = len([b for b in page_blocks if b.get("class_name", "").lower() == "abandon"])
+    valid_blocks_count = len(filtered_blocks)
+    
+    # 为当前页面创建结果结构
+    page_result = {
+        "page_info": {
+            "page_index": page_idx,
+            "total_original_blocks": total_original_blocks,
+            "valid_blocks": valid_blocks_count,
+            "filtered_low_score_blocks": low_score_blocks,
+            "filtered_abandon_blocks": abandon_blocks,
+            "total_text_boxes": len(page_ocr_data),
+            "avg_text_height": avg_text_height
+        },
+        "blocks": []
+    }
+    
+    # 遍历当前页面的每个板块
+    for block in page_blocks:
+        # 过滤置信度低于0.5的块
+        block_score = block.get("score", 0.0)
+        if block_score < 0.5:
+            continue  # 跳过置信度低于0.5的块
+        
+        # 过滤abandon类型的块
+        block_class_name = block.get("class_name", "").lower()
+        if block_class_name == "abandon":
+            continue  # 跳过abandon类型的块
+        
+        block_info = {
+            "block_info": {
+                "class_name": block.get("class_name", ""),
+                "bbox": block.get("bbox", []),
+                "score": block.get("score", 0.0),
+                "block_idx": block.get("block_idx", -1),
+                "page_idx": block.get("page_idx", 0)
+            },
+            "contained_text_boxes": []
+        }
+        
+        # 如果是figure、table、isolate_formula类型，且有切割图像路径，则保留该信息
+        if block.get("crop_image_path"):
+            block_info["block_info"]["crop_image_path"] = block.get("crop_image_path")
+        
+        # 检查是否是需要特殊处理的块类型
+        if block_class_name in special_block_types:
+            # 对于特殊块类型，生成虚拟文本框而不是匹配真实文本框
+            block_bbox = block.get("bbox", [])
+            virtual_text_boxes = generate_virtual_text_boxes(block_bbox, avg_text_height)
+            block_info["contained_text_boxes"] = virtual_text_boxes
+            block_info["block_info"]["is_virtual_text"] = True
+        else:
+            # 对于普通块，正常匹配文本框
+            for text_box in page_ocr_data:
+                text_bbox = text_box.get("bbox", [])
+                block_bbox = block.get("bbox", [])
+                
+                # 检查文本框是否在板块范围内
+                if check_bbox_overlap(block_bbox, text_bbox):
+                    text_info = {
+                        "illegibility": text_box.get("illegibility", False),
+                        "bbox": text_bbox,
+                        "score": text_box.get("score", 0.0),
+                        "transcription": text_box.get("text", ""),  # OCR文件中使用"text"字段
+                        "is_virtual": False
+                    }
+                    block_info["contained_text_boxes"].append(text_info)
+            
+            block_info["block_info"]["is_virtual_text"] = False
+        
+        # 添加统计信息
+        block_info["block_info"]["contained_text_count"] = len(block_info["contained_text_boxes"])
+        
+        page_result["blocks"].append(block_info)
+    
+    return page_result
+
+
 def merge_blocks_and_ocr(blocks_file, ocr_file, output_file):
     """
     合并板块信息和OCR结果
@@ -170,103 +282,8 @@ def merge_blocks_and_ocr(blocks_file, ocr_file, output_file):
         # 获取对应页面的OCR文本框
         page_ocr_data = ocr_by_page.get(page_idx, [])
         
-        # 找出需要特殊处理的块类型
-        special_block_types = {"figure", "table", "isolate_formula"}
-        special_blocks_bboxes = []
-        
-        # 预过滤置信度低于0.5的块和abandon类型的块，用于计算统计信息
-        filtered_blocks = [
-            block for block in page_blocks 
-            if block.get("score", 0.0) >= 0.5 and block.get("class_name", "").lower() != "abandon"
-        ]
-        
-        for block in filtered_blocks:
-            if block.get("class_name", "").lower() in special_block_types:
-                block_bbox = block.get("bbox", [])
-                if len(block_bbox) >= 4:
-                    special_blocks_bboxes.append(block_bbox)
-        
-        # 计算页面中其他文本框的平均高度（排除特殊块内的文本框）
-        avg_text_height = calculate_average_text_height(page_ocr_data, special_blocks_bboxes)
-        
-        # 计算统计信息
-        total_original_blocks = len(page_blocks)
-        low_score_blocks = len([b for b in page_blocks if b.get("score", 0.0) < 0.5])
-        abandon_blocks = len([b for b in page_blocks if b.get("class_name", "").lower() == "abandon"])
-        valid_blocks_count = len(filtered_blocks)
-        
-        # 为当前页面创建结果结构
-        merged_result[page_key] = {
-            "page_info": {
-                "page_index": page_idx,
-                "total_original_blocks": total_original_blocks,
-                "valid_blocks": valid_blocks_count,
-                "filtered_low_score_blocks": low_score_blocks,
-                "filtered_abandon_blocks": abandon_blocks,
-                "total_text_boxes": len(page_ocr_data),
-                "avg_text_height": avg_text_height
-            },
-            "blocks": []
-        }
-        
-        # 遍历当前页面的每个板块
-        for block in page_blocks:
-            # 过滤置信度低于0.5的块
-            block_score = block.get("score", 0.0)
-            if block_score < 0.5:
-                continue  # 跳过置信度低于0.5的块
-            
-            # 过滤abandon类型的块
-            block_class_name = block.get("class_name", "").lower()
-            if block_class_name == "abandon":
-                continue  # 跳过abandon类型的块
-            
-            block_info = {
-                "block_info": {
-                    "class_name": block.get("class_name", ""),
-                    "bbox": block.get("bbox", []),
-                    "score": block.get("score", 0.0),
-                    "block_idx": block.get("block_idx", -1),
-                    "page_idx": block.get("page_idx", 0)
-                },
-                "contained_text_boxes": []
-            }
-            
-            # 如果是figure、table、isolate_formula类型，且有切割图像路径，则保留该信息
-            if block.get("crop_image_path"):
-                block_info["block_info"]["crop_image_path"] = block.get("crop_image_path")
-            
-            # 检查是否是需要特殊处理的块类型
-            if block_class_name in special_block_types:
-                # 对于特殊块类型，生成虚拟文本框而不是匹配真实文本框
-                block_bbox = block.get("bbox", [])
-                virtual_text_boxes = generate_virtual_text_boxes(block_bbox, avg_text_height)
-                block_info["contained_text_boxes"] = virtual_text_boxes
-                block_info["block_info"]["is_virtual_text"] = True
-            else:
-                # 对于普通块，正常匹配文本框
-                for text_box in page_ocr_data:
-                    text_bbox = text_box.get("bbox", [])
-                    block_bbox = block.get("bbox", [])
-                    
-                    # 检查文本框是否在板块范围内
-                    if check_bbox_overlap(block_bbox, text_bbox):
-                        text_info = {
-                            "illegibility": text_box.get("illegibility", False),
-                            "bbox": text_bbox,
-                            "score": text_box.get("score", 0.0),
-                            "transcription": text_box.get("text", ""),  # OCR文件中使用"text"字段
-                            "is_virtual": False
-                        }
-                        block_info["contained_text_boxes"].append(text_info)
-                
-                block_info["block_info"]["is_virtual_text"] = False
-            
-            # 添加统计信息
-            block_info["block_info"]["contained_text_count"] = len(block_info["contained_text_boxes"])
-            
-            merged_result[page_key]["blocks"].append(block_info)
-        
+        merged_result[page_key] = merge_page_blocks_and_ocr(page_idx, page_blocks, page_ocr_data)
+    
     # 写入输出文件
     with open(output_file, 'w', encoding='utf-8') as f:
         json.dump(merged_result, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+进程内共享的ONNX Runtime会话注册表
+同一模型文件（相同执行提供器与动态维度设置）在进程内只创建一个InferenceSession；
+所有会话按统一的线程预算分配算子内线程数，避免版面分析与OCR并行时各自占满全部CPU核心
+
+会话配置是进程级策略：会话创建后在进程内一直复用，配置只能在首次创建会话之前通过configure_sessions修改。
+默认按版面分析与OCR并行运行分配（各占一半）；只做顺序/流式处理的进程可在加载模型前将两组都设为1.0
+
+环境变量:
+    ORT_THREAD_BUDGET: 进程可用的总线程数（默认：CPU核心数）
+    ORT_ENABLE_CPU_MEM_ARENA: 是否启用CPU内存池（默认：1）
+    ORT_ENABLE_MEM_PATTERN: 是否启用内存复用模式（默认：1）
+    ORT_ARENA_EXTEND_STRATEGY: 内存池扩展策略 kSameAsRequested/kNextPowerOfTwo（默认：kSameAsRequested）
+    ORT_ALLOW_SPINNING: 线程池空闲时是否自旋等待（默认：1）
+    ORT_CUDA_MEM_LIMIT_MB: CUDA显存上限（默认：2048）
+    ORT_CUDNN_CONV_ALGO_SEARCH: 卷积算法搜索方式 EXHAUSTIVE/HEURISTIC/DEFAULT（默认：EXHAUSTIVE）
+"""
+
+import os
+import threading
+
+import onnxruntime
+
+
+def _env_flag(name, default):
+    return os.environ.get(name, default).strip().lower() not in ("0", "false", "no", "off")
+
+
+# 会话配置，只能在进程内首次创建会话之前通过configure_sessions修改
+SESSION_SETTINGS = {
+    "thread_budget": int(os.environ.get("ORT_THREAD_BUDGET", "0")) or (os.cpu_count() or 1),
+    # 各会话组占线程预算的比例。版面分析与OCR在并行模式下同时运行，各占一半；
+    # OCR组内det/cls/rec依次执行，共用同一份线程
+    "thread_shares": {"layout": 0.5, "ocr": 0.5},
+    "enable_cpu_mem_arena": _env_flag("ORT_ENABLE_CPU_MEM_ARENA", "1"),
+    "enable_mem_pattern": _env_flag("ORT_ENABLE_MEM_PATTERN", "1"),
+    "arena_extend_strategy": os.environ.get("ORT_ARENA_EXTEND_STRATEGY", "kSameAsRequested"),
+    "allow_spinning": _env_flag("ORT_ALLOW_SPINNING", "1"),
+    "cuda_mem_limit_mb": int(os.environ.get("ORT_CUDA_MEM_LIMIT_MB", "2048")),
+    "cudnn_conv_algo_search": os.environ.get("ORT_CUDNN_CONV_ALGO_SEARCH", "EXHAUSTIVE"),
+}
+
+# 量化模型与fp32模型放在同一目录，文件名追加此后缀（由quantize_models.py生成）
+INT8_MODEL_SUFFIX = "_int8"
+
+# 会话键 -> (InferenceSession, 算子内线程数)
+_sessions = {}
+_sessions_lock = threading.Lock()
+_missing_int8_models = set()
+_thread_mismatches = set()
+
+
+def int8_model_path(model_path):
+    """fp32模型对应的INT8模型路径"""
+    root, ext = os.path.splitext(str(model_path))
+    return f"{root}{INT8_MODEL_SUFFIX}{ext}"
+
+
+def resolve_model_path(model_path, precision="fp32"):
+    """
+    按精度选择实际加载的模型文件
+
+    precision为int8时使用同目录下的 *_int8.onnx，不存在时回退到fp32模型（每个模型只警告一次）
+    """
+    if precision != "int8":
+        return str(model_path)
+    int8_path = int8_model_path(model_path)
+    if os.path.exists(int8_path):
+        return int8_path
+    if int8_path not in _missing_int8_models:
+        _missing_int8_models.add(int8_path)
+        print(f"警告: 未找到INT8模型 {int8_path}，使用fp32模型")
+    return str(model_path)
+
+
+def model_file_fingerprint(model_path):
+    """
+    模型文件指纹（绝对路径、文件大小与修改时间），供页面结果缓存区分实际加载的模型：
+    int8缺失时回退的fp32模型、重新量化生成的模型都会得到不同的指纹
+    """
+    stat = os.stat(model_path)
+    return f"{os.path.realpath(str(model_path))}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def configure_sessions(**settings):
+    """
+    设置进程的会话配置，必须在首次创建会话之前调用
+
+    Args:
+        **settings: SESSION_SETTINGS中的配置项
+
+    Raises:
+        ValueError: 未知的配置项
+        RuntimeError: 进程内已创建会话（已有会话按原配置创建并会被继续复用）
+    """
+    unknown = set(settings) - set(SESSION_SETTINGS)
+    if unknown:
+        raise ValueError(f"未知的会话配置项: {', '.join(sorted(unknown))}")
+    with _sessions_lock:
+        if _sessions:
+            raise RuntimeError("进程内已创建ONNX会话，会话配置需在加载模型之前设置")
+        SESSION_SETTINGS.update(settings)
+
+
+def session_threads(group, intra_op_num_threads=-1):
+    """
+    计算会话的算子内线程数
+
+    Args:
+        group: 会话组，如"layout"、"ocr"
+        intra_op_num_threads: 显式指定的线程数，大于0时直接使用（多进程并行时由page_pool按进程数划分）
+
+    Returns:
+        int: 线程数
+    """
+    if intra_op_num_threads > 0:
+        return intra_op_num_threads
+    share = SESSION_SETTINGS["thread_shares"].get(group, 1.0)
+    return max(1, int(SESSION_SETTINGS["thread_budget"] * share))
+
+
+def cpu_provider_options():
+    """CPU执行提供器参数"""
+    return {"arena_extend_strategy": SESSION_SETTINGS["arena_extend_strategy"]}
+
+
+def cuda_provider_options(device_id=0):
+    """CUDA执行提供器参数"""
+    return {
+        "device_id": device_id,
+        "cudnn_conv_algo_search": SESSION_SETTINGS["cudnn_conv_algo_search"],
+        "arena_extend_strategy": SESSION_SETTINGS["arena_extend_strategy"],
+        "do_copy_in_default_stream": True,
+        "gpu_mem_limit": SESSION_SETTINGS["cuda_mem_limit_mb"] * 1024 * 1024,
+    }
+
+
+def build_session_options(num_threads, inter_op_num_threads=-1, free_dimension_overrides=None):
+    """按当前配置创建SessionOptions，free_dimension_overrides将指定名称的动态维度固定为给定大小"""
+    session_options = onnxruntime.SessionOptions()
+    session_options.log_severity_level = 3  # 只显示警告和错误
+    session_options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+    session_options.intra_op_num_threads = num_threads
+    if inter_op_num_threads > 0:
+        session_options.inter_op_num_threads = inter_op_num_threads
+    session_options.enable_cpu_mem_arena = SESSION_SETTINGS["enable_cpu_mem_arena"]
+    session_options.enable_mem_pattern = SESSION_SETTINGS["enable_mem_pattern"]
+    if not SESSION_SETTINGS["allow_spinning"]:
+        session_options.add_session_config_entry("session.intra_op.allow_spinning", "0")
+    for dim_name, dim_value in (free_dimension_overrides or {}).items():
+        session_options.add_free_dimension_override_by_name(dim_name, dim_value)
+    return session_options
+
+
+def get_shared_session(model_path, providers, group, intra_op_num_threads=-1, inter_op_num_threads=-1,
+                       free_dimension_overrides=None):
+    """
+    获取共享的InferenceSession，相同模型文件、执行提供器与动态维度设置只创建一次
+
+    线程数不参与去重：线程预算在进程内固定，只有显式指定intra_op_num_threads时线程数才可能不同，
+    此时复用已有会话并给出警告，避免同一模型被重复加载
+
+    Args:
+        model_path: 模型文件路径
+        providers: 执行提供器列表，元素为名称或 (名称, 参数) 元组
+        group: 会话组，用于分配线程预算
+        intra_op_num_threads: 显式指定的算子内线程数，-1表示按线程预算分配
+        inter_op_num_threads: 算子间线程数，-1表示使用默认值
+        free_dimension_overrides: {动态维度名称: 固定大小}，用于创建固定输入形状的会话
+
+    Returns:
+        onnxruntime.InferenceSession
+    """
+    provider_names = tuple(p[0] if isinstance(p, (tuple, list)) else p for p in providers)
+    overrides = tuple(sorted((free_dimension_overrides or {}).items()))
+    key = (os.path.realpath(str(model_path)), provider_names, overrides)
+
+    with _sessions_lock:
+        num_threads = session_threads(group, intra_op_num_threads)
+        entry = _sessions.get(key)
+        if entry is None:
+            session = onnxruntime.InferenceSession(
+                str(model_path),
+                build_session_options(num_threads, inter_op_num_threads, free_dimension_overrides),
+                providers=list(providers)
+            )
+            _sessions[key] = (session, num_threads)
+            return session
+
+        session, loaded_threads = entry
+        if loaded_threads != num_threads and (key, num_threads) not in _thread_mismatches:
+            _thread_mismatches.add((key, num_threads))
+            print(f"警告: 模型 {os.path.basename(key[0])} 已以 {loaded_threads} 个线程加载，"
+                  f"复用该会话（本次请求 {num_threads} 个线程）")
+    return session
+
+
+def loaded_sessions():
+    """已创建的会话：[(模型路径, 执行提供器, 线程数), ...]"""
+    with _sessions_lock:
+        return [(path, providers, threads) for (path, providers, _), (_, threads) in _sessions.items()]
+
+
+def clear_sessions():
+    """释放所有共享会话（仍被模型实例引用的会话在引用释放后回收）"""
+    with _sessions_lock:
+        _sessions.clear()
+        _thread_mismatches.clear()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+页面结果磁盘缓存
+以页面渲染内容的哈希加模型/配置指纹作为键，缓存每页的版面块和OCR文本行，
+重复上传的文档或只修改了少数页面的文档可以跳过未变化页面的模型推理
+"""
+
+import os
+import json
+import hashlib
+import threading
+
+import numpy as np
+
+# 默认缓存大小上限（MB）
+DEFAULT_CACHE_SIZE_MB = 1024
+
+
+def config_fingerprint(**config):
+    """
+    计算模型/配置指纹
+
+    Args:
+        **config: 影响推理结果的配置项
+
+    Returns:
+        str: 配置指纹
+    """
+    payload = json.dumps(config, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def page_digest(img):
+    """计算页面图像内容的哈希"""
+    img = np.ascontiguousarray(img)
+    h = hashlib.blake2b(digest_size=20)
+    h.update(str((img.shape, img.dtype.str)).encode("utf-8"))
+    h.update(memoryview(img).cast("B"))
+    return h.hexdigest()
+
+
+class PageResultCache:
+    """按内容寻址的页面结果缓存，超出大小上限时按最近最少使用淘汰"""
+
+    def __init__(self, cache_dir, max_size_mb=DEFAULT_CACHE_SIZE_MB):
+        """
+        初始化缓存
+
+        Args:
+            cache_dir: 缓存目录
+            max_size_mb: 缓存大小上限（MB）
+        """
+        self.cache_dir = str(cache_dir)
+        self.max_size_mb = max_size_mb
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._total_bytes = self._scan_size()
+
+    def __reduce__(self):
+        # 多进程工作进程中按相同目录和上限重新创建
+        return (self.__class__, (self.cache_dir, self.max_size_mb))
+
+    def make_key(self, img, fingerprint):
+        """由页面图像和配置指纹生成缓存键"""
+        return f"{page_digest(img)}_{fingerprint}"
+
+    def _entry_path(self, stage, key):
+        return os.path.join(self.cache_dir, stage, key[:2], f"{key}.json")
+
+    def get(self, stage, key):
+        """
+        读取缓存条目
+
+        Args:
+            stage: 缓存阶段，如"layout"、"ocr"
+            key: 缓存键
+
+        Returns:
+            缓存的数据，未命中时返回None
+        """
+        path = self._entry_path(stage, key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            # 以修改时间记录最近访问，供LRU淘汰使用
+            os.utime(path, None)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def put(self, stage, key, data):
+        """
+        写入缓存条目
+
+        Args:
+            stage: 缓存阶段
+            key: 缓存键
+            data: 可JSON序列化的数据
+        """
+        path = self._entry_path(stage, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # 先写临时文件再原子替换，避免并发读到不完整的条目
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            old_size = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+            new_size = os.path.getsize(path)
+        except OSError as e:
+            print(f"写入缓存失败: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+
+        with self._lock:
+            self._total_bytes += new_size - old_size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _iter_entries(self):
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".json"):
+                    yield os.path.join(root, name)
+
+    def _scan_size(self):
+        total = 0
+        for path in self._iter_entries():
+            try:
+                total += os.path.getsize(path)
+            except OSError:
+                pass
+        return total
+
+    def _evict(self):
+        """按最近访问时间淘汰条目，直到缓存大小降到上限的90%以下"""
+        entries = []
+        for path in self._iter_entries():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        # 其他进程可能同时写入或淘汰，以实际扫描结果为准
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        entries.sort()
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        self._total_bytes = total
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            for path in list(self._iter_entries()):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self._total_bytes = 0
+
+    def stats(self):
+        """缓存命中统计"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size_mb": self._total_bytes / (1024 * 1024),
+            }
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PDF页面图像提供器
+每个页面只渲染一次，版面分析与OCR共享同一份BGR图像
+"""
+
+import queue
+import threading
+
+import cv2
+import numpy as np
+import fitz  # PyMuPDF
+
+from pdf_text_layer import extract_text_lines
+
+
+class _PixmapSamples:
+    """pix.samples的零拷贝视图，持有Pixmap引用以保证内存在数组存活期间有效"""
+
+    def __init__(self, pix):
+        self.pix = pix
+        view = np.frombuffer(pix.samples_mv, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)
+        self.__array_interface__ = view.__array_interface__
+
+
+def pixmap_to_bgr(pix):
+    """
+    将PyMuPDF的Pixmap转换为BGR图像
+
+    RGB像素直接在pix.samples的内存上原地交换通道，不产生拷贝
+
+    Args:
+        pix: fitz.Pixmap
+
+    Returns:
+        np.ndarray: BGR格式的图像 (H, W, 3)
+    """
+    img = np.asarray(_PixmapSamples(pix))
+
+    if pix.n == 3:
+        cv2.cvtColor(img, cv2.COLOR_RGB2BGR, dst=img)
+    elif pix.n == 4:
+        img = cv2.cvtColor(img, cv2.COLOR_RGBA2BGR)
+    elif pix.n == 1:
+        img = cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
+    return img
+
+
+class PDFPageImages:
+    """PDF页面图像提供器"""
+
+    def __init__(self, pdf_path, dpi=200, page_range=None):
+        """
+        初始化页面图像提供器
+
+        Args:
+            pdf_path: PDF文件路径
+            dpi: 渲染分辨率，默认200
+            page_range: 页面范围，如(0, 5)表示前5页，默认为None表示所有页面
+        """
+        self.pdf_path = str(pdf_path)
+        self.dpi = dpi
+
+        self._doc = fitz.open(self.pdf_path)
+        self.total_pages = len(self._doc)
+
+        self.start_page = 0
+        self.end_page = self.total_pages
+        if page_range is not None:
+            self.start_page = max(0, page_range[0])
+            self.end_page = min(self.total_pages, page_range[1])
+
+        # page_idx -> 图像
+        self._pages = {}
+        # PyMuPDF文档对象不是线程安全的，渲染需要串行
+        self._lock = threading.Lock()
+
+    @property
+    def page_indices(self):
+        """需要处理的页码列表"""
+        return list(range(self.start_page, self.end_page))
+
+    def __len__(self):
+        return self.end_page - self.start_page
+
+    def get(self, page_idx):
+        """
+        获取指定页面的BGR图像，首次访问时渲染，之后直接复用
+
+        返回的图像为只读，多个处理阶段共享同一份内存
+
+        Args:
+            page_idx: 页码（从0开始）
+
+        Returns:
+            np.ndarray: BGR格式的页面图像
+        """
+        with self._lock:
+            cached = self._pages.get(page_idx)
+            if cached is None:
+                cached = self._render_page(page_idx)
+                self._pages[page_idx] = cached
+        return cached
+
+    def page_rotation(self, page_idx):
+        """
+        页面的/Rotate角度（0、90、180、270）
+
+        渲染结果已按该角度旋转，非0通常说明是扫描件且页面方向被调整过，供OCR判断是否需要方向分类
+        """
+        with self._lock:
+            if self._doc is None:
+                raise ValueError(f"PDF文档已关闭: {self.pdf_path}")
+            return self._doc.load_page(page_idx).rotation
+
+    def text_layer(self, page_idx):
+        """
+        读取页面的PDF文本层，坐标与渲染图像一致
+
+        Returns:
+            (lines, regions) 或 None，见pdf_text_layer.extract_text_lines
+        """
+        with self._lock:
+            if self._doc is None:
+                raise ValueError(f"PDF文档已关闭: {self.pdf_path}")
+            return extract_text_lines(self._doc.load_page(page_idx), self.dpi)
+
+    def _render_page(self, page_idx):
+        """渲染单个页面"""
+        if self._doc is None:
+            raise ValueError(f"PDF文档已关闭: {self.pdf_path}")
+
+        page = self._doc.load_page(page_idx)
+        pix = page.get_pixmap(dpi=self.dpi)
+        img = pixmap_to_bgr(pix)
+        img.flags.writeable = False
+        return img
+
+    def __iter__(self):
+        """按页码顺序迭代 (page_idx, 图像)"""
+        for page_idx in range(self.start_page, self.end_page):
+            yield page_idx, self.get(page_idx)
+
+    def stream(self, window=2):
+        """
+        以有界窗口流式迭代页面图像
+
+        后台线程最多预先渲染window个页面，渲染结果不进入缓存；调用方处理完一页
+        并释放引用后内存即被回收，峰值内存约为window+2页，与文档总页数无关
+
+        Args:
+            window: 预渲染的页面数量上限
+
+        Yields:
+            (page_idx, 图像)
+        """
+        window = max(1, int(window))
+        pages = queue.Queue(maxsize=window)
+        stop = threading.Event()
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce():
+            try:
+                for page_idx in range(self.start_page, self.end_page):
+                    with self._lock:
+                        img = self._render_page(page_idx)
+                    if not put((page_idx, img, None)):
+                        return
+                    img = None
+                put((None, None, None))
+            except Exception as e:
+                put((None, None, e))
+
+        producer = threading.Thread(target=produce, daemon=True)
+        producer.start()
+        try:
+            while True:
+                page_idx, img, error = pages.get()
+                if error is not None:
+                    raise error
+                if page_idx is None:
+                    break
+                yield page_idx, img
+                img = None
+        finally:
+            stop.set()
+            producer.join()
+
+    def release(self, page_idx):
+        """释放指定页面的图像"""
+        with self._lock:
+            self._pages.pop(page_idx, None)
+
+    def close(self):
+        """释放所有页面图像并关闭PDF文档"""
+        with self._lock:
+            self._pages.clear()
+            if self._doc is not None:
+                self._doc.close()
+                self._doc = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+页面级多进程并行
+每个工作进程各自持有RapidLayout与ONNXPaddleOcr会话，按页码领取任务，
+完成版面分析与OCR后由主进程按页码顺序重新组装结果
+"""
+
+import os
+import sys
+import multiprocessing
+from pathlib import Path
+
+import fitz  # PyMuPDF
+
+# 添加模块路径
+current_dir = Path(__file__).resolve().parent
+if str(current_dir) not in sys.path:
+    sys.path.append(str(current_dir))
+
+from image_writer import get_image_writer
+from page_images import pixmap_to_bgr
+from pdf_text_layer import extract_text_lines
+
+# 工作进程内的常驻状态，由_init_worker初始化
+_worker_state = {}
+
+
+def default_worker_count():
+    """默认工作进程数：CPU核心数"""
+    return os.cpu_count() or 1
+
+
+def threads_per_worker(num_workers):
+    """将CPU核心平均分配给各工作进程，避免ONNX Runtime线程过度竞争"""
+    return max(1, (os.cpu_count() or 1) // max(1, num_workers))
+
+
+def _init_worker(pdf_path, dpi, output_dir, layout_kwargs, ocr_kwargs, use_text_layer=False):
+    """工作进程初始化：打开PDF并加载版面分析与OCR模型（每个进程只加载一次）"""
+    from layout_analyzer.layout_analyzer import LayoutAnalyzer
+    from ppocr.ocr_stage import OCRStage
+
+    _worker_state["doc"] = fitz.open(pdf_path)
+    _worker_state["dpi"] = dpi
+    _worker_state["output_dir"] = output_dir
+    _worker_state["use_text_layer"] = use_text_layer
+    _worker_state["analyzer"] = LayoutAnalyzer(**layout_kwargs)
+    _worker_state["ocr_stage"] = OCRStage(**ocr_kwargs)
+
+
+def _process_page(page_idx):
+    """
+    在工作进程中处理单个页面
+
+    Returns:
+        tuple: (page_idx, blocks_info, ocr_lines, cls_stats)，cls_stats为该页的方向分类统计，由主进程汇总
+    """
+    from layout_analyzer.demo_analyzer import save_blocks_info_with_crops
+
+    page = _worker_state["doc"].load_page(page_idx)
+    img = pixmap_to_bgr(page.get_pixmap(dpi=_worker_state["dpi"]))
+
+    # 版面分析并切割特定类型的块
+    page_result = _worker_state["analyzer"].analyze_page(img, page_idx)
+    blocks_info = save_blocks_info_with_crops(
+        page_result.blocks,
+        img,
+        _worker_state["output_dir"],
+        page_idx
+    )
+
+    # OCR识别，单页失败时与串行模式一样跳过该页
+    try:
+        text_layer = extract_text_lines(page, _worker_state["dpi"]) if _worker_state["use_text_layer"] else None
+        if text_layer is not None:
+            ocr_lines = _worker_state["ocr_stage"].recognize_text_layer(text_layer, lambda: img, page_idx)
+        else:
+            ocr_lines = _worker_state["ocr_stage"].recognize_image(img, page_idx, page.rotation)
+    except Exception as e:
+        print(f"处理页面 'page_{page_idx}' 时出错: {e}")
+        ocr_lines = None
+
+    # 切割图像在OCR期间由后台线程写入，返回前确保落盘
+    get_image_writer().flush()
+    return page_idx, blocks_info, ocr_lines, _worker_state["ocr_stage"].take_cls_stats()
+
+
+class PagePool:
+    """页面级多进程处理池"""
+
+    def __init__(self, pdf_path, output_dir, num_workers=None, dpi=200,
+                 layout_kwargs=None, ocr_kwargs=None, use_text_layer=False):
+        """
+        初始化处理池
+
+        Args:
+            pdf_path: PDF文件路径
+            output_dir: 版面块切割图像的输出目录
+            num_workers: 工作进程数，默认为CPU核心数
+            dpi: 渲染分辨率
+            layout_kwargs: 传给LayoutAnalyzer的参数
+            ocr_kwargs: 传给OCRStage的参数
+            use_text_layer: 有可用PDF文本层的页面是否直接读取文本层
+        """
+        self.pdf_path = str(pdf_path)
+        self.output_dir = str(output_dir)
+        self.num_workers = num_workers or default_worker_count()
+        self.dpi = dpi
+        self.use_text_layer = use_text_layer
+
+        # 每个进程分到的线程数，未显式指定时按进程数划分CPU核心
+        num_threads = threads_per_worker(self.num_workers)
+        self.layout_kwargs = dict(layout_kwargs or {})
+        self.layout_kwargs.setdefault("intra_op_num_threads", num_threads)
+        self.ocr_kwargs = dict(ocr_kwargs or {})
+        self.ocr_kwargs.setdefault("intra_op_num_threads", num_threads)
+
+    def imap(self, page_indices=None):
+        """
+        并行处理页面，按页码顺序逐个返回结果
+
+        Args:
+            page_indices: 需要处理的页码列表，默认为全部页面
+
+        Yields:
+            tuple: (page_idx, blocks_info, ocr_lines, cls_stats)，ocr_lines为None表示该页OCR失败
+        """
+        if page_indices is None:
+            with fitz.open(self.pdf_path) as doc:
+                page_indices = list(range(len(doc)))
+        page_indices = list(page_indices)
+        if not page_indices:
+            return
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        num_workers = min(self.num_workers, len(page_indices))
+
+        # 使用spawn启动，避免fork继承父进程中的ONNX Runtime线程池和PDF文档句柄
+        ctx = multiprocessing.get_context("spawn")
+        with ctx.Pool(
+            processes=num_workers,
+            initializer=_init_worker,
+            initargs=(self.pdf_path, self.dpi, self.output_dir, self.layout_kwargs, self.ocr_kwargs,
+                      self.use_text_layer)
+        ) as pool:
+            # imap从共享任务队列中逐页分发，返回顺序与页码顺序一致
+            for result in pool.imap(_process_page, page_indices, chunksize=1):
+                yield result
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PDF文本层提取
+原生数字PDF直接读取页面文本层，输出与OCR相同结构的文本行（坐标换算到指定DPI的页面图像），
+没有可用文本的页面返回None交由OCR处理；页面内没有文本覆盖的大图片区域单独交给OCR
+"""
+
+import fitz  # PyMuPDF
+
+# 文本层可用的最少字符数（少于该值的页面视为扫描件，整页OCR）
+MIN_TEXT_CHARS = 20
+# 乱码字符（替换字符、私用区、控制字符）比例超过该值时视为字体编码损坏，整页OCR
+MAX_GARBAGE_RATIO = 0.1
+# 面积不低于页面该比例、且内部没有文本层文字的图片区域需要OCR
+MIN_IMAGE_REGION_RATIO = 0.05
+
+# 只提取文字，不读取图片数据
+TEXT_FLAGS = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+
+
+def is_garbage_char(char):
+    """无法正确解码的字符"""
+    code = ord(char)
+    return (char == "�" or 0xE000 <= code <= 0xF8FF
+            or (code < 0x20 and char not in "\t\n\r"))
+
+
+def rect_to_points(rect):
+    """矩形转换为与OCR一致的四点坐标（左上、右上、右下、左下）"""
+    return [[rect.x0, rect.y0], [rect.x1, rect.y0], [rect.x1, rect.y1], [rect.x0, rect.y1]]
+
+
+def extract_text_lines(page, dpi=200):
+    """
+    提取页面文本层
+
+    Args:
+        page: fitz.Page
+        dpi: 页面图像的渲染分辨率，文本行坐标换算到该分辨率（已包含页面/Rotate旋转）
+
+    Returns:
+        (lines, regions) 或 None:
+            lines: 文本行列表，每项包含 illegibility/points/score/transcription，与OCRStage的输出一致
+            regions: 需要OCR的图片区域 [x1, y1, x2, y2]（页面图像坐标）
+            文本层不可用时返回None
+    """
+    # 文本层坐标为未旋转的页面坐标，先按/Rotate旋转再缩放到渲染分辨率
+    matrix = page.rotation_matrix * fitz.Matrix(dpi / 72, dpi / 72)
+    text_dict = page.get_text("dict", flags=TEXT_FLAGS)
+
+    lines = []
+    text_rects = []
+    num_chars = 0
+    num_garbage = 0
+    for block in text_dict["blocks"]:
+        for line in block.get("lines", []):
+            text = "".join(span["text"] for span in line["spans"]).strip()
+            if not text:
+                continue
+            num_chars += len(text)
+            num_garbage += sum(is_garbage_char(char) for char in text)
+
+            rect = fitz.Rect(line["bbox"]) * matrix
+            text_rects.append(rect)
+            lines.append({
+                "illegibility": False,
+                "points": rect_to_points(rect),
+                "score": 1.0,
+                "transcription": text
+            })
+
+    if num_chars < MIN_TEXT_CHARS or num_garbage > MAX_GARBAGE_RATIO * num_chars:
+        return None
+
+    # 没有文本层文字的大图片（如插图中的文字、扫描的局部）交给OCR
+    page_rect = page.rect * fitz.Matrix(dpi / 72, dpi / 72)
+    min_area = MIN_IMAGE_REGION_RATIO * page_rect.width * page_rect.height
+    regions = []
+    for image_info in page.get_image_info():
+        rect = (fitz.Rect(image_info["bbox"]) * matrix) & page_rect
+        if rect.is_empty or rect.width * rect.height < min_area:
+            continue
+        if any(rect.contains((text_rect.tl + text_rect.br) / 2) for text_rect in text_rects):
+            continue
+        regions.append([int(rect.x0), int(rect.y0), int(rect.x1 + 0.5), int(rect.y1 + 0.5)])
+    return lines, regions
@@ -10,7 +10,6 @@ import sys
 import json
 import shutil
 import argparse
-import subprocess
 from pathlib import Path
 import re
 import cv2
@@ -35,22 +34,78 @@ except ImportError as e:
     save_blocks_info_with_crops = None
 
 try:
-    from ppocr.convert_points_to_bbox import convert_to_flat_format
+    from ppocr.convert_points_to_bbox import convert_to_flat_format, flatten_ocr_results
 except ImportError as e:
     print(f"警告: 无法导入convert_to_flat_format: {e}")
     convert_to_flat_format = None
+    flatten_ocr_results = None
 
 try:
-    from merge_blocks_ocr import merge_blocks_and_ocr
+    from ppocr.ocr_stage import OCRStage, report_cls_stats
+except ImportError as e:
+    print(f"警告: 无法导入OCRStage: {e}")
+    OCRStage = None
+    report_cls_stats = None
+
+try:
+    from page_images import PDFPageImages
+except ImportError as e:
+    print(f"警告: 无法导入PDFPageImages: {e}")
+    PDFPageImages = None
+
+try:
+    from page_cache import PageResultCache, DEFAULT_CACHE_SIZE_MB, config_fingerprint
+except ImportError as e:
+    print(f"警告: 无法导入PageResultCache: {e}")
+    PageResultCache = None
+    DEFAULT_CACHE_SIZE_MB = 1024
+    config_fingerprint = None
+
+try:
+    from pipeline_manifest import PipelineManifest, file_sha256
+except ImportError as e:
+    print(f"警告: 无法导入PipelineManifest: {e}")
+    PipelineManifest = None
+    file_sha256 = None
+
+try:
+    from image_writer import get_image_writer
+except ImportError as e:
+    print(f"警告: 无法导入get_image_writer: {e}")
+    get_image_writer = None
+
+try:
+    from page_pool import PagePool
+except ImportError as e:
+    print(f"警告: 无法导入PagePool: {e}")
+    PagePool = None
+
+try:
+    from onnx_sessions import configure_sessions
+except ImportError as e:
+    print(f"警告: 无法导入configure_sessions: {e}")
+    configure_sessions = None
+
+try:
+    from merge_blocks_ocr import merge_blocks_and_ocr, merge_page_blocks_and_ocr
 except ImportError as e:
     print(f"警告: 无法导入merge_blocks_and_ocr: {e}")
     merge_blocks_and_ocr = None
+    merge_page_blocks_and_ocr = None
 
 try:
-    from textbox_reading_order import process_textboxes_reading_order
+    from textbox_reading_order import (
+        process_textboxes_reading_order,
+        load_layoutreader_model,
+        sort_page_textboxes,
+        build_reading_order_output,
+    )
 except ImportError as e:
     print(f"警告: 无法导入process_textboxes_reading_order: {e}")
     process_textboxes_reading_order = None
+    load_layoutreader_model = None
+    sort_page_textboxes = None
+    build_reading_order_output = None
 
 try:
     from json_to_markdown_content import convert_json_to_markdown
@@ -59,18 +114,67 @@ except ImportError as e:
     convert_json_to_markdown = None
 
 
+# 模型精度：fp32，或int8（需先用quantize_models.py生成量化模型）
+MODEL_PRECISION = os.environ.get("MODEL_PRECISION", "fp32")
+
+# 原生数字PDF的页面优先读取PDF文本层，只有没有可用文本的页面或图片区域才做OCR
+USE_PDF_TEXT_LAYER = os.environ.get("PDF_TEXT_LAYER", "1") != "0"
+
+# 版面分析可视化（逐页PNG与汇总PDF）只用于调试，默认不生成
+SAVE_LAYOUT_VISUALIZATION = os.environ.get("LAYOUT_VISUALIZATION", "0") == "1"
+
+# 版面分析与OCR的模型参数（主进程与多进程工作进程共用）
+LAYOUT_ANALYZER_KWARGS = {
+    "model_type": "doclayout_docstructbench",
+    "conf_thres": 0.25,
+    "iou_thres": 0.5,
+    "use_cuda": False,  # 先用CPU模式确保兼容性
+    "precision": MODEL_PRECISION,
+    # 输入尺寸保持square：rect与fast_input_size需先在本地语料上用benchmark_layout_resolution.py
+    # 生成相对square的召回率/IoU报告，报告随改动提交后再在此处开放配置
+}
+OCR_STAGE_KWARGS = {
+    "use_angle_cls": True,
+    "use_gpu": True,
+    "precision": MODEL_PRECISION,
+}
+
+# 断点续跑时逐页检查点（页面结果缓存）的大小上限（MB）
+CHECKPOINT_SIZE_MB = 10240
+
+# 清单中的步骤名称与显示名称
+STEP_DISPLAY_NAMES = {
+    "layout": "版面分析",
+    "ocr": "OCR识别与格式转换",
+    "merge": "合并版面块和OCR",
+    "sort": "文本框阅读顺序排序",
+}
+
+
 class DocumentProcessingPipeline:
     """文档处理流水线"""
     
-    def __init__(self, input_pdf_path, output_base_dir="results"):
+    def __init__(self, input_pdf_path, output_base_dir="results", ocr_stage=None,
+                 cache_dir=None, cache_size_mb=DEFAULT_CACHE_SIZE_MB, layout_analyzer=None,
+                 save_visualization=None, cancel_event=None):
         """
         初始化流水线
         
         Args:
             input_pdf_path: 输入PDF文件路径
             output_base_dir: 输出基础目录
+            ocr_stage: 可选的OCRStage实例，为None时按需创建（同进程内共享模型）
+            cache_dir: 页面结果缓存目录，为None时不使用缓存
+            cache_size_mb: 页面结果缓存大小上限（MB）
+            layout_analyzer: 可选的LayoutAnalyzer实例，为None时按需创建（常驻进程可传入共享实例）
+            save_visualization: 是否保存版面分析可视化结果，为None时由环境变量LAYOUT_VISUALIZATION决定
+            cancel_event: 可选的threading.Event，设置后流水线在步骤之间（流式模式下在页面之间）停止
         """
+        self.cancel_event = cancel_event
         self.input_pdf_path = Path(input_pdf_path)
+        self.save_visualization = (
+            SAVE_LAYOUT_VISUALIZATION if save_visualization is None else save_visualization
+        )
         self.output_base_dir = Path(output_base_dir)
         
         # 生成输出目录（基于输入文件名）
@@ -84,12 +188,28 @@ class DocumentProcessingPipeline:
         # 各阶段输出文件路径
         self.layout_output_dir = self.temp_dir / "layout_output"
         self.blocks_info_file = self.temp_dir / f"{self.pdf_name}_blocks_info.json"
-        self.ppocr_output_file = self.temp_dir / f"{self.pdf_name}_ppocr_results.json"
         self.ppocr_bbox_file = self.temp_dir / f"{self.pdf_name}_ppocr_bbox.json"
         self.merged_file = self.temp_dir / f"{self.pdf_name}_merged.json"
         self.sorted_file = self.temp_dir / f"{self.pdf_name}_sorted.json"
         self.final_markdown = self.output_dir / f"{self.pdf_name}.md"
         
+        # 断点续跑：中间产物清单与逐页检查点
+        self.manifest_file = self.temp_dir / "manifest.json"
+        self.checkpoint_dir = self.temp_dir / "checkpoints"
+        self.manifest = None
+        
+        # 页面结果缓存：页面内容与模型配置都未变化时跳过版面分析和OCR推理
+        self.cache = None
+        if cache_dir and PageResultCache is not None:
+            self.cache = PageResultCache(cache_dir, max_size_mb=cache_size_mb)
+        
+        # 版面分析器与进程内OCR阶段
+        self.layout_analyzer = layout_analyzer
+        self.ocr_stage = ocr_stage
+        
+        # 版面分析与OCR共享的页面图像（每页只渲染一次）
+        self.page_images = None
+        
         # 计时相关变量
         self.timing_results = {}
         self.pipeline_start_time = None
@@ -97,6 +217,13 @@ class DocumentProcessingPipeline:
         # 创建必要的目录
         self._create_directories()
     
+    def _is_cancelled(self):
+        """检查任务是否已被取消"""
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            print("⛔ 任务已取消，流水线终止")
+            return True
+        return False
+    
     def _format_duration(self, seconds):
         """格式化时间显示"""
         if seconds < 60:
@@ -141,23 +268,22 @@ class DocumentProcessingPipeline:
         
         try:
             # 创建版面分析器
-            analyzer = LayoutAnalyzer(
-                model_type="doclayout_docstructbench",
-                conf_thres=0.25,
-                iou_thres=0.5,
-                use_cuda=False  # 先用CPU模式确保兼容性
-            )
-            
-            # 分析PDF
-            result = analyzer.analyze_pdf(str(self.input_pdf_path))
+            analyzer = self._get_layout_analyzer()
             
-            # 保存可视化结果
-            saved_paths = analyzer.visualize_result(
-                result, 
-                str(self.layout_output_dir), 
-                save_pdf=True
+            # 分析PDF（与OCR共享页面图像）
+            result = analyzer.analyze_pdf(
+                str(self.input_pdf_path),
+                page_images=self.page_images
             )
             
+            # 保存可视化结果（调试用）
+            if self.save_visualization:
+                analyzer.visualize_result(
+                    result, 
+                    str(self.layout_output_dir), 
+                    save_pdf=True
+                )
+            
             # 保存blocks信息并切割特定类型的块（不保存完整页面图像）
             all_blocks_info = []
             crop_counts = {"figure": 0, "isolate_formula": 0, "table": 0}
@@ -189,6 +315,9 @@ class DocumentProcessingPipeline:
             # 保存blocks信息到JSON文件
             with open(self.blocks_info_file, "w", encoding="utf-8") as f:
                 json.dump(all_blocks_info, f, ensure_ascii=False, indent=2)
+            # 切割图像由后台线程写入，记录步骤完成前确保落盘
+            get_image_writer().flush()
+            self._mark_layout_done(all_blocks_info)
             
             step_duration = time.time() - step_start_time
             self._print_timing_info("版面分析", step_duration)
@@ -202,22 +331,33 @@ class DocumentProcessingPipeline:
             print(f"❌ 版面分析失败: {e}")
             return False
     
+    def _get_layout_analyzer(self):
+        """获取版面分析器（同一流水线内只创建一次）"""
+        if self.layout_analyzer is None:
+            self.layout_analyzer = LayoutAnalyzer(**LAYOUT_ANALYZER_KWARGS, cache=self.cache)
+        return self.layout_analyzer
+    
+    def _get_ocr_stage(self):
+        """获取进程内OCR阶段（模型会话在进程内常驻复用）"""
+        if self.ocr_stage is None:
+            self.ocr_stage = OCRStage(**OCR_STAGE_KWARGS, cache=self.cache)
+        return self.ocr_stage
+    
     def step2_ocr_recognition_and_format(self):
-        """步骤2: OCR识别与格式转换 - 使用ONNX OCR脚本直接处理PDF文件"""
+        """步骤2: OCR识别与格式转换 - 在当前进程内直接识别PDF页面"""
         print("=" * 60)
         print("步骤2: 开始OCR识别与格式转换...")
         step_start_time = time.time()
         
+        if OCRStage is None:
+            print("❌ OCRStage模块未正确导入")
+            return False
+        
+        if convert_to_flat_format is None:
+            print("❌ convert_to_flat_format模块未正确导入")
+            return False
+        
         try:
-            # 使用新的ONNX OCR脚本
-            ocr_script = Path(__file__).parent / "ppocr" / "onnx_ocr.py"
-            onnxocr_dir = Path(__file__).parent / "ppocr"
-            
-            if not ocr_script.exists():
-                print(f"❌ ONNX OCR脚本不存在: {ocr_script}")
-                return False
-            
-            # 直接使用PDF文件作为输入
             pdf_path = self.input_pdf_path
             if not pdf_path.exists():
                 print(f"❌ PDF文件不存在: {pdf_path}")
@@ -225,94 +365,30 @@ class DocumentProcessingPipeline:
             
             print(f"📄 开始OCR文字识别...")
             
-            # 构建新的OCR命令 - 使用ONNX OCR脚本
-            cmd = [
-                "python", "onnx_ocr.py",
-                "--input", str(pdf_path.absolute()),
-                "--output_name", self.pdf_name,
-                "--output_dir", "results"
-            ]
-            
-            # 在ppocr目录下执行命令
-            print(f"🔄 正在执行ONNX OCR识别...")
-            
-            result = subprocess.run(
-                cmd,
-                cwd=str(onnxocr_dir),
-                capture_output=True,
-                text=True
-            )
-            
-            if result.returncode != 0:
-                print(f"❌ OCR执行失败，返回码: {result.returncode}")
-                if result.stderr:
-                    print(f"错误信息: {result.stderr}")
-                if result.stdout:
-                    print(f"输出信息: {result.stdout}")
-                return False
-            
-            # 查找生成的OCR结果文件
-            print(f"🔍 查找OCR结果文件...")
-            
-            # 根据新的命名格式构建期望的文件名
-            expected_filename = f"{self.pdf_name}_ppocr_results.json"
-            expected_file_path = onnxocr_dir / "results" / expected_filename
-            
-            ocr_result_file = None
-            
-            # 首先尝试精确匹配
-            if expected_file_path.exists():
-                ocr_result_file = expected_file_path
-                print(f"✅ 找到OCR结果文件: {expected_file_path}")
+            # 复用常驻的OCR模型，直接识别内存中的页面图像
+            if self.page_images is not None:
+                ocr_results = self._get_ocr_stage().recognize_page_images(
+                    self.page_images, use_text_layer=USE_PDF_TEXT_LAYER
+                )
             else:
-                # 列出results目录中的所有文件以便调试
-                results_dir = onnxocr_dir / "results"
-                if results_dir.exists():
-                    result_files = list(results_dir.glob("*.json"))
-                    print(f"📂 results目录中的文件: {[f.name for f in result_files]}")
-                    
-                    # 尝试查找包含PDF名称的文件
-                    for result_file in result_files:
-                        if self.pdf_name in result_file.name and "ppocr_results" in result_file.name:
-                            ocr_result_file = result_file
-                            print(f"✅ 找到匹配的OCR结果文件: {result_file}")
-                            break
-                
-                # 如果仍然没找到，回退到通用搜索
-                if not ocr_result_file:
-                    print("🔄 尝试通用搜索...")
-                    possible_patterns = ["*results*.json", "*result*.json", "*.json"]
-                    
-                    for pattern in possible_patterns:
-                        matching_files = list(results_dir.glob(pattern))
-                        if matching_files:
-                            # 选择最新的文件
-                            ocr_result_file = max(matching_files, key=lambda f: f.stat().st_mtime)
-                            print(f"✅ 找到最新的结果文件: {ocr_result_file}")
-                            break
-            
-            if not ocr_result_file:
+                ocr_results = self._get_ocr_stage().recognize_pdf(pdf_path)
+            
+            if not ocr_results:
                 step_duration = time.time() - step_start_time
                 self._print_timing_info("OCR识别（失败）", step_duration)
-                print("❌ 未找到OCR结果文件")
+                print("❌ 未得到任何OCR结果")
                 return False
             
-            # 复制结果文件到期望的位置
-            shutil.copy2(ocr_result_file, self.ppocr_output_file)
             print(f"✅ OCR识别完成")
             
-            # 立即进行格式转换
+            # 立即进行格式转换（直接使用内存中的结果）
             print("🔄 开始转换OCR格式...")
             
-            if convert_to_flat_format is None:
-                print("❌ convert_to_flat_format模块未正确导入")
-                return False
-            
-            # 使用convert_points_to_bbox转换格式
             flat_results = convert_to_flat_format(
-                str(self.ppocr_output_file),
+                ocr_results,
                 str(self.ppocr_bbox_file)
             )
+            self._mark_step_done("ocr", self.ppocr_bbox_file)
             
             step_duration = time.time() - step_start_time
             self._print_timing_info("OCR识别与格式转换", step_duration)
@@ -344,6 +420,7 @@ class DocumentProcessingPipeline:
                 str(self.ppocr_bbox_file),
                 str(self.merged_file)
             )
+            self._mark_step_done("merge", self.merged_file)
             
             print(f"✅ 合并完成")
             return True
@@ -368,6 +445,7 @@ class DocumentProcessingPipeline:
                 str(self.merged_file),
                 str(self.sorted_file)
             )
+            self._mark_step_done("sort", self.sorted_file)
             
             step_duration = time.time() - step_start_time
             self._print_timing_info("阅读顺序识别", step_duration)
@@ -503,16 +581,257 @@ class DocumentProcessingPipeline:
         except Exception as e:
             print(f"❌ 更新Markdown图片路径失败: {e}")
     
-    def cleanup_temp_files(self):
-        """清理临时文件，但保留images目录"""
+    def iter_pages(self, page_window=2):
+        """
+        流式逐页处理
+        
+        每个页面依次完成版面分析、OCR、合并和阅读顺序排序，随后立即释放页面像素，
+        同时驻留内存的页面数量由page_window决定，与文档总页数无关
+        
+        Args:
+            page_window: 预渲染的页面窗口大小
+        
+        Yields:
+            dict: 单页结果，包含page_idx、blocks_info、ocr_results、merged、sorted；
+                没有版面块的页面merged和sorted为None（与merge_blocks_and_ocr行为一致）
+        """
+        analyzer = self._get_layout_analyzer()
+        ocr_stage = self._get_ocr_stage()
+        model = load_layoutreader_model()
+        global_textbox_order = 0
+        
+        with PDFPageImages(self.input_pdf_path, dpi=200) as page_images:
+            for page_idx, img in page_images.stream(page_window):
+                # 版面分析并切割特定类型的块
+                step_start_time = time.time()
+                page_result = analyzer.analyze_page(img, page_idx)
+                blocks_info = save_blocks_info_with_crops(
+                    page_result.blocks,
+                    img,
+                    str(self.layout_output_dir),
+                    page_idx
+                )
+                self._add_timing("版面分析", time.time() - step_start_time)
+                
+                # OCR识别与格式转换
+                step_start_time = time.time()
+                text_layer = page_images.text_layer(page_idx) if USE_PDF_TEXT_LAYER else None
+                if text_layer is not None:
+                    ocr_lines = ocr_stage.recognize_text_layer(text_layer, lambda: img, page_idx)
+                else:
+                    ocr_lines = ocr_stage.recognize_image(img, page_idx, page_images.page_rotation(page_idx))
+                ocr_results = flatten_ocr_results({f"page_{page_idx}": ocr_lines})
+                self._add_timing("OCR识别与格式转换", time.time() - step_start_time)
+                
+                # 之后的步骤只需要坐标和文本，释放页面像素
+                del page_result, img
+                
+                merged_page = None
+                sorted_page = None
+                if blocks_info:
+                    page_key = f"page{page_idx}"
+                    merged_page = merge_page_blocks_and_ocr(page_idx, blocks_info, ocr_results)
+                    
+                    step_start_time = time.time()
+                    sorted_page, global_textbox_order = sort_page_textboxes(
+                        page_key, merged_page, model, global_textbox_order
+                    )
+                    self._add_timing("阅读顺序识别", time.time() - step_start_time)
+                
+                yield {
+                    "page_idx": page_idx,
+                    "blocks_info": blocks_info,
+                    "ocr_results": ocr_results,
+                    "merged": merged_page,
+                    "sorted": sorted_page,
+                }
+        # 切割图像由后台线程写入，结束前确保落盘
+        get_image_writer().flush()
+        ocr_stage.report_cls_stats()
+    
+    def _add_timing(self, step_name, duration):
+        """累加逐页处理中各阶段的耗时"""
+        self.timing_results[step_name] = self.timing_results.get(step_name, 0) + duration
+    
+    def _run_streaming_steps(self, page_window=2):
+        """以流式逐页的方式完成步骤1至步骤4"""
+        print("=" * 60)
+        print(f"🔄 流式逐页执行步骤1至步骤4（页面窗口: {page_window}）...")
+        streaming_start_time = time.time()
+        
+        required_modules = [
+            LayoutAnalyzer, save_blocks_info_with_crops, get_image_writer, OCRStage, flatten_ocr_results,
+            merge_page_blocks_and_ocr, load_layoutreader_model, sort_page_textboxes, PDFPageImages,
+        ]
+        if any(module is None for module in required_modules):
+            print("❌ 流式处理所需模块未正确导入")
+            return False
+        
+        all_blocks_info = []
+        all_ocr_results = []
+        merged_result = {}
+        sorted_pages = {}
+        
+        try:
+            for page in self.iter_pages(page_window):
+                page_idx = page["page_idx"]
+                all_blocks_info.extend(page["blocks_info"])
+                all_ocr_results.extend(page["ocr_results"])
+                if page["merged"] is not None:
+                    merged_result[f"page{page_idx}"] = page["merged"]
+                    sorted_pages[f"page{page_idx}"] = page["sorted"]
+                print(f"✅ 第{page_idx + 1}页处理完成")
+                if self._is_cancelled():
+                    return False
+            
+            # 保存各阶段的中间结果，与非流式模式的文件保持一致
+            with open(self.blocks_info_file, "w", encoding="utf-8") as f:
+                json.dump(all_blocks_info, f, ensure_ascii=False, indent=2)
+            with open(self.ppocr_bbox_file, "w", encoding="utf-8") as f:
+                json.dump(all_ocr_results, f, ensure_ascii=False, indent=2)
+            with open(self.merged_file, "w", encoding="utf-8") as f:
+                json.dump(merged_result, f, ensure_ascii=False, indent=2)
+            with open(self.sorted_file, "w", encoding="utf-8") as f:
+                json.dump(build_reading_order_output(sorted_pages), f, ensure_ascii=False, indent=2)
+            
+            self._mark_layout_done(all_blocks_info)
+            self._mark_step_done("ocr", self.ppocr_bbox_file)
+            self._mark_step_done("merge", self.merged_file)
+            self._mark_step_done("sort", self.sorted_file)
+            
+        except Exception as e:
+            streaming_duration = time.time() - streaming_start_time
+            self._print_timing_info("流式逐页处理（失败）", streaming_duration)
+            print(f"❌ 流式逐页处理失败: {e}")
+            import traceback
+            traceback.print_exc()
+            return False
+        
+        streaming_duration = time.time() - streaming_start_time
+        self._print_timing_info("流式逐页处理", streaming_duration)
+        print(f"✅ 流式逐页处理完成，共处理 {len(sorted_pages)} 页")
+        return True
+    
+    def _run_pool_steps(self, num_workers=None):
+        """使用多进程按页并行执行步骤1和步骤2，返回成功的步骤数"""
+        print("=" * 60)
+        print("步骤1: 开始版面分析...")
+        print("步骤2: 开始OCR识别与格式转换...")
+        
+        if PagePool is None or flatten_ocr_results is None:
+            print("❌ 多进程页面处理所需模块未正确导入")
+            return 0
+        
+        pool = PagePool(
+            self.input_pdf_path,
+            self.layout_output_dir,
+            num_workers=num_workers,
+            dpi=200,
+            layout_kwargs=dict(LAYOUT_ANALYZER_KWARGS, cache=self.cache),
+            ocr_kwargs=dict(OCR_STAGE_KWARGS, cache=self.cache),
+            use_text_layer=USE_PDF_TEXT_LAYER
+        )
+        print(f"🔄 使用 {pool.num_workers} 个进程按页并行执行步骤1和步骤2...")
+        pool_start_time = time.time()
+        
+        all_blocks_info = []
+        ocr_results = {}
+        cls_stats = {}
+        total_pages = 0
+        
+        try:
+            # 结果按页码顺序返回
+            for page_idx, blocks_info, ocr_lines, page_cls_stats in pool.imap():
+                total_pages += 1
+                all_blocks_info.extend(blocks_info)
+                if ocr_lines is not None:
+                    ocr_results[f"page_{page_idx}"] = ocr_lines
+                for key, value in page_cls_stats.items():
+                    cls_stats[key] = cls_stats.get(key, 0) + value
+            if report_cls_stats is not None:
+                report_cls_stats(cls_stats)
+            
+            with open(self.blocks_info_file, "w", encoding="utf-8") as f:
+                json.dump(all_blocks_info, f, ensure_ascii=False, indent=2)
+            self._mark_layout_done(all_blocks_info)
+            print(f"✅ 版面分析完成，共分析 {total_pages} 页")
+            
+            if not ocr_results:
+                print("❌ 未得到任何OCR结果")
+                return 1
+            
+            print(f"✅ OCR识别完成")
+            convert_to_flat_format(ocr_results, str(self.ppocr_bbox_file))
+            self._mark_step_done("ocr", self.ppocr_bbox_file)
+            print(f"✅ OCR识别与格式转换全部完成")
+            
+        except Exception as e:
+            pool_duration = time.time() - pool_start_time
+            self._print_timing_info("多进程页面处理（失败）", pool_duration)
+            print(f"❌ 多进程页面处理失败: {e}")
+            import traceback
+            traceback.print_exc()
+            return 0
+        
+        pool_duration = time.time() - pool_start_time
+        self._print_timing_info("多进程页面处理", pool_duration)
+        return 2
+    
+    def _init_manifest(self):
+        """加载中间产物清单，输入PDF或模型配置变化时清单自动失效"""
+        if PipelineManifest is None or config_fingerprint is None:
+            return None
+        try:
+            input_hash = file_sha256(self.input_pdf_path)
+            fingerprint = config_fingerprint(
+                layout=LAYOUT_ANALYZER_KWARGS,
+                ocr=OCR_STAGE_KWARGS,
+                text_layer=USE_PDF_TEXT_LAYER,
+                dpi=200
+            )
+            self.manifest = PipelineManifest(self.manifest_file, input_hash, fingerprint)
+        except Exception as e:
+            print(f"⚠️  加载中间产物清单失败: {e}")
+            self.manifest = None
+        return self.manifest
+    
+    def _mark_step_done(self, step, artifact, extra_files=None):
+        """在清单中记录步骤完成"""
+        if self.manifest is None:
+            return
+        try:
+            self.manifest.mark_done(step, artifact, extra_files)
+        except Exception as e:
+            print(f"⚠️  更新中间产物清单失败: {e}")
+    
+    def _mark_layout_done(self, all_blocks_info):
+        """记录版面分析完成，切割图像也作为该步骤的产物"""
+        crop_files = [block["crop_image_path"] for block in all_blocks_info if block.get("crop_image_path")]
+        self._mark_step_done("layout", self.blocks_info_file, crop_files)
+    
+    def cleanup_temp_files(self, keep_intermediate=False):
+        """清理临时文件，但保留images目录
+        
+        Args:
+            keep_intermediate: 是否保留清单记录的中间产物，供下次断点续跑复用
+        """
         try:
             if self.temp_dir.exists():
                 # 清理temp目录，但保留重要的输出文件
                 print("🧹 开始清理临时文件...")
                 
+                keep_items = set()
+                if keep_intermediate:
+                    keep_items = {
+                        self.manifest_file, self.blocks_info_file, self.ppocr_bbox_file,
+                        self.merged_file, self.sorted_file, self.layout_output_dir,
+                    }
+                
                 # 列出要删除的文件类型
                 temp_files_deleted = 0
                 for item in self.temp_dir.iterdir():
+                    if item in keep_items:
+                        continue
                     if item.is_file():
                         try:
                             item.unlink()
@@ -534,47 +853,77 @@ class DocumentProcessingPipeline:
         except Exception as e:
             print(f"❌ 清理临时文件失败: {e}")
     
-    def run_pipeline(self, cleanup=True, parallel_execution=True):
+    def run_pipeline(self, cleanup=True, parallel_execution=True, streaming=False, page_window=2,
+                     workers=0, resume=False):
         """运行完整流水线
         
         Args:
             cleanup: 是否清理临时文件
             parallel_execution: 是否并行执行步骤1和步骤2
+            streaming: 是否流式逐页执行步骤1至步骤4（内存占用与页数无关）
+            page_window: 流式模式下预渲染的页面窗口大小
+            workers: 大于1时使用多进程按页并行执行步骤1和步骤2
+            resume: 断点续跑，跳过中间产物仍然有效的步骤，并按页保存检查点
+        
+        ONNX会话的线程预算是进程级配置，在首次加载模型时固定，不随单次运行的执行模式变化
+        （见onnx_sessions.configure_sessions）
         """
         print(f"📄 开始处理文件: {self.input_pdf_path.name}")
-        print(f"🚀 执行模式: {'并行执行' if parallel_execution else '顺序执行'}")
+        if streaming:
+            print(f"🚀 执行模式: 流式逐页执行")
+        elif workers > 1:
+            print(f"🚀 执行模式: 多进程按页并行执行（{workers} 个进程）")
+        else:
+            print(f"🚀 执行模式: {'并行执行' if parallel_execution else '顺序执行'}")
         
         # 记录总流程开始时间
         self.pipeline_start_time = time.time()
         
-        if parallel_execution:
-            # 并行执行步骤1和步骤2
-            success_count = self._run_parallel_steps()
-            if success_count < 2:
+        # 加载中间产物清单，确定需要重新执行的步骤
+        self._init_manifest()
+        stale_steps = set(STEP_DISPLAY_NAMES)
+        if resume:
+            if self.manifest is not None:
+                stale_steps = self.manifest.stale_steps()
+            self._print_resume_plan(stale_steps)
+            
+            # 逐页检查点：中途失败后重跑时，已完成页面直接从检查点读取
+            if self.cache is None and PageResultCache is not None:
+                self.cache = PageResultCache(self.checkpoint_dir, max_size_mb=CHECKPOINT_SIZE_MB)
+        
+        if self._is_cancelled():
+            return False
+        
+        if streaming:
+            if stale_steps and not self._run_streaming_steps(page_window):
                 return False
+            success_count = 4
+            sequential_steps = [
+                ("生成Markdown文档", self.step5_generate_markdown),
+            ]
         else:
-            # 顺序执行所有步骤
-            steps = [
-                ("版面分析", self.step1_layout_analysis),
-                ("OCR识别与格式转换", self.step2_ocr_recognition_and_format),
+            if workers > 1 and stale_steps & {"layout", "ocr"}:
+                success_count = self._run_pool_steps(workers)
+            else:
+                success_count = self._run_layout_and_ocr_steps(parallel_execution, stale_steps)
+            if success_count < 2:
+                return False
+            
+            # 继续执行后续步骤（这些步骤需要顺序执行）
+            sequential_steps = [
+                ("合并版面块和OCR", self.step3_merge_blocks_ocr),
+                ("文本框阅读顺序排序", self.step4_sort_reading_order),
+                ("生成Markdown文档", self.step5_generate_markdown),
             ]
             
-            success_count = 0
-            for step_name, step_func in steps:
-                if step_func():
-                    success_count += 1
-                else:
-                    print(f"步骤 '{step_name}' 失败，流水线终止")
-                    return False
-        
-        # 继续执行后续步骤（这些步骤需要顺序执行）
-        sequential_steps = [
-            ("合并版面块和OCR", self.step3_merge_blocks_ocr),
-            ("文本框阅读顺序排序", self.step4_sort_reading_order),
-            ("生成Markdown文档", self.step5_generate_markdown),
-        ]
+            # 跳过中间产物仍然有效的步骤
+            skipped_steps = [STEP_DISPLAY_NAMES[step] for step in ("merge", "sort") if step not in stale_steps]
+            success_count += len(skipped_steps)
+            sequential_steps = [step for step in sequential_steps if step[0] not in skipped_steps]
         
         for step_name, step_func in sequential_steps:
+            if self._is_cancelled():
+                break
             if step_func():
                 success_count += 1
             else:
@@ -588,9 +937,9 @@ class DocumentProcessingPipeline:
         total_steps = 5  # 总共5个步骤
         self._print_timing_report(total_duration, success_count, total_steps)
         
-        # 清理临时文件
+        # 清理临时文件（续跑模式保留中间产物，供下次复用）
         if cleanup and success_count == total_steps:
-            self.cleanup_temp_files()
+            self.cleanup_temp_files(keep_intermediate=resume)
         
         # 输出结果
         if success_count == total_steps:
@@ -603,6 +952,55 @@ class DocumentProcessingPipeline:
         
         return success_count == total_steps
     
+    def _print_resume_plan(self, stale_steps):
+        """打印断点续跑计划"""
+        print("=" * 60)
+        for step, display_name in STEP_DISPLAY_NAMES.items():
+            if step in stale_steps:
+                print(f"🔁 {display_name}: 需要重新执行")
+            else:
+                print(f"⏭️  {display_name}: 中间产物有效，跳过")
+    
+    def _run_layout_and_ocr_steps(self, parallel_execution=True, stale_steps=None):
+        """执行步骤1和步骤2，返回成功的步骤数（跳过的步骤计为成功）"""
+        steps = [
+            ("版面分析", self.step1_layout_analysis),
+            ("OCR识别与格式转换", self.step2_ocr_recognition_and_format),
+        ]
+        if stale_steps is not None:
+            steps = [
+                step for step, key in zip(steps, ("layout", "ocr"))
+                if key in stale_steps
+            ]
+        skipped_count = 2 - len(steps)
+        if not steps:
+            return skipped_count
+        
+        # 步骤1和步骤2共享同一份页面图像，两个步骤完成后释放
+        if PDFPageImages is not None:
+            self.page_images = PDFPageImages(self.input_pdf_path, dpi=200)
+        
+        try:
+            if parallel_execution and len(steps) == 2:
+                # 并行执行步骤1和步骤2
+                return self._run_parallel_steps()
+            
+            # 顺序执行所有步骤
+            success_count = skipped_count
+            for step_name, step_func in steps:
+                if self._is_cancelled():
+                    break
+                if step_func():
+                    success_count += 1
+                else:
+                    print(f"步骤 '{step_name}' 失败，流水线终止")
+                    break
+            return success_count
+        finally:
+            if self.page_images is not None:
+                self.page_images.close()
+                self.page_images = None
+    
     def _run_parallel_steps(self):
         """并行执行步骤1和步骤2"""
         print("=" * 60)
@@ -650,6 +1048,15 @@ class DocumentProcessingPipeline:
         # 打印各步骤耗时
         key_steps = ["版面分析", "OCR识别与格式转换", "阅读顺序识别"]
         
+        if "多进程页面处理" in self.timing_results:
+            formatted_time = self._format_duration(self.timing_results["多进程页面处理"])
+            print(f"📊 {'多进程页面处理':<16}: {formatted_time}")
+        
+        # 流式模式下各阶段逐页交替执行，逐项耗时为累计值，总耗时单独统计
+        if "流式逐页处理" in self.timing_results:
+            formatted_time = self._format_duration(self.timing_results["流式逐页处理"])
+            print(f"📊 {'流式逐页处理':<16}: {formatted_time}")
+        
         for step_name in key_steps:
             if step_name in self.timing_results:
                 formatted_time = self._format_duration(self.timing_results[step_name])
@@ -659,7 +1066,7 @@ class DocumentProcessingPipeline:
         layout_time = self.timing_results.get("版面分析", 0)
         ocr_time = self.timing_results.get("OCR识别与格式转换", 0)
         
-        if layout_time > 0 and ocr_time > 0:
+        if layout_time > 0 and ocr_time > 0 and "流式逐页处理" not in self.timing_results:
             sequential_time = layout_time + ocr_time
             parallel_time = max(layout_time, ocr_time)
             time_saved = sequential_time - parallel_time
@@ -670,12 +1077,19 @@ class DocumentProcessingPipeline:
         
         # 计算其他步骤总时间
         key_steps_time = sum(self.timing_results.get(step, 0) for step in key_steps)
+        key_steps_time += self.timing_results.get("多进程页面处理", 0)
         other_steps_time = total_duration - key_steps_time
         
         if other_steps_time > 0:
             formatted_other_time = self._format_duration(other_steps_time)
             print(f"📊 {'其他步骤':<16}: {formatted_other_time}")
         
+        # 页面结果缓存命中情况（多进程模式下命中发生在工作进程中，不在此统计）
+        if self.cache is not None:
+            cache_stats = self.cache.stats()
+            if cache_stats["hits"] + cache_stats["misses"] > 0:
+                print(f"📊 {'页面缓存命中':<16}: {cache_stats['hits']}/{cache_stats['hits'] + cache_stats['misses']}")
+        
         print("-" * 60)
         formatted_total_time = self._format_duration(total_duration)
         print(f"🕐 总流程耗时: {formatted_total_time}")
@@ -695,6 +1109,13 @@ def main():
     parser.add_argument("-o", "--output", default="results", help="输出基础目录（默认：results）")
     parser.add_argument("--keep-temp", action="store_true", help="保留临时文件")
     parser.add_argument("--sequential", action="store_true", help="使用顺序执行模式（默认为并行执行）")
+    parser.add_argument("--streaming", action="store_true", help="流式逐页处理，内存占用与页数无关")
+    parser.add_argument("--page-window", type=int, default=2, help="流式模式下预渲染的页面数量（默认：2）")
+    parser.add_argument("--cache-dir", help="页面结果缓存目录，未指定时不使用缓存")
+    parser.add_argument("--cache-size-mb", type=int, default=DEFAULT_CACHE_SIZE_MB, help="页面结果缓存大小上限（MB）")
+    parser.add_argument("--resume", action="store_true", help="断点续跑：跳过中间产物仍然有效的步骤，并保留中间产物")
+    parser.add_argument("--workers", type=int, default=0, help="按页并行的进程数，大于1时启用多进程（默认：0）")
+    parser.add_argument("--visualize", action="store_true", help="保存版面分析可视化结果（逐页PNG与PDF）")
     
     args = parser.parse_args()
     
@@ -703,11 +1124,26 @@ def main():
         print(f"错误：输入文件不存在 - {args.input_pdf}")
         return 1
     
+    # 顺序/流式执行时版面分析与OCR不同时运行，两者都可以使用全部线程预算
+    # （线程预算在进程内首次创建会话时固定，必须在加载模型之前设置）
+    if configure_sessions is not None and (args.sequential or args.streaming):
+        configure_sessions(thread_shares={"layout": 1.0, "ocr": 1.0})
+    
     # 创建流水线并执行
-    pipeline = DocumentProcessingPipeline(args.input_pdf, args.output)
+    pipeline = DocumentProcessingPipeline(
+        args.input_pdf,
+        args.output,
+        cache_dir=args.cache_dir,
+        cache_size_mb=args.cache_size_mb,
+        save_visualization=args.visualize or None
+    )
     success = pipeline.run_pipeline(
         cleanup=not args.keep_temp,
-        parallel_execution=not args.sequential
+        parallel_execution=not args.sequential,
+        streaming=args.streaming,
+        page_window=args.page_window,
+        workers=args.workers,
+        resume=args.resume
     )
     
     return 0 if success else 1
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+流水线断点续跑清单
+记录输入PDF哈希、配置指纹以及各步骤中间产物的摘要，
+续跑时据此判断哪些步骤的产物仍然有效，只从第一个失效的步骤开始重新执行
+"""
+
+import os
+import json
+import hashlib
+import threading
+
+# 各步骤及其依赖的上游步骤（版面分析与OCR相互独立）
+STEP_DEPENDENCIES = {
+    "layout": [],
+    "ocr": [],
+    "merge": ["layout", "ocr"],
+    "sort": ["merge"],
+}
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    """计算文件内容的SHA256"""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class PipelineManifest:
+    """流水线中间产物清单"""
+
+    def __init__(self, manifest_file, input_hash, config_fingerprint):
+        """
+        初始化清单，输入或配置与已有清单不一致时丢弃全部记录
+
+        Args:
+            manifest_file: 清单文件路径
+            input_hash: 输入PDF的哈希
+            config_fingerprint: 模型/配置指纹
+        """
+        self.manifest_file = str(manifest_file)
+        self.input_hash = input_hash
+        self.config_fingerprint = config_fingerprint
+        self.steps = {}
+        # 版面分析与OCR可能在两个线程中同时完成
+        self._lock = threading.Lock()
+
+        data = None
+        if os.path.exists(self.manifest_file):
+            try:
+                with open(self.manifest_file, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = None
+
+        if (data and data.get("input_hash") == input_hash
+                and data.get("config_fingerprint") == config_fingerprint):
+            self.steps = data.get("steps", {})
+
+    def _is_valid(self, step):
+        """检查单个步骤记录的产物是否存在且未被修改"""
+        record = self.steps.get(step)
+        if not record:
+            return False
+
+        for path, digest in record.get("artifacts", {}).items():
+            if not os.path.exists(path):
+                return False
+            if digest is not None and file_sha256(path) != digest:
+                return False
+
+        # 上游产物变化后，本步骤的产物也随之失效
+        for upstream in STEP_DEPENDENCIES.get(step, []):
+            upstream_record = self.steps.get(upstream)
+            if not upstream_record or upstream_record.get("digest") != record.get("upstream", {}).get(upstream):
+                return False
+        return True
+
+    def stale_steps(self):
+        """
+        返回需要重新执行的步骤集合
+
+        某个步骤失效时，依赖它的所有下游步骤也视为失效
+        """
+        stale = set()
+        for step, upstreams in STEP_DEPENDENCIES.items():
+            if any(upstream in stale for upstream in upstreams) or not self._is_valid(step):
+                stale.add(step)
+        return stale
+
+    def mark_done(self, step, artifact, extra_files=None):
+        """
+        记录步骤完成并保存清单
+
+        Args:
+            step: 步骤名称
+            artifact: 步骤的主要产物文件（记录内容摘要）
+            extra_files: 步骤附带产生的其他文件（只检查是否存在）
+        """
+        artifact = str(artifact)
+        digest = file_sha256(artifact)
+        artifacts = {artifact: digest}
+        for path in extra_files or []:
+            artifacts[str(path)] = None
+
+        with self._lock:
+            self.steps[step] = {
+                "digest": digest,
+                "artifacts": artifacts,
+                "upstream": {
+                    upstream: self.steps.get(upstream, {}).get("digest")
+                    for upstream in STEP_DEPENDENCIES.get(step, [])
+                },
+            }
+            self._save()
+
+    def _save(self):
+        """原子写入清单文件"""
+        os.makedirs(os.path.dirname(self.manifest_file), exist_ok=True)
+        tmp_file = f"{self.manifest_file}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump({
+                "input_hash": self.input_hash,
+                "config_fingerprint": self.config_fingerprint,
+                "steps": self.steps,
+            }, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_file, self.manifest_file)
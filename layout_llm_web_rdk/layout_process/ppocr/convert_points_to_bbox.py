@@ -138,16 +138,16 @@ def convert_ppocr_to_bbox_format(input_file, output_file):
     
     return converted_data
 
-def convert_to_flat_format(input_file, output_file):
-    """
-    转换为扁平化的格式，类似于blocks_info.json
+def flatten_ocr_results(data):
     """
-    # print(f"正在创建扁平化格式...")
+    将按页分组的OCR结果转换为扁平化的列表，类似于blocks_info.json
     
-    # 读取原始文件
-    with open(input_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    Args:
+        data: {"page_{idx}": [文本行, ...]}，与ppocr结果JSON的结构一致
     
+    Returns:
+        list: 扁平化的文本框列表
+    """
     flat_results = []
     
     for page_key, ocr_results in data.items():
@@ -173,6 +173,27 @@ def convert_to_flat_format(input_file, output_file):
             
             flat_results.append(converted_item)
     
+    return flat_results
+
+def convert_to_flat_format(input_file, output_file):
+    """
+    转换为扁平化的格式，类似于blocks_info.json
+    
+    Args:
+        input_file: PPOCR结果文件路径，或已在内存中的按页分组结果（dict）
+        output_file: 输出文件路径
+    """
+    # print(f"正在创建扁平化格式...")
+    
+    # 读取原始文件（内存中的结果无需再经过JSON往返）
+    if isinstance(input_file, dict):
+        data = input_file
+    else:
+        with open(input_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    
+    flat_results = flatten_ocr_results(data)
+    
     # 保存转换后的文件
     # print(f"正在保存扁平化结果到: {output_file}")
     with open(output_file, 'w', encoding='utf-8') as f:
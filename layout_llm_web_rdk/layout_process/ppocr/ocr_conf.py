@@ -22,6 +22,7 @@ class OCRConfig(BaseModel):
     use_gpu: bool = Field(default=True)
     ir_optim: bool = Field(default=True)
     min_subgraph_size: int = Field(default=15)
+    # 模型精度：fp32，或int8（使用quantize_models.py生成的 *_int8.onnx 量化模型）
     precision: str = Field(default="fp32")
     gpu_mem: int = Field(default=500)
     gpu_id: int = Field(default=0)
@@ -33,11 +34,18 @@ class OCRConfig(BaseModel):
     det_limit_side_len: float = Field(default=960)
     det_limit_type: str = Field(default='max')
     det_box_type: str = Field(default='quad')
+    # 多页批量检测时每次推理的页面数
+    det_batch_num: int = Field(default=4)
 
     # DB params
     det_db_thresh: float = Field(default=0.3)
     det_db_box_thresh: float = Field(default=0.3)
     det_db_unclip_ratio: float = Field(default=1.8)
+    # DB后处理的可选阶段：分数容差（配合多边形质量检查）、同行文本框合并、低阈值补检缺失文本行
+    det_db_box_score_thres_delta: float = Field(default=0.0)
+    det_db_merge_lines: bool = Field(default=False)
+    det_db_detect_missing: bool = Field(default=False)
+    det_db_missing_thresh: float = Field(default=0.2)
     # det_db_box_thresh: float = Field(default=0.5)
     # det_db_unclip_ratio: float = Field(default=1.8)
 
@@ -72,6 +80,15 @@ class OCRConfig(BaseModel):
     rec_image_inverse: bool = Field(default=True)
     rec_image_shape: str = Field(default="3, 48, 320")
     rec_batch_num: int = Field(default=6)
+    # 多页识别时跨页合并的批大小，以及按缩放后宽度划分的分桶上界（超出最后一档的归入最后一档）
+    rec_page_batch_num: int = Field(default=24)
+    rec_width_buckets: List[int] = Field(default=[320, 640, 960, 1280])
+    # 识别组批方式：fixed按排序后固定大小切分，批内补齐到最宽的文本行；
+    # bucket按宽度分桶组批，同一批内最宽与最窄文本行的宽度比不超过rec_max_pad_ratio
+    rec_batch_mode: str = Field(default="bucket")
+    rec_max_pad_ratio: float = Field(default=1.5)
+    # bucket模式下将输入补齐到分桶宽度，并为每个分桶宽度创建固定输入形状的会话
+    rec_static_shapes: bool = Field(default=False)
     max_text_length: int = Field(default=25)
     rec_char_dict_path: str = Field(default=os.path.join(OCR_MODEL_DIR, "ppocrv4/ppocr_keys_v1.txt"))
     use_space_char: bool = Field(default=True)
@@ -97,9 +114,16 @@ class OCRConfig(BaseModel):
     label_list: List[str] = Field(default=['0', '180'])
     cls_batch_num: int = Field(default=6)
     cls_thresh: float = Field(default=0.9)
+    # 方向分类模式：always对每个文本行分类；adaptive每页先对cls_sample_num个最宽的文本行抽样分类，
+    # 抽样中180度文本行的比例达到cls_rotated_ratio，或页面带/Rotate、竖向文本框比例达到cls_rotated_ratio时，才对整页分类
+    cls_mode: str = Field(default="adaptive")
+    cls_sample_num: int = Field(default=8)
+    cls_rotated_ratio: float = Field(default=0.1)
 
     enable_mkldnn: bool = Field(default=False)
     cpu_threads: int = Field(default=10)
+    # ONNX Runtime单个会话的算子内线程数，-1表示使用ONNX Runtime默认值（多进程并行时应按进程数划分）
+    intra_op_num_threads: int = Field(default=-1)
     use_pdserving: bool = Field(default=False)
     warmup: bool = Field(default=False)
 
@@ -0,0 +1,302 @@
+# !/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =====================================================
+# @File   ：ocr_stage
+# @Desc   ：进程内OCR阶段，供pipeline.py直接调用
+
+# 复用常驻的ONNXPaddleOcr实例，直接处理内存中的页面图像，
+# 结果结构与onnx_ocr.py写出的 *_ppocr_results.json 完全一致
+# =====================================================
+
+import os
+import sys
+import threading
+from pathlib import Path
+
+# ppocr内部模块使用顶层导入（ocr_conf、predict、process），需要将本目录加入搜索路径
+OCR_DIR = Path(__file__).resolve().parent
+if str(OCR_DIR) not in sys.path:
+    sys.path.append(str(OCR_DIR))
+if str(OCR_DIR.parent) not in sys.path:
+    sys.path.append(str(OCR_DIR.parent))
+
+from ocr_conf import OCRConfig
+from paddleocr import ONNXPaddleOcr
+from predict.predict_ocr import cls_stats_summary
+from onnx_ocr import convert_ocr_to_json_format, pdf_to_images
+from page_cache import config_fingerprint
+from onnx_sessions import resolve_model_path, model_file_fingerprint
+from convert_points_to_bbox import extract_page_index
+
+# OCRConfig中以相对路径给出的模型/字典文件，需要相对ppocr目录解析
+MODEL_PATH_FIELDS = ("det_model_dir", "rec_model_dir", "cls_model_dir", "rec_char_dict_path")
+
+# ONNX模型文件字段，缓存指纹使用实际加载的模型文件
+ONNX_MODEL_FIELDS = ("det_model_dir", "rec_model_dir", "cls_model_dir")
+
+# 只影响运行速度、不影响识别结果的配置项，不参与缓存指纹
+NON_RESULT_FIELDS = ("cpu_threads", "intra_op_num_threads", "warmup", "gpu_mem", "gpu_id")
+
+# 进程内共享的OCR模型实例，按配置参数区分
+_model_cache = {}
+_model_cache_lock = threading.Lock()
+
+
+def resolve_model_paths(ocr_kwargs):
+    """将模型路径解析为绝对路径，使OCR不再依赖当前工作目录"""
+    ocr_kwargs = dict(ocr_kwargs)
+    default_conf = OCRConfig()
+    for field in MODEL_PATH_FIELDS:
+        path = ocr_kwargs.get(field, getattr(default_conf, field))
+        if not os.path.isabs(path):
+            path = str(OCR_DIR / path)
+        ocr_kwargs[field] = path
+    return ocr_kwargs
+
+
+def model_file_fields(conf_fields):
+    """
+    将配置中的模型路径与精度替换为实际加载的模型文件指纹
+
+    int8模型缺失时回退加载fp32模型，重新量化会替换模型文件，两种情况都必须得到不同的缓存指纹
+    """
+    conf_fields = dict(conf_fields)
+    precision = conf_fields.pop("precision", "fp32")
+    for field in ONNX_MODEL_FIELDS:
+        model_path = conf_fields.pop(field)
+        # 不使用方向分类器时不加载cls模型
+        if field == "cls_model_dir" and not conf_fields.get("use_angle_cls"):
+            continue
+        conf_fields[field] = model_file_fingerprint(resolve_model_path(model_path, precision))
+    return conf_fields
+
+
+def report_cls_stats(stats):
+    """打印自适应方向分类跳过的页面比例（多进程模式下由主进程汇总各页统计后调用）"""
+    summary = cls_stats_summary(stats)
+    if summary:
+        print(f"🔄 {summary}")
+
+
+def get_ocr_model(**ocr_kwargs):
+    """
+    获取常驻的ONNXPaddleOcr实例
+
+    相同配置只加载一次det/cls/rec三个ONNX会话，后续调用直接复用
+
+    Args:
+        **ocr_kwargs: 传给OCRConfig的参数
+
+    Returns:
+        ONNXPaddleOcr: OCR模型实例
+    """
+    ocr_kwargs = resolve_model_paths(ocr_kwargs)
+    cache_key = tuple(sorted((k, repr(v)) for k, v in ocr_kwargs.items()))
+
+    with _model_cache_lock:
+        model = _model_cache.get(cache_key)
+        if model is None:
+            model = ONNXPaddleOcr(**ocr_kwargs)
+            _model_cache[cache_key] = model
+    return model
+
+
+class OCRStage:
+    """进程内OCR阶段"""
+
+    def __init__(self, use_angle_cls=True, use_gpu=True, cache=None, **ocr_kwargs):
+        """
+        初始化OCR阶段
+
+        Args:
+            use_angle_cls: 是否使用方向分类器
+            use_gpu: 是否使用GPU
+            cache: 页面结果缓存（PageResultCache），命中时跳过OCR推理
+            **ocr_kwargs: 其余OCRConfig参数
+        """
+        self.use_angle_cls = use_angle_cls
+        self.model = get_ocr_model(use_angle_cls=use_angle_cls, use_gpu=use_gpu, **ocr_kwargs)
+
+        self.cache = cache
+        conf = OCRConfig(**resolve_model_paths(dict(ocr_kwargs, use_angle_cls=use_angle_cls, use_gpu=use_gpu)))
+        conf_fields = {k: v for k, v in conf.model_dump().items() if k not in NON_RESULT_FIELDS}
+        self.cache_fingerprint = config_fingerprint(stage="ocr", **model_file_fields(conf_fields))
+
+    def recognize_image(self, img, page_idx=0, page_rotation=0):
+        """
+        识别单页图像
+
+        Args:
+            img: BGR格式的页面图像
+            page_idx: 页码（从0开始）
+            page_rotation: PDF页面的/Rotate角度，非0时自适应方向分类对整页分类
+
+        Returns:
+            list: 文本行列表，每项包含 illegibility/points/score/transcription
+        """
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(img, self.cache_fingerprint)
+            cached = self.cache.get("ocr", cache_key)
+            if cached is not None:
+                return cached
+
+        dt_boxes, rec_res = self.model(img, self.use_angle_cls, page_rotation=page_rotation)
+        lines = self._to_lines(dt_boxes, rec_res, page_idx)
+
+        if cache_key is not None:
+            self.cache.put("ocr", cache_key, lines)
+        return lines
+
+    @staticmethod
+    def _to_lines(dt_boxes, rec_res, page_idx):
+        """检测框与识别结果转换为文本行列表"""
+        if dt_boxes is None:
+            return []
+        ocr_results = [[[box.tolist(), res] for box, res in zip(dt_boxes, rec_res)]]
+        return convert_ocr_to_json_format(ocr_results, page_idx)[f"page_{page_idx}"]
+
+    def _recognize_batch(self, batch, results):
+        """批量识别一组 (page_idx, img, page_rotation)，缓存命中的页面跳过推理"""
+        pending = []
+        for page_idx, img, page_rotation in batch:
+            cache_key = None
+            if self.cache is not None:
+                cache_key = self.cache.make_key(img, self.cache_fingerprint)
+                cached = self.cache.get("ocr", cache_key)
+                if cached is not None:
+                    results[f"page_{page_idx}"] = cached
+                    continue
+            pending.append((page_idx, img, page_rotation, cache_key))
+        if not pending:
+            return
+
+        try:
+            page_results = self.model.batch_call(
+                [img for _, img, _, _ in pending], self.use_angle_cls,
+                page_rotations=[page_rotation for _, _, page_rotation, _ in pending]
+            )
+        except Exception as e:
+            # 批量推理失败时逐页重试，只跳过出错的页面
+            print(f"批量OCR失败，改为逐页识别: {e}")
+            for page_idx, img, page_rotation, _ in pending:
+                try:
+                    results[f"page_{page_idx}"] = self.recognize_image(img, page_idx, page_rotation)
+                except Exception as e:
+                    print(f"处理页面 'page_{page_idx}' 时出错: {e}")
+            return
+
+        for (page_idx, _, _, cache_key), (dt_boxes, rec_res) in zip(pending, page_results):
+            lines = self._to_lines(dt_boxes, rec_res, page_idx)
+            if cache_key is not None:
+                self.cache.put("ocr", cache_key, lines)
+            results[f"page_{page_idx}"] = lines
+
+    def recognize_images(self, images, page_rotations=None):
+        """
+        批量识别页面图像，每det_batch_num页的文字检测合并推理，文字识别跨页组批
+
+        Args:
+            images: 可迭代的 (page_idx, img) 序列
+            page_rotations: 可选，page_idx -> PDF页面/Rotate角度的函数（如PDFPageImages.page_rotation）
+
+        Returns:
+            dict: {"page_{idx}": [文本行, ...]}，与onnx_ocr.py输出的JSON结构一致
+        """
+        results = {}
+        batch_num = max(1, self.model.conf.det_batch_num)
+        batch = []
+        for page_idx, img in images:
+            if img is None:
+                print(f"错误: 无法读取页面 page_{page_idx}")
+                continue
+            page_rotation = page_rotations(page_idx) if page_rotations is not None else 0
+            batch.append((page_idx, img, page_rotation))
+            if len(batch) >= batch_num:
+                self._recognize_batch(batch, results)
+                batch = []
+        if batch:
+            self._recognize_batch(batch, results)
+        self.report_cls_stats()
+        return results
+
+    def report_cls_stats(self):
+        """打印自适应方向分类跳过的页面比例，并清零统计"""
+        report_cls_stats(self.take_cls_stats())
+
+    def take_cls_stats(self):
+        """取出自适应方向分类的统计并清零"""
+        stats = self.model.cls_stats
+        self.model.reset_cls_stats()
+        return stats
+
+    def recognize_text_layer(self, text_layer, get_image, page_idx=0):
+        """
+        使用PDF文本层识别单页：文本层的文字行直接使用，只对没有文字覆盖的图片区域做OCR
+
+        Args:
+            text_layer: pdf_text_layer.extract_text_lines的结果 (lines, regions)
+            get_image: 返回页面图像的函数，只在存在图片区域时调用
+            page_idx: 页码（从0开始）
+
+        Returns:
+            list: 文本行列表，结构与recognize_image一致
+        """
+        lines, regions = text_layer
+        lines = list(lines)
+        if regions:
+            img = get_image()
+            for x1, y1, x2, y2 in regions:
+                for line in self.recognize_image(img[y1:y2, x1:x2], page_idx):
+                    points = [[point[0] + x1, point[1] + y1] if point else point for point in line["points"]]
+                    lines.append(dict(line, points=points))
+        return lines
+
+    def recognize_page_images(self, page_images, use_text_layer=True):
+        """
+        识别PDFPageImages的所有页面
+
+        有可用文本层的页面直接读取文本层（不需要渲染），其余页面按recognize_images批量OCR
+
+        Args:
+            page_images: PDFPageImages实例
+            use_text_layer: 是否优先使用PDF文本层
+
+        Returns:
+            dict: {"page_{idx}": [文本行, ...]}，按页码排序
+        """
+        results = {}
+        ocr_pages = []
+        for page_idx in page_images.page_indices:
+            text_layer = page_images.text_layer(page_idx) if use_text_layer else None
+            if text_layer is None:
+                ocr_pages.append(page_idx)
+                continue
+            results[f"page_{page_idx}"] = self.recognize_text_layer(
+                text_layer, lambda: page_images.get(page_idx), page_idx
+            )
+        if use_text_layer:
+            print(f"📝 {len(results)} 页使用PDF文本层，{len(ocr_pages)} 页使用OCR")
+
+        if ocr_pages:
+            results.update(self.recognize_images(
+                ((page_idx, page_images.get(page_idx)) for page_idx in ocr_pages),
+                page_rotations=page_images.page_rotation
+            ))
+        # 所有页面都使用文本层时，图片区域OCR的统计也需要报告
+        self.report_cls_stats()
+        return {key: results[key] for key in sorted(results, key=extract_page_index)}
+
+    def recognize_pdf(self, pdf_path, dpi=200):
+        """
+        识别PDF文件的所有页面
+
+        Args:
+            pdf_path: PDF文件路径
+            dpi: 渲染分辨率
+
+        Returns:
+            dict: {"page_{idx}": [文本行, ...]}
+        """
+        images = pdf_to_images(str(pdf_path), dpi=dpi)
+        return self.recognize_images(enumerate(images))
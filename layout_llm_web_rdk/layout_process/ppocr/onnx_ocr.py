@@ -93,10 +93,14 @@ def pdf_to_images(pdf_path, output_dir=None, dpi=200):
             # 渲染页面为图像
             pix = page.get_pixmap(matrix=mat)
             
-            # 转换为numpy数组
-            img_data = pix.tobytes("png")
-            img_array = np.frombuffer(img_data, dtype=np.uint8)
-            img = cv2.imdecode(img_array, cv2.IMREAD_COLOR)
+            # 直接使用像素数据转换为BGR数组（无需PNG编解码）
+            img_array = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)
+            if pix.n == 4:
+                img = cv2.cvtColor(img_array, cv2.COLOR_RGBA2BGR)
+            elif pix.n == 1:
+                img = cv2.cvtColor(img_array, cv2.COLOR_GRAY2BGR)
+            else:
+                img = cv2.cvtColor(img_array, cv2.COLOR_RGB2BGR)
             
             if img is not None:
                 images.append(img)
@@ -10,17 +10,37 @@
 
 import onnxruntime
 
+# 进程内共享会话注册表（位于layout_process目录，单独运行ppocr时不可用）
+try:
+    import onnx_sessions
+except ImportError:
+    onnx_sessions = None
+
 
 class PredictBase(object):
     def __init__(self):
         pass
 
     @staticmethod
-    def get_onnx_session(model_dir, use_gpu):
+    def get_onnx_session(model_dir, use_gpu, intra_op_num_threads=-1, precision="fp32", gpu_id=0,
+                         free_dimension_overrides=None):
+        # det/cls/rec按模型路径在进程内共享，线程数按OCR组的线程预算分配
+        if onnx_sessions is not None:
+            model_dir = onnx_sessions.resolve_model_path(model_dir, precision)
+            providers = [('CPUExecutionProvider', onnx_sessions.cpu_provider_options())]
+            if use_gpu:
+                providers.insert(0, ('CUDAExecutionProvider', onnx_sessions.cuda_provider_options(gpu_id)))
+            return onnx_sessions.get_shared_session(model_dir, providers, "ocr", intra_op_num_threads,
+                                                    free_dimension_overrides=free_dimension_overrides)
+
+        if precision != "fp32":
+            print(f"警告: 单独运行ppocr时不支持{precision}模型，使用fp32模型")
+
         # 使用gpu
         cpu_provider_options = {"arena_extend_strategy": "kSameAsRequested", }
         if use_gpu:
             cuda_provider_options = {
+                "device_id": gpu_id,
                 "cudnn_conv_algo_search": "EXHAUSTIVE",  # 使用穷举搜索找到最佳卷积算法
                 "arena_extend_strategy": "kSameAsRequested",
                 "do_copy_in_default_stream": True,
@@ -35,7 +55,11 @@ class PredictBase(object):
         # 添加会话选项以优化性能
         session_options = onnxruntime.SessionOptions()
         session_options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
-        # session_options.intra_op_num_threads = 1  # 对于GPU执行这个设置不太重要
+        if intra_op_num_threads > 0:
+            session_options.intra_op_num_threads = intra_op_num_threads
+        # 固定动态维度的大小（如识别模型按宽度分桶时的输入宽度）
+        for dim_name, dim_value in (free_dimension_overrides or {}).items():
+            session_options.add_free_dimension_override_by_name(dim_name, dim_value)
         # session_options.log_severity_level = 3  # 只显示警告和错误
 
         onnx_session = onnxruntime.InferenceSession(model_dir, session_options, providers=providers)
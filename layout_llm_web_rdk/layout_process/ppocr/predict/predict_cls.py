@@ -8,7 +8,6 @@
 # 2024/7/31 17:48   Create
 # =====================================================
 
-import copy
 import math
 
 import cv2
@@ -27,11 +26,13 @@ class TextClassifier(PredictBase):
         self.postprocess_op = ClsPostProcess(label_list=conf.label_list)
 
         # 初始化模型
-        self.cls_onnx_session = self.get_onnx_session(conf.cls_model_dir, conf.use_gpu)
+        self.cls_onnx_session = self.get_onnx_session(conf.cls_model_dir, conf.use_gpu, conf.intra_op_num_threads,
+                                                      conf.precision, conf.gpu_id)
         self.cls_input_name = self.get_input_name(self.cls_onnx_session)
         self.cls_output_name = self.get_output_name(self.cls_onnx_session)
 
-    def resize_norm_img(self, img):
+    def resize_norm_img(self, img, out=None):
+        """缩放并归一化到 (C, H, W)，out为预分配的零初始化缓冲区时直接写入其中"""
         imgC, imgH, imgW = self.cls_image_shape
         h = img.shape[0]
         w = img.shape[1]
@@ -49,12 +50,13 @@ class TextClassifier(PredictBase):
             resized_image = resized_image.transpose((2, 0, 1)) / 255
         resized_image -= 0.5
         resized_image /= 0.5
-        padding_im = np.zeros((imgC, imgH, imgW), dtype=np.float32)
+        padding_im = np.zeros((imgC, imgH, imgW), dtype=np.float32) if out is None else out
         padding_im[:, :, 0:resized_w] = resized_image
         return padding_im
 
     def __call__(self, img_list):
-        img_list = copy.deepcopy(img_list)
+        # 只替换需要旋转的裁剪图，浅拷贝列表即可，不修改调用方的图像
+        img_list = list(img_list)
         img_num = len(img_list)
         # Calculate the aspect ratio of all text bars
         width_list = []
@@ -69,19 +71,10 @@ class TextClassifier(PredictBase):
         for beg_img_no in range(0, img_num, batch_num):
 
             end_img_no = min(img_num, beg_img_no + batch_num)
-            norm_img_batch = []
-            max_wh_ratio = 0
-
-            for ino in range(beg_img_no, end_img_no):
-                h, w = img_list[indices[ino]].shape[0:2]
-                wh_ratio = w * 1.0 / h
-                max_wh_ratio = max(max_wh_ratio, wh_ratio)
+            # 各裁剪图直接写入预分配的批缓冲区
+            norm_img_batch = np.zeros([end_img_no - beg_img_no] + self.cls_image_shape, dtype=np.float32)
             for ino in range(beg_img_no, end_img_no):
-                norm_img = self.resize_norm_img(img_list[indices[ino]])
-                norm_img = norm_img[np.newaxis, :]
-                norm_img_batch.append(norm_img)
-            norm_img_batch = np.concatenate(norm_img_batch)
-            norm_img_batch = norm_img_batch.copy()
+                self.resize_norm_img(img_list[indices[ino]], out=norm_img_batch[ino - beg_img_no])
 
             input_feed = self.get_input_feed(self.cls_input_name, norm_img_batch)
             outputs = self.cls_onnx_session.run(self.cls_output_name, input_feed=input_feed)
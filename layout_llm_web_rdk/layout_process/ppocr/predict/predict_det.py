@@ -50,7 +50,11 @@ class TextDetector(PredictBase):
             "unclip_ratio": conf.det_db_unclip_ratio,
             "use_dilation": conf.use_dilation,
             "score_mode": conf.det_db_score_mode,
-            "box_type": conf.det_box_type
+            "box_type": conf.det_box_type,
+            "box_score_thres_delta": conf.det_db_box_score_thres_delta,
+            "merge_lines": conf.det_db_merge_lines,
+            "detect_missing": conf.det_db_detect_missing,
+            "missing_thresh": conf.det_db_missing_thresh
         }
 
         # 实例化预处理操作类
@@ -60,7 +64,8 @@ class TextDetector(PredictBase):
         self.postprocess_op = DBPostProcess(**postprocess_params)
 
         # 初始化模型
-        self.det_onnx_session = self.get_onnx_session(conf.det_model_dir, conf.use_gpu)
+        self.det_onnx_session = self.get_onnx_session(conf.det_model_dir, conf.use_gpu, conf.intra_op_num_threads,
+                                                      conf.precision, conf.gpu_id)
         self.det_input_name = self.get_input_name(self.det_onnx_session)
         self.det_output_name = self.get_output_name(self.det_onnx_session)
 
@@ -135,7 +140,7 @@ class TextDetector(PredictBase):
         return ops
 
     def __call__(self, img):
-        ori_im = img.copy()
+        ori_shape = img.shape
         data = {'image': img}
 
         data = self.transform(data, self.preprocess_op)
@@ -149,15 +154,60 @@ class TextDetector(PredictBase):
         input_feed = self.get_input_feed(self.det_input_name, img)
         outputs = self.det_onnx_session.run(self.det_output_name, input_feed=input_feed)
 
+        return self.postprocess(outputs[0], shape_list, ori_shape)
+
+    def postprocess(self, pred_map, shape_list, ori_shape):
+        """单页概率图 (1, 1, H, W) 转换为文本框"""
         preds = {}
-        preds['maps'] = outputs[0]
+        preds['maps'] = pred_map
 
         post_result = self.postprocess_op(preds, shape_list)
         dt_boxes = post_result[0]['points']
 
         if self.conf.det_box_type == 'poly':
-            dt_boxes = self.filter_tag_det_res_only_clip(dt_boxes, ori_im.shape)
+            dt_boxes = self.filter_tag_det_res_only_clip(dt_boxes, ori_shape)
         else:
-            dt_boxes = self.filter_tag_det_res(dt_boxes, ori_im.shape)
+            dt_boxes = self.filter_tag_det_res(dt_boxes, ori_shape)
+
+        return dt_boxes
 
-        return dt_boxes
\ No newline at end of file
+    def detect_batch(self, img_list):
+        """
+        多页批量检测
+
+        各页先按DetResizeForTest缩放，尺寸相近的页面在右下方补零到同一尺寸后一次推理，
+        再从概率图中裁出每页的有效区域，按各自的shape_list映射回原图坐标
+
+        Args:
+            img_list: BGR页面图像列表
+
+        Returns:
+            list: 每页的文本框，预处理失败的页面为None
+        """
+        dt_boxes_list = [None] * len(img_list)
+        samples = []
+        for idx, img in enumerate(img_list):
+            data = self.transform({'image': img}, self.preprocess_op)
+            if data is not None and data[0] is not None:
+                samples.append((idx, data[0], data[1]))
+
+        # 按缩放后的尺寸排序，同一批内补零的面积最小（同一文档的页面通常尺寸相同，无需补零）
+        samples.sort(key=lambda sample: sample[1].shape[1:])
+        batch_num = max(1, self.conf.det_batch_num)
+        for beg in range(0, len(samples), batch_num):
+            batch = samples[beg:beg + batch_num]
+            max_h = max(image.shape[1] for _, image, _ in batch)
+            max_w = max(image.shape[2] for _, image, _ in batch)
+
+            norm_img_batch = np.zeros((len(batch), batch[0][1].shape[0], max_h, max_w), dtype=np.float32)
+            for row, (_, image, _) in enumerate(batch):
+                norm_img_batch[row, :, :image.shape[1], :image.shape[2]] = image
+
+            input_feed = self.get_input_feed(self.det_input_name, norm_img_batch)
+            outputs = self.det_onnx_session.run(self.det_output_name, input_feed=input_feed)
+
+            for row, (idx, image, shape) in enumerate(batch):
+                pred_map = outputs[0][row:row + 1, :, :image.shape[1], :image.shape[2]]
+                dt_boxes_list[idx] = self.postprocess(pred_map, shape[np.newaxis], img_list[idx].shape)
+
+        return dt_boxes_list
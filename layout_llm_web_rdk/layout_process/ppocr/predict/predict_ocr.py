@@ -8,7 +8,6 @@
 # 2024/7/31 17:51   Create
 # =====================================================
 
-import copy
 import os
 
 import cv2
@@ -17,6 +16,16 @@ import numpy as np
 from .predict_cls import TextClassifier
 from .predict_det import TextDetector
 from .predict_rec import TextRecognizer
+from .rec_scheduler import RecognitionScheduler
+
+
+def cls_stats_summary(stats):
+    """自适应方向分类的统计摘要，stats为OCR.cls_stats结构（可以是多个进程的累加）"""
+    if not stats.get("pages"):
+        return None
+    return (f"方向分类: 跳过 {stats['skipped_pages']}/{stats['pages']} 页"
+            f"（{stats['skipped_pages'] / stats['pages']:.1%}），"
+            f"实际分类 {stats['classified_crops']}/{stats['crops']} 个文本行")
 
 
 class OCR:
@@ -28,6 +37,9 @@ class OCR:
         self.drop_score = 0.5
         self.text_classifier = None
         self.crop_image_res_index = 0
+        # 自适应方向分类的统计：分类的页面数、跳过整页分类的页面数、文本行总数、实际分类的文本行数
+        self.cls_stats = {}
+        self.reset_cls_stats()
         self.load_model(conf)
 
     def load_model(self, conf=None):
@@ -114,38 +126,169 @@ class OCR:
 
         return new_dt_boxes
 
-    def __call__(self, img, cls=True, mfd_res=None):
-        ori_im = img.copy()
-        # 文字检测
+    def __call__(self, img, cls=True, mfd_res=None, page_rotation=0):
+        # 文字检测（检测与裁剪都不修改原图，无需整页拷贝）
         dt_boxes = self.text_detector(img)
 
         if dt_boxes is None:
             return None, None
 
+        return self.recognize_boxes(img, dt_boxes, cls, mfd_res, page_rotation)
+
+    def batch_call(self, img_list, cls=True, page_rotations=None):
+        """
+        多页OCR：文字检测按页批量推理，方向分类与文字识别跨页合并批次
+
+        Args:
+            img_list: BGR页面图像列表
+            cls: 是否使用方向分类
+            page_rotations: 各页PDF的/Rotate角度，用于自适应方向分类
+
+        Returns:
+            list: 每页的 (filter_boxes, filter_rec_res)，检测失败的页面为 (None, None)
+        """
+        dt_boxes_list = self.text_detector.detect_batch(img_list)
+        page_rotations = page_rotations or [0] * len(img_list)
+
+        pages = []
+        page_crops = []
+        rotation_hints = []
+        for img, dt_boxes, page_rotation in zip(img_list, dt_boxes_list, page_rotations):
+            if dt_boxes is None:
+                pages.append(None)
+                continue
+            dt_boxes, img_crop_list = self.crop_boxes(img, dt_boxes)
+            pages.append(dt_boxes)
+            page_crops.append(img_crop_list)
+            rotation_hints.append(self.rotation_hint(dt_boxes, page_rotation))
+
+        # 方向分类
+        if self.use_angle_cls and cls:
+            page_crops = self.classify_pages(page_crops, rotation_hints)
+
+        # 文字识别：各页裁剪图按宽度分桶后跨页组批
+        scheduler = RecognitionScheduler(
+            self.text_recognizer, self.conf.rec_page_batch_num, self.conf.rec_width_buckets
+        )
+        for img_crop_list in page_crops:
+            scheduler.add_page(img_crop_list)
+        rec_res_list = iter(scheduler.run())
+        page_crops = iter(page_crops)
+
+        results = []
+        for dt_boxes in pages:
+            if dt_boxes is None:
+                results.append((None, None))
+                continue
+            rec_res = next(rec_res_list)
+            img_crop_list = next(page_crops)
+            if self.conf.save_crop_res:
+                self.draw_crop_rec_res(self.conf.crop_res_save_dir, img_crop_list, rec_res)
+            results.append(self.filter_results(dt_boxes, rec_res))
+        return results
+
+    def rotation_hint(self, dt_boxes, page_rotation=0):
+        """
+        页面是否可能包含旋转的文本：PDF页面带/Rotate，或竖向（高宽比≥1.5）文本框的比例达到cls_rotated_ratio
+
+        Returns:
+            bool: True时自适应模式直接对整页分类
+        """
+        if page_rotation % 360:
+            return True
+        if not len(dt_boxes):
+            return False
+        extents = np.array([np.ptp(np.asarray(box, dtype=np.float32).reshape(-1, 2), axis=0) for box in dt_boxes])
+        vertical = extents[:, 1] >= 1.5 * np.maximum(extents[:, 0], 1)
+        return vertical.mean() >= self.conf.cls_rotated_ratio
+
+    def classify_pages(self, page_crops, rotation_hints=None):
+        """
+        按页方向分类，180度的文本行旋转回正
+
+        always模式对所有文本行分类；adaptive模式下，rotation_hint为True的页面整页分类，
+        其余页面先对最宽的cls_sample_num个文本行抽样分类（各页抽样合并为一次推理），
+        只有抽样中180度文本行的比例达到cls_rotated_ratio的页面才分类剩余文本行
+
+        Args:
+            page_crops: 每页的裁剪图列表
+            rotation_hints: 每页的rotation_hint结果
+
+        Returns:
+            list: 每页分类（并旋转）后的裁剪图列表
+        """
+        page_crops = [list(img_crop_list) for img_crop_list in page_crops]
+        rotation_hints = rotation_hints or [False] * len(page_crops)
+
+        def classify(refs):
+            if not refs:
+                return []
+            img_list, cls_res = self.text_classifier([page_crops[pno][ino] for pno, ino in refs])
+            for (pno, ino), img_crop in zip(refs, img_list):
+                page_crops[pno][ino] = img_crop
+            self.cls_stats["classified_crops"] += len(refs)
+            return cls_res
+
+        full_pages = []
+        sample_refs = []
+        for pno, img_crop_list in enumerate(page_crops):
+            if not img_crop_list:
+                continue
+            self.cls_stats["pages"] += 1
+            self.cls_stats["crops"] += len(img_crop_list)
+            if self.conf.cls_mode != "adaptive" or rotation_hints[pno] or \
+                    len(img_crop_list) <= self.conf.cls_sample_num:
+                full_pages.append((pno, range(len(img_crop_list))))
+                continue
+            # 较宽的文本行分类更可靠
+            widths = [img_crop.shape[1] / float(img_crop.shape[0]) for img_crop in img_crop_list]
+            sample = np.argsort(widths)[::-1][:self.conf.cls_sample_num]
+            sample_refs.extend((pno, int(ino)) for ino in sample)
+
+        # 抽样分类，统计各页180度文本行的数量
+        sampled = {}
+        for (pno, ino), (label, score) in zip(sample_refs, classify(sample_refs)):
+            rotated = '180' in label and score > self.text_classifier.cls_thresh
+            num_sampled, num_rotated = sampled.get(pno, (0, 0))
+            sampled[pno] = (num_sampled + 1, num_rotated + rotated)
+
+        sampled_refs = set(sample_refs)
+        for pno, (num_sampled, num_rotated) in sampled.items():
+            if num_rotated and num_rotated >= self.conf.cls_rotated_ratio * num_sampled:
+                remaining = [ino for ino in range(len(page_crops[pno])) if (pno, ino) not in sampled_refs]
+                full_pages.append((pno, remaining))
+            else:
+                self.cls_stats["skipped_pages"] += 1
+
+        classify([(pno, ino) for pno, indices in full_pages for ino in indices])
+        return page_crops
+
+    def reset_cls_stats(self):
+        self.cls_stats = {"pages": 0, "skipped_pages": 0, "crops": 0, "classified_crops": 0}
+
+    def cls_summary(self):
+        """自适应方向分类的统计摘要"""
+        return cls_stats_summary(self.cls_stats)
+
+    def crop_boxes(self, ori_im, dt_boxes, mfd_res=None):
+        """文本框排序并裁剪出每个文本行的图像"""
         img_crop_list = []
 
         dt_boxes = self.sorted_boxes(dt_boxes)
         if mfd_res:
             dt_boxes = self.update_det_boxes(dt_boxes, mfd_res)
 
-        # 图片裁剪
-        for bno in range(len(dt_boxes)):
-            tmp_box = copy.deepcopy(dt_boxes[bno])
+        # 图片裁剪：轴对齐的文本框直接切片，只有旋转的文本框才做透视变换
+        for box in dt_boxes:
             if self.conf.det_box_type == "quad":
-                img_crop = self.get_rotate_crop_image(ori_im, tmp_box)
+                img_crop = self.get_rotate_crop_image(ori_im, box)
             else:
-                img_crop = self.get_minarea_rect_crop(ori_im, tmp_box)
+                img_crop = self.get_minarea_rect_crop(ori_im, box)
             img_crop_list.append(img_crop)
+        return dt_boxes, img_crop_list
 
-        # 方向分类
-        if self.use_angle_cls and cls:
-            img_crop_list, angle_list = self.text_classifier(img_crop_list)
-
-        # 文字识别
-        rec_res = self.text_recognizer(img_crop_list)
-        if self.conf.save_crop_res:
-            self.draw_crop_rec_res(self.conf.crop_res_save_dir, img_crop_list, rec_res)
-
+    def filter_results(self, dt_boxes, rec_res):
+        """丢弃置信度低于drop_score的识别结果"""
         filter_boxes, filter_rec_res = [], []
         for box, rec_result in zip(dt_boxes, rec_res):
             text, score = rec_result
@@ -155,6 +298,23 @@ class OCR:
 
         return filter_boxes, filter_rec_res
 
+    def recognize_boxes(self, ori_im, dt_boxes, cls=True, mfd_res=None, page_rotation=0):
+        """裁剪检测到的文本框，完成方向分类与文字识别"""
+        dt_boxes, img_crop_list = self.crop_boxes(ori_im, dt_boxes, mfd_res)
+
+        # 方向分类
+        if self.use_angle_cls and cls:
+            img_crop_list = self.classify_pages(
+                [img_crop_list], [self.rotation_hint(dt_boxes, page_rotation)]
+            )[0]
+
+        # 文字识别
+        rec_res = self.text_recognizer(img_crop_list)
+        if self.conf.save_crop_res:
+            self.draw_crop_rec_res(self.conf.crop_res_save_dir, img_crop_list, rec_res)
+
+        return self.filter_results(dt_boxes, rec_res)
+
     @staticmethod
     def sorted_boxes(dt_boxes):
         """
@@ -179,6 +339,13 @@ class OCR:
                     break
         return _boxes
 
+    @staticmethod
+    def is_axis_aligned(points):
+        """顶点（左上、右上、右下、左下）为整数坐标的轴对齐矩形"""
+        return (points[0][1] == points[1][1] and points[2][1] == points[3][1]
+                and points[0][0] == points[3][0] and points[1][0] == points[2][0]
+                and np.array_equal(points, np.round(points)))
+
     @staticmethod
     def get_rotate_crop_image(img, points):
         """
@@ -200,15 +367,21 @@ class OCR:
             max(
                 np.linalg.norm(points[0] - points[3]),
                 np.linalg.norm(points[1] - points[2])))
-        pts_std = np.float32([[0, 0], [img_crop_width, 0],
-                              [img_crop_width, img_crop_height],
-                              [0, img_crop_height]])
-        M = cv2.getPerspectiveTransform(points, pts_std)
-        dst_img = cv2.warpPerspective(
-            img,
-            M, (img_crop_width, img_crop_height),
-            borderMode=cv2.BORDER_REPLICATE,
-            flags=cv2.INTER_CUBIC)
+        left, top = int(points[0][0]), int(points[0][1])
+        if OCR.is_axis_aligned(points) and left >= 0 and top >= 0 and \
+                left + img_crop_width <= img.shape[1] and top + img_crop_height <= img.shape[0]:
+            # 整数坐标的轴对齐矩形，透视变换在整数位置采样，结果与原图切片相同，直接返回视图
+            dst_img = img[top:top + img_crop_height, left:left + img_crop_width]
+        else:
+            pts_std = np.float32([[0, 0], [img_crop_width, 0],
+                                  [img_crop_width, img_crop_height],
+                                  [0, img_crop_height]])
+            M = cv2.getPerspectiveTransform(np.float32(points), pts_std)
+            dst_img = cv2.warpPerspective(
+                img,
+                M, (img_crop_width, img_crop_height),
+                borderMode=cv2.BORDER_REPLICATE,
+                flags=cv2.INTER_CUBIC)
         dst_img_height, dst_img_width = dst_img.shape[0:2]
         if dst_img_height * 1.0 / dst_img_width >= 1.5:
             dst_img = np.rot90(dst_img)
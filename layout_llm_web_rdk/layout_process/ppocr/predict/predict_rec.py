@@ -23,6 +23,11 @@ class TextRecognizer(PredictBase):
         super(TextRecognizer, self).__init__()
         self.rec_image_shape = [int(v) for v in conf.rec_image_shape.split(",")]
         self.rec_batch_num = conf.rec_batch_num
+        self.rec_batch_mode = conf.rec_batch_mode
+        self.rec_width_buckets = sorted(conf.rec_width_buckets)
+        self.rec_max_pad_ratio = conf.rec_max_pad_ratio
+        self.rec_static_shapes = conf.rec_static_shapes
+        self.conf = conf
         self.rec_algorithm = conf.rec_algorithm
         self.postprocess_op = CTCLabelDecode(
             character_dict_path=conf.rec_char_dict_path,
@@ -30,11 +35,24 @@ class TextRecognizer(PredictBase):
         )
 
         # 初始化模型
-        self.rec_onnx_session = self.get_onnx_session(conf.rec_model_dir, conf.use_gpu)
+        self.rec_onnx_session = self.get_onnx_session(conf.rec_model_dir, conf.use_gpu, conf.intra_op_num_threads,
+                                                      conf.precision, conf.gpu_id)
         self.rec_input_name = self.get_input_name(self.rec_onnx_session)
         self.rec_output_name = self.get_output_name(self.rec_onnx_session)
+        # 固定输入宽度的会话，按分桶宽度缓存
+        self._static_sessions = {}
 
-    def resize_norm_img(self, img, max_wh_ratio):
+    def norm_img_shape(self, max_wh_ratio):
+        """resize_norm_img输出的 (C, H, W)"""
+        imgC, imgH, imgW = self.rec_image_shape
+        if self.rec_algorithm in ('NRTR', 'ViTSTR', 'RFL'):
+            return [1, imgH, imgW]
+        if self.rec_algorithm == 'RARE':
+            return [imgC, imgH, imgW]
+        return [imgC, imgH, int((imgH * max_wh_ratio))]
+
+    def resize_norm_img(self, img, max_wh_ratio, out=None):
+        """缩放并归一化到 (C, H, W)，out为预分配的零初始化缓冲区时直接写入其中"""
         imgC, imgH, imgW = self.rec_image_shape
         if self.rec_algorithm == 'NRTR' or self.rec_algorithm == 'ViTSTR':
             img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
@@ -51,6 +69,9 @@ class TextRecognizer(PredictBase):
                 norm_img = norm_img.astype(np.float32) / 255.
             else:
                 norm_img = norm_img.astype(np.float32) / 128. - 1.
+            if out is not None:
+                out[...] = norm_img
+                return out
             return norm_img
         elif self.rec_algorithm == 'RFL':
             img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
@@ -61,6 +82,9 @@ class TextRecognizer(PredictBase):
             resized_image = resized_image[np.newaxis, :]
             resized_image -= 0.5
             resized_image /= 0.5
+            if out is not None:
+                out[...] = resized_image
+                return out
             return resized_image
 
         assert imgC == img.shape[2]
@@ -81,7 +105,7 @@ class TextRecognizer(PredictBase):
         resized_image = resized_image.transpose((2, 0, 1)) / 255
         resized_image -= 0.5
         resized_image /= 0.5
-        padding_im = np.zeros((imgC, imgH, imgW), dtype=np.float32)
+        padding_im = np.zeros((imgC, imgH, imgW), dtype=np.float32) if out is None else out
         padding_im[:, :, 0:resized_w] = resized_image
         return padding_im
 
@@ -269,7 +293,71 @@ class TextRecognizer(PredictBase):
 
         return img
 
-    def __call__(self, img_list):
+    def bucket_index(self, img, width_buckets):
+        """按缩放到识别高度后的宽度，返回所属宽度分桶的序号"""
+        imgH = self.rec_image_shape[1]
+        h, w = img.shape[0:2]
+        resized_w = math.ceil(imgH * w / float(h))
+        for idx, bucket_w in enumerate(width_buckets):
+            if resized_w <= bucket_w:
+                return idx
+        return len(width_buckets) - 1
+
+    def bucket_batches(self, img_list, indices, batch_num):
+        """
+        按宽度分桶组批
+
+        indices为按宽高比升序排列的序号；同一批内的文本行属于同一宽度分桶，且最宽与最窄
+        （补齐到识别模型最小宽度后）的宽度比不超过rec_max_pad_ratio
+
+        Returns:
+            list: [(批内序号列表, 补齐宽度), ...]，补齐宽度为None时补齐到批内最宽的文本行
+        """
+        imgC, imgH, imgW = self.rec_image_shape[:3]
+        batches = []
+        batch, batch_bucket, min_w, max_w = [], None, 0, 0
+        for idx in indices:
+            h, w = img_list[idx].shape[0:2]
+            resized_w = max(imgW, math.ceil(imgH * w / float(h)))
+            bucket = self.bucket_index(img_list[idx], self.rec_width_buckets)
+            if batch and (bucket != batch_bucket or len(batch) >= batch_num
+                          or resized_w > min_w * self.rec_max_pad_ratio):
+                batches.append((batch, self._batch_width(batch_bucket, max_w)))
+                batch = []
+            if not batch:
+                batch_bucket, min_w = bucket, resized_w
+            batch.append(idx)
+            max_w = resized_w
+        if batch:
+            batches.append((batch, self._batch_width(batch_bucket, max_w)))
+        return batches
+
+    def _batch_width(self, bucket, max_w):
+        """固定形状模式下补齐到分桶宽度（超过最大分桶的文本行仍按实际宽度）"""
+        if self.rec_static_shapes and max_w <= self.rec_width_buckets[bucket]:
+            return self.rec_width_buckets[bucket]
+        return None
+
+    def get_session(self, batch_width):
+        """获取推理会话，固定形状模式下每个分桶宽度使用单独的会话"""
+        if batch_width is None:
+            return self.rec_onnx_session
+
+        session = self._static_sessions.get(batch_width)
+        if session is None:
+            # 只有宽度维度为命名的动态维度时才能固定
+            dim_name = self.rec_onnx_session.get_inputs()[0].shape[3]
+            if not isinstance(dim_name, str):
+                session = self.rec_onnx_session
+            else:
+                session = self.get_onnx_session(
+                    self.conf.rec_model_dir, self.conf.use_gpu, self.conf.intra_op_num_threads,
+                    self.conf.precision, self.conf.gpu_id, free_dimension_overrides={dim_name: batch_width}
+                )
+            self._static_sessions[batch_width] = session
+        return session
+
+    def __call__(self, img_list, batch_num=None):
         img_num = len(img_list)
         # Calculate the aspect ratio of all text bars
         width_list = []
@@ -278,26 +366,27 @@ class TextRecognizer(PredictBase):
         # Sorting can speed up the recognition process
         indices = np.argsort(np.array(width_list))
         rec_res = [['', 0.0]] * img_num
-        batch_num = self.rec_batch_num
+        batch_num = batch_num or self.rec_batch_num
 
-        for beg_img_no in range(0, img_num, batch_num):
-            end_img_no = min(img_num, beg_img_no + batch_num)
-            norm_img_batch = []
+        if self.rec_batch_mode == 'bucket' and self.rec_algorithm not in ('NRTR', 'ViTSTR', 'RFL', 'RARE'):
+            batches = self.bucket_batches(img_list, indices, batch_num)
+        else:
+            batches = [(indices[beg:beg + batch_num], None) for beg in range(0, img_num, batch_num)]
+
+        for batch_indices, batch_width in batches:
             imgC, imgH, imgW = self.rec_image_shape[:3]
             max_wh_ratio = imgW / imgH
             # max_wh_ratio = 0
-            for ino in range(beg_img_no, end_img_no):
-                h, w = img_list[indices[ino]].shape[0:2]
+            for ino in batch_indices:
+                h, w = img_list[ino].shape[0:2]
                 wh_ratio = w * 1.0 / h
                 max_wh_ratio = max(max_wh_ratio, wh_ratio)
-            for ino in range(beg_img_no, end_img_no):
-                norm_img = self.resize_norm_img(img_list[indices[ino]],
-                                                max_wh_ratio)
-                norm_img = norm_img[np.newaxis, :]
-                norm_img_batch.append(norm_img)
-
-            norm_img_batch = np.concatenate(norm_img_batch)
-            norm_img_batch = norm_img_batch.copy()
+            if batch_width is not None:
+                max_wh_ratio = batch_width / imgH
+            # 各文本行直接写入预分配的批缓冲区
+            norm_img_batch = np.zeros([len(batch_indices)] + self.norm_img_shape(max_wh_ratio), dtype=np.float32)
+            for bno, ino in enumerate(batch_indices):
+                self.resize_norm_img(img_list[ino], max_wh_ratio, out=norm_img_batch[bno])
 
             # img = img[:, :, ::-1].transpose(2, 0, 1)
             # img = img[:, :, ::-1]
@@ -306,12 +395,12 @@ class TextRecognizer(PredictBase):
             # img = np.expand_dims(img, axis=0)
             # print(img.shape)
             input_feed = self.get_input_feed(self.rec_input_name, norm_img_batch)
-            outputs = self.rec_onnx_session.run(self.rec_output_name, input_feed=input_feed)
+            outputs = self.get_session(batch_width).run(self.rec_output_name, input_feed=input_feed)
 
             preds = outputs[0]
 
             rec_result = self.postprocess_op(preds)
             for rno in range(len(rec_result)):
-                rec_res[indices[beg_img_no + rno]] = rec_result[rno]
+                rec_res[batch_indices[rno]] = rec_result[rno]
 
         return rec_res
@@ -0,0 +1,58 @@
+# !/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =====================================================
+# @File   ：rec_scheduler
+# @Desc   ：跨页文字识别调度
+
+# 收集多个页面的文本行裁剪图，按缩放后的宽度分桶，
+# 同一桶内跨页组成更大的批次送入识别模型，结果再按 (页, 框) 路由回各页
+# =====================================================
+
+
+class RecognitionScheduler:
+    def __init__(self, text_recognizer, batch_num, width_buckets):
+        """
+        Args:
+            text_recognizer: TextRecognizer实例
+            batch_num: 跨页识别的批大小
+            width_buckets: 宽度分桶上界，如 [320, 640, 960, 1280]
+        """
+        self.text_recognizer = text_recognizer
+        self.batch_num = batch_num
+        self.width_buckets = sorted(width_buckets)
+        self.pages = []
+        # 每个分桶内的裁剪图及其 (页序号, 框序号)
+        self.buckets = [[] for _ in self.width_buckets]
+
+    def add_page(self, img_crop_list):
+        """
+        添加一个页面的全部裁剪图
+
+        Returns:
+            int: 页序号，run()的返回结果按此序号排列
+        """
+        page_no = len(self.pages)
+        self.pages.append(len(img_crop_list))
+        for bno, img_crop in enumerate(img_crop_list):
+            bucket = self.text_recognizer.bucket_index(img_crop, self.width_buckets)
+            self.buckets[bucket].append((page_no, bno, img_crop))
+        return page_no
+
+    def run(self):
+        """
+        按分桶批量识别所有页面
+
+        Returns:
+            list: 每页的识别结果列表，顺序与add_page时的裁剪图一致
+        """
+        rec_res_list = [[['', 0.0]] * num_crops for num_crops in self.pages]
+        for bucket in self.buckets:
+            if not bucket:
+                continue
+            rec_res = self.text_recognizer([img_crop for _, _, img_crop in bucket], self.batch_num)
+            for (page_no, bno, _), rec_result in zip(bucket, rec_res):
+                rec_res_list[page_no][bno] = rec_result
+
+        self.pages = []
+        self.buckets = [[] for _ in self.width_buckets]
+        return rec_res_list
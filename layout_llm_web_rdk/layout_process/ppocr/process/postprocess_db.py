@@ -23,6 +23,15 @@ class DBPostProcess(object):
                  use_dilation=False,
                  score_mode="fast",
                  box_type='quad',
+                 fast_quad=True,
+                 box_score_thres_delta=0.0,
+                 min_quality=0.8,
+                 merge_lines=False,
+                 merge_y_threshold=10,
+                 merge_overlap_threshold=0.5,
+                 detect_missing=False,
+                 missing_thresh=0.2,
+                 missing_box_thresh=None,
                  **kwargs):
         self.thresh = thresh
         self.box_thresh = box_thresh
@@ -31,6 +40,21 @@ class DBPostProcess(object):
         self.min_size = 3
         self.score_mode = score_mode
         self.box_type = box_type
+        # quad + fast模式下使用向量化的矩形打分与解析unclip，不再逐个轮廓调用shapely/pyclipper
+        self.fast_quad = fast_quad
+
+        # 可选阶段（默认关闭，与原始DB后处理结果一致）
+        # 分数容差：分数落在 [box_thresh - delta, box_thresh) 的框，多边形质量不低于min_quality时保留
+        self.box_score_thres_delta = box_score_thres_delta
+        self.min_quality = min_quality
+        # 合并同一行内水平重叠的文本框（目标图像坐标，按y排序后分行、行内按x扫描）
+        self.merge_lines = merge_lines
+        self.merge_y_threshold = merge_y_threshold
+        self.merge_overlap_threshold = merge_overlap_threshold
+        # 补检：在未被已检出文本框覆盖的区域内，用更低的二值化阈值重新提取文本行
+        self.detect_missing = detect_missing
+        self.missing_thresh = missing_thresh
+        self.missing_box_thresh = box_thresh if missing_box_thresh is None else missing_box_thresh
         assert score_mode in [
             "slow", "fast"
         ], "Score mode must be in [slow, fast] but got: {}".format(score_mode)
@@ -61,7 +85,7 @@ class DBPostProcess(object):
                 continue
 
             score = self.box_score_fast(pred, points.reshape(-1, 2))
-            if self.box_thresh > score:
+            if not self.accept_score(score, points):
                 continue
 
             if points.shape[0] > 2:
@@ -90,6 +114,8 @@ class DBPostProcess(object):
         _bitmap: single map with shape (1, H, W),
                 whose values are binarized as {0, 1}
         """
+        if self.fast_quad and self.score_mode == "fast":
+            return self.boxes_from_bitmap_fast(pred, _bitmap, dest_width, dest_height)
 
         bitmap = _bitmap
         height, width = bitmap.shape
@@ -115,7 +141,7 @@ class DBPostProcess(object):
                 score = self.box_score_fast(pred, points.reshape(-1, 2))
             else:
                 score = self.box_score_slow(pred, contour)
-            if self.box_thresh > score:
+            if not self.accept_score(score, points):
                 continue
 
             box = self.unclip(points, self.unclip_ratio).reshape(-1, 1, 2)
@@ -132,6 +158,250 @@ class DBPostProcess(object):
             scores.append(score)
         return np.array(boxes, dtype="int32"), scores
 
+    def boxes_from_bitmap_fast(self, pred, _bitmap, dest_width, dest_height):
+        """
+        boxes_from_bitmap的批量实现
+
+        每个轮廓只做一次minAreaRect；轴对齐的最小外接矩形用积分图一次性计算平均分数
+        （与box_score_fast的像素范围一致），旋转矩形仍逐个计算；矩形的unclip结果
+        是各边向外扩展 area * unclip_ratio / length 的同心矩形，直接按解析式计算
+        """
+        bitmap = _bitmap
+        height, width = bitmap.shape
+
+        contours, _ = cv2.findContours((bitmap * 255).astype(np.uint8), cv2.RETR_LIST,
+                                       cv2.CHAIN_APPROX_SIMPLE)[-2:]
+        rects = [cv2.minAreaRect(contour) for contour in contours[:self.max_candidates]]
+        if not rects:
+            return np.zeros((0, 4, 2), dtype="int32"), []
+
+        centers = np.array([rect[0] for rect in rects], dtype=np.float64)
+        sizes = np.array([rect[1] for rect in rects], dtype=np.float64)
+        angles = np.array([rect[2] for rect in rects], dtype=np.float64)
+
+        keep = sizes.min(axis=1) >= self.min_size
+        centers, sizes, angles = centers[keep], sizes[keep], angles[keep]
+        # 打分使用cv2.boxPoints的float32顶点，保证像素范围与逐轮廓实现完全一致
+        points = np.array([cv2.boxPoints(rect) for rect, k in zip(rects, keep) if k],
+                          dtype=np.float32).reshape(-1, 4, 2)
+        points = self.order_points(points)
+
+        scores = self.rect_scores(pred, points, angles)
+        keep = scores >= self.box_thresh
+        if self.box_score_thres_delta > 0:
+            keep |= (scores >= self.box_thresh - self.box_score_thres_delta) & \
+                    (self.rect_quality(sizes) >= self.min_quality)
+        centers, sizes, angles, scores = centers[keep], sizes[keep], angles[keep], scores[keep]
+
+        # 矩形按 distance = area * unclip_ratio / length 向外扩展
+        distance = sizes.prod(axis=1) * self.unclip_ratio / (2 * sizes.sum(axis=1))
+        sizes = sizes + 2 * distance[:, np.newaxis]
+        keep = sizes.min(axis=1) >= self.min_size + 2
+        centers, sizes, angles, scores = centers[keep], sizes[keep], angles[keep], scores[keep]
+
+        boxes = self.rect_points(centers, sizes, angles)
+        boxes[:, :, 0] = np.clip(np.round(boxes[:, :, 0] / width * dest_width), 0, dest_width)
+        boxes[:, :, 1] = np.clip(np.round(boxes[:, :, 1] / height * dest_height), 0, dest_height)
+        return boxes.astype("int32"), scores.tolist()
+
+    @staticmethod
+    def rect_points(centers, sizes, angles):
+        """
+        批量计算旋转矩形的四个顶点（与cv2.boxPoints的公式一致），并按get_mini_boxes的规则排序
+
+        Returns:
+            np.ndarray: (N, 4, 2)
+        """
+        theta = np.deg2rad(angles)
+        b = np.cos(theta) * 0.5
+        a = np.sin(theta) * 0.5
+        w, h = sizes[:, 0], sizes[:, 1]
+        cx, cy = centers[:, 0], centers[:, 1]
+
+        pts = np.empty((len(centers), 4, 2), dtype=np.float64)
+        pts[:, 0, 0] = cx - a * h - b * w
+        pts[:, 0, 1] = cy + b * h - a * w
+        pts[:, 1, 0] = cx + a * h - b * w
+        pts[:, 1, 1] = cy - b * h - a * w
+        pts[:, 2] = 2 * centers - pts[:, 0]
+        pts[:, 3] = 2 * centers - pts[:, 1]
+        return DBPostProcess.order_points(pts)
+
+    @staticmethod
+    def order_points(pts):
+        """(N, 4, 2)顶点按get_mini_boxes的规则排序为 左上、右上、右下、左下"""
+        # 按x排序后，左侧两点中y小的为左上、右侧两点中y小的为右上
+        pts = np.take_along_axis(pts, np.argsort(pts[:, :, 0], axis=1, kind="stable")[:, :, np.newaxis], axis=1)
+        rows = np.arange(len(pts))
+        left_swap = pts[:, 1, 1] <= pts[:, 0, 1]
+        right_swap = pts[:, 3, 1] <= pts[:, 2, 1]
+        index_1 = np.where(left_swap, 1, 0)
+        index_4 = 1 - index_1
+        index_2 = np.where(right_swap, 3, 2)
+        index_3 = 5 - index_2
+        return np.stack([pts[rows, index_1], pts[rows, index_2], pts[rows, index_3], pts[rows, index_4]], axis=1)
+
+    def rect_scores(self, pred, points, angles):
+        """批量计算矩形内的平均分数，轴对齐矩形使用积分图，旋转矩形回退到box_score_fast"""
+        h, w = pred.shape[:2]
+        scores = np.zeros(len(points), dtype=np.float64)
+        if not len(points):
+            return scores
+
+        # 与box_score_fast相同的像素范围：裁剪区域为 [floor(min), ceil(max)]，填充区域截断到整数
+        min_xy = points.min(axis=1)
+        max_xy = points.max(axis=1)
+        xmin = np.clip(np.floor(min_xy[:, 0]), 0, w - 1).astype(np.int64)
+        xmax = np.clip(np.ceil(max_xy[:, 0]), 0, w - 1).astype(np.int64)
+        ymin = np.clip(np.floor(min_xy[:, 1]), 0, h - 1).astype(np.int64)
+        ymax = np.clip(np.ceil(max_xy[:, 1]), 0, h - 1).astype(np.int64)
+        x0 = xmin + np.maximum(0, np.trunc(min_xy[:, 0] - xmin)).astype(np.int64)
+        x1 = xmin + np.minimum(xmax - xmin, np.trunc(max_xy[:, 0] - xmin)).astype(np.int64)
+        y0 = ymin + np.maximum(0, np.trunc(min_xy[:, 1] - ymin)).astype(np.int64)
+        y1 = ymin + np.minimum(ymax - ymin, np.trunc(max_xy[:, 1] - ymin)).astype(np.int64)
+
+        integral = cv2.integral(pred.astype(np.float32), sdepth=cv2.CV_64F)
+        area = (x1 - x0 + 1) * (y1 - y0 + 1)
+        valid = (x1 >= x0) & (y1 >= y0)
+        sums = (integral[y1 + 1, x1 + 1] - integral[y0, x1 + 1]
+                - integral[y1 + 1, x0] + integral[y0, x0])
+        scores[valid] = sums[valid] / area[valid]
+
+        rotated = np.nonzero(np.mod(angles, 90) != 0)[0]
+        for idx in rotated:
+            scores[idx] = self.box_score_fast(pred, points[idx])
+        return scores
+
+    def accept_score(self, score, points):
+        """分数达到box_thresh，或落在容差范围内且多边形质量足够时保留"""
+        if score >= self.box_thresh:
+            return True
+        if score < self.box_thresh - self.box_score_thres_delta:
+            return False
+        return self.assess_polygon_quality(np.asarray(points, dtype=np.float32)) >= self.min_quality
+
+    @staticmethod
+    def assess_polygon_quality(polygon):
+        """多边形质量：圆度（4π*面积/周长²）与短长边比的加权和，范围0-1"""
+        polygon = polygon.reshape(-1, 1, 2).astype(np.float32)
+        area = cv2.contourArea(polygon)
+        perimeter = cv2.arcLength(polygon, True)
+        if perimeter == 0:
+            return 0.0
+
+        circularity = 4 * np.pi * area / (perimeter * perimeter)
+        width, height = cv2.minAreaRect(polygon)[1]
+        aspect_ratio = min(width, height) / max(width, height, 1e-5)
+
+        quality_score = circularity * 0.7 + aspect_ratio * 0.3
+        return min(max(quality_score, 0.0), 1.0)
+
+    @staticmethod
+    def rect_quality(sizes):
+        """批量计算矩形的assess_polygon_quality，sizes为 (N, 2) 的宽高"""
+        perimeter = 2 * sizes.sum(axis=1)
+        circularity = 4 * np.pi * sizes.prod(axis=1) / np.maximum(perimeter * perimeter, 1e-10)
+        aspect_ratio = sizes.min(axis=1) / np.maximum(sizes.max(axis=1), 1e-5)
+        return np.clip(circularity * 0.7 + aspect_ratio * 0.3, 0.0, 1.0)
+
+    def detect_missing_text_lines(self, pred, boxes, dest_width, dest_height):
+        """
+        补检缺失的文本行
+
+        已检出的文本框映射回概率图坐标后涂黑，在剩余区域用missing_thresh重新二值化，
+        取外轮廓的最小外接矩形，分数不低于missing_box_thresh的按相同方式unclip后返回
+
+        Returns:
+            (boxes, scores): 目标图像坐标下的新增文本框
+        """
+        height, width = pred.shape[:2]
+        covered = np.zeros((height, width), dtype=np.uint8)
+        scale = np.array([width / dest_width, height / dest_height], dtype=np.float32)
+        polygons = [np.round(np.asarray(box, dtype=np.float32).reshape(-1, 2) * scale).astype(np.int32)
+                    for box in boxes]
+        if polygons:
+            cv2.fillPoly(covered, polygons, 1)
+
+        missing_mask = ((pred > self.missing_thresh) & (covered == 0)).astype(np.uint8)
+        contours, _ = cv2.findContours(missing_mask * 255, cv2.RETR_EXTERNAL,
+                                       cv2.CHAIN_APPROX_SIMPLE)[-2:]
+
+        missing_boxes, missing_scores = [], []
+        for contour in contours[:self.max_candidates]:
+            points, sside = self.get_mini_boxes(contour)
+            if sside < self.min_size:
+                continue
+            points = np.array(points)
+            score = self.box_score_fast(pred, points)
+            if score < self.missing_box_thresh:
+                continue
+
+            box = self.unclip(points, self.unclip_ratio)
+            if len(box) != 1:
+                continue
+            box, sside = self.get_mini_boxes(box.reshape(-1, 1, 2))
+            if sside < self.min_size + 2:
+                continue
+            box = np.array(box)
+            box[:, 0] = np.clip(np.round(box[:, 0] / width * dest_width), 0, dest_width)
+            box[:, 1] = np.clip(np.round(box[:, 1] / height * dest_height), 0, dest_height)
+            missing_boxes.append(box.astype("int32"))
+            missing_scores.append(score)
+        return missing_boxes, missing_scores
+
+    def merge_adjacent_text_lines(self, boxes, scores):
+        """
+        合并同一文本行内水平重叠的文本框
+
+        按中心y排序后，相邻中心y差小于merge_y_threshold的框归为同一行；
+        行内按左边界排序扫描，与当前合并框的水平重叠超过较窄框宽度的merge_overlap_threshold时并入，
+        整体为 O(n log n)，不做逐对比较
+
+        Returns:
+            (boxes, scores): 合并后的文本框（quad为最小外接矩形，poly为凸包）与分数（取最大值）
+        """
+        if len(boxes) <= 1:
+            return boxes, scores
+
+        polygons = [np.asarray(box, dtype=np.float32).reshape(-1, 2) for box in boxes]
+        y_center = np.array([polygon[:, 1].mean() for polygon in polygons])
+        x_min = np.array([polygon[:, 0].min() for polygon in polygons])
+        x_max = np.array([polygon[:, 0].max() for polygon in polygons])
+
+        order = np.argsort(y_center, kind="stable")
+        line_breaks = np.flatnonzero(np.diff(y_center[order]) >= self.merge_y_threshold) + 1
+
+        groups = []
+        for line in np.split(order, line_breaks):
+            line = line[np.argsort(x_min[line], kind="stable")]
+            group = [line[0]]
+            left, right = x_min[line[0]], x_max[line[0]]
+            for idx in line[1:]:
+                overlap = min(right, x_max[idx]) - max(left, x_min[idx])
+                min_width = min(right - left, x_max[idx] - x_min[idx])
+                if overlap > 0 and overlap > self.merge_overlap_threshold * min_width:
+                    group.append(idx)
+                    left, right = min(left, x_min[idx]), max(right, x_max[idx])
+                else:
+                    groups.append(group)
+                    group = [idx]
+                    left, right = x_min[idx], x_max[idx]
+            groups.append(group)
+
+        merged_boxes, merged_scores = [], []
+        for group in groups:
+            if len(group) == 1:
+                merged_boxes.append(boxes[group[0]])
+            else:
+                points = np.concatenate([polygons[idx] for idx in group], axis=0)
+                if self.box_type == 'quad':
+                    box, _ = self.get_mini_boxes(points.reshape(-1, 1, 2))
+                    merged_boxes.append(np.round(np.array(box)).astype("int32"))
+                else:
+                    merged_boxes.append(cv2.convexHull(points).reshape(-1, 2).round().tolist())
+            merged_scores.append(max(scores[idx] for idx in group))
+        return merged_boxes, merged_scores
+
     def unclip(self, box, unclip_ratio):
         poly = Polygon(box)
         distance = poly.area * unclip_ratio / poly.length
@@ -226,6 +496,14 @@ class DBPostProcess(object):
             else:
                 raise ValueError("box_type can only be one of ['quad', 'poly']")
 
+            if self.detect_missing:
+                missing_boxes, missing_scores = self.detect_missing_text_lines(pred[batch_index], boxes, src_w, src_h)
+                boxes, scores = list(boxes) + missing_boxes, list(scores) + missing_scores
+            if self.merge_lines:
+                boxes, scores = self.merge_adjacent_text_lines(list(boxes), list(scores))
+            if self.box_type == 'quad' and (self.detect_missing or self.merge_lines):
+                boxes = np.array(boxes, dtype="int32").reshape(-1, 4, 2)
+
             boxes_batch.append({'points': boxes})
         return boxes_batch
 
@@ -42,6 +42,9 @@ class BaseRecLabelDecode(object):
         for i, char in enumerate(dict_character):
             self.dict[char] = i
         self.character = dict_character
+        # decode_batch使用的查找表：字符与字符长度
+        self.character_table = np.array(dict_character, dtype=object)
+        self.character_lengths = np.array([len(char) for char in dict_character], dtype=np.int64)
 
     def pred_reverse(self, pred):
         pred_re = []
@@ -94,6 +97,45 @@ class BaseRecLabelDecode(object):
             result_list.append((text, np.mean(conf_list).tolist()))
         return result_list
 
+    def decode_batch(self, text_index, text_prob=None, is_remove_duplicate=False):
+        """
+        decode的向量化实现，整批一次完成去重、去blank与置信度均值
+
+        所有行选中的字符经查找表拼接为一个字符串，再按每行的字符长度切分；
+        结果与decode一致（置信度均值先以float64累加再转换回输入精度）
+        """
+        text_index = np.asarray(text_index)
+        if text_index.ndim != 2 or text_index.shape[1] == 0:
+            return self.decode(text_index, text_prob, is_remove_duplicate)
+
+        selection = np.ones(text_index.shape, dtype=bool)
+        if is_remove_duplicate:
+            selection[:, 1:] = text_index[:, 1:] != text_index[:, :-1]
+        for ignored_token in self.get_ignored_tokens():
+            selection &= text_index != ignored_token
+
+        counts = selection.sum(axis=1)
+        if text_prob is not None:
+            text_prob = np.asarray(text_prob)
+            conf_sums = np.where(selection, text_prob, 0).sum(axis=1, dtype=np.float64)
+            confs = np.divide(conf_sums, counts, out=np.zeros(len(counts)), where=counts > 0)
+            confs = confs.astype(text_prob.dtype).tolist()
+        else:
+            confs = [1.0] * len(counts)
+
+        flat_text = ''.join(self.character_table[text_index[selection]])
+        text_ends = np.cumsum(np.where(selection, self.character_lengths[text_index], 0).sum(axis=1)).tolist()
+
+        result_list = []
+        text_start = 0
+        for text_end, conf in zip(text_ends, confs):
+            text = flat_text[text_start:text_end]
+            text_start = text_end
+            if self.reverse:  # for arabic rec
+                text = self.pred_reverse(text)
+            result_list.append((text, conf))
+        return result_list
+
     def get_ignored_tokens(self):
         return [0]  # for ctc blank
 
@@ -111,8 +153,8 @@ class CTCLabelDecode(BaseRecLabelDecode):
             preds = preds[-1]
 
         preds_idx = preds.argmax(axis=2)
-        preds_prob = preds.max(axis=2)
-        text = self.decode(preds_idx, preds_prob, is_remove_duplicate=True)
+        preds_prob = np.take_along_axis(preds, preds_idx[:, :, np.newaxis], axis=2)[:, :, 0]
+        text = self.decode_batch(preds_idx, preds_prob, is_remove_duplicate=True)
         if label is None:
             return text
         label = self.decode(label)
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+生成OCR（det/rec/cls）与版面分析模型的INT8量化版本
+量化模型保存在fp32模型同目录，文件名追加 _int8 后缀；
+OCRConfig/LayoutAnalyzer/RapidLayout 设置 precision="int8"（或环境变量 MODEL_PRECISION=int8）时自动使用
+
+用法:
+    # 动态量化（只量化权重，不需要校准数据）
+    python quantize_models.py --mode dynamic
+    # 静态量化（在本地语料上用fp32模型采集各模型的真实输入作为校准数据）
+    python quantize_models.py --mode static --corpus /path/to/corpus
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+import cv2
+
+# 添加模块路径
+current_dir = Path(__file__).resolve().parent
+if str(current_dir) not in sys.path:
+    sys.path.append(str(current_dir))
+
+from page_images import PDFPageImages
+from onnx_sessions import int8_model_path
+
+OCR_MODELS = ("det", "rec", "cls")
+ALL_MODELS = OCR_MODELS + ("layout",)
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff")
+
+
+def iter_corpus_pages(corpus_dir, dpi=200, max_pages=None):
+    """
+    按文件名顺序遍历语料目录中的页面图像（PDF逐页渲染，图片直接读取）
+
+    Yields:
+        tuple: (页面名称, BGR图像)
+    """
+    count = 0
+    for path in sorted(Path(corpus_dir).rglob("*")):
+        suffix = path.suffix.lower()
+        if suffix == ".pdf":
+            with PDFPageImages(str(path), dpi=dpi) as page_images:
+                for page_idx, img in page_images.stream():
+                    if max_pages is not None and count >= max_pages:
+                        return
+                    yield f"{path.name}#{page_idx}", img
+                    count += 1
+        elif suffix in IMAGE_EXTENSIONS:
+            if max_pages is not None and count >= max_pages:
+                return
+            img = cv2.imread(str(path))
+            if img is None:
+                print(f"警告: 无法读取图像 {path}")
+                continue
+            yield path.name, img
+            count += 1
+
+
+def get_model_paths(layout_model_type):
+    """fp32模型路径：{模型名: 路径}"""
+    from ppocr.ocr_stage import resolve_model_paths
+    from RapidLayout.rapid_layout import RapidLayout
+
+    ocr_paths = resolve_model_paths({})
+    return {
+        "det": ocr_paths["det_model_dir"],
+        "rec": ocr_paths["rec_model_dir"],
+        "cls": ocr_paths["cls_model_dir"],
+        "layout": str(RapidLayout.get_model_path(layout_model_type, None)),
+    }
+
+
+class _RecordingSession:
+    """包装InferenceSession，记录每次推理的输入作为静态量化的校准数据"""
+
+    def __init__(self, session, samples, max_samples):
+        self._session = session
+        self._samples = samples
+        self._max_samples = max_samples
+
+    def run(self, output_names, input_feed, *args, **kwargs):
+        if len(self._samples) < self._max_samples:
+            self._samples.append({name: value.copy() for name, value in input_feed.items()})
+        return self._session.run(output_names, input_feed, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+
+def collect_calibration_data(corpus_dir, models, layout_model_type, dpi=200, max_pages=None, max_samples=64):
+    """
+    用fp32模型处理语料，采集各模型的真实输入
+
+    rec/cls的输入依赖det的检测结果，因此直接运行完整的OCR流程记录每个会话的输入
+
+    Returns:
+        dict: {模型名: [input_feed, ...]}
+    """
+    samples = {name: [] for name in models}
+
+    ocr_model = None
+    if any(name in OCR_MODELS for name in models):
+        from ppocr.ocr_stage import get_ocr_model
+        ocr_model = get_ocr_model(use_angle_cls="cls" in models, use_gpu=False, precision="fp32")
+        if "det" in models:
+            ocr_model.text_detector.det_onnx_session = _RecordingSession(
+                ocr_model.text_detector.det_onnx_session, samples["det"], max_samples)
+        if "rec" in models:
+            ocr_model.text_recognizer.rec_onnx_session = _RecordingSession(
+                ocr_model.text_recognizer.rec_onnx_session, samples["rec"], max_samples)
+        if "cls" in models:
+            ocr_model.text_classifier.cls_onnx_session = _RecordingSession(
+                ocr_model.text_classifier.cls_onnx_session, samples["cls"], max_samples)
+
+    layout_engine = None
+    if "layout" in models:
+        from RapidLayout.rapid_layout import RapidLayout
+        layout_engine = RapidLayout(model_type=layout_model_type, precision="fp32")
+        layout_engine.session.session = _RecordingSession(
+            layout_engine.session.session, samples["layout"], max_samples)
+
+    for page_name, img in iter_corpus_pages(corpus_dir, dpi=dpi, max_pages=max_pages):
+        print(f"采集校准数据: {page_name}")
+        if ocr_model is not None:
+            ocr_model(img, "cls" in models)
+        if layout_engine is not None:
+            layout_engine(img)
+        if all(len(samples[name]) >= max_samples for name in models):
+            break
+
+    return samples
+
+
+class _FeedDataReader:
+    """按顺序返回采集到的input_feed（onnxruntime.quantization.CalibrationDataReader接口）"""
+
+    def __init__(self, feeds):
+        self._iter = iter(feeds)
+
+    def get_next(self):
+        return next(self._iter, None)
+
+    def rewind(self):
+        pass
+
+
+def quantize_model(model_path, output_path, mode="dynamic", feeds=None, per_channel=False):
+    """
+    量化单个模型
+
+    Args:
+        model_path: fp32模型路径
+        output_path: INT8模型输出路径
+        mode: dynamic（只量化权重）或static（权重与激活均量化，需要校准数据）
+        feeds: 静态量化的校准输入
+        per_channel: 是否按通道量化权重
+    """
+    from onnxruntime.quantization import (
+        CalibrationMethod,
+        QuantFormat,
+        QuantType,
+        quantize_dynamic,
+        quantize_static,
+    )
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # 量化前先做图优化与形状推断，量化覆盖的算子更完整
+        prepared_path = os.path.join(tmp_dir, "prepared.onnx")
+        try:
+            quant_pre_process(str(model_path), prepared_path)
+        except Exception as e:
+            print(f"警告: 量化预处理失败，直接量化原始模型: {e}")
+            prepared_path = str(model_path)
+
+        if mode == "dynamic":
+            quantize_dynamic(
+                prepared_path,
+                str(output_path),
+                per_channel=per_channel,
+                weight_type=QuantType.QUInt8,
+            )
+        else:
+            quantize_static(
+                prepared_path,
+                str(output_path),
+                _FeedDataReader(feeds),
+                quant_format=QuantFormat.QDQ,
+                per_channel=per_channel,
+                activation_type=QuantType.QUInt8,
+                weight_type=QuantType.QInt8,
+                calibrate_method=CalibrationMethod.MinMax,
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成INT8量化模型")
+    parser.add_argument("--models", nargs="+", choices=ALL_MODELS, default=list(ALL_MODELS),
+                        help="需要量化的模型（默认：全部）")
+    parser.add_argument("--mode", choices=("dynamic", "static"), default="dynamic",
+                        help="量化方式（默认：dynamic）")
+    parser.add_argument("--corpus", help="静态量化的校准语料目录（PDF或图片）")
+    parser.add_argument("--layout-model-type", default="doclayout_docstructbench",
+                        help="版面分析模型类型（默认：doclayout_docstructbench）")
+    parser.add_argument("--dpi", type=int, default=200, help="PDF渲染分辨率（默认：200）")
+    parser.add_argument("--max-pages", type=int, help="最多使用的语料页面数")
+    parser.add_argument("--max-samples", type=int, default=64, help="每个模型的校准样本数（默认：64）")
+    parser.add_argument("--per-channel", action="store_true", help="按通道量化权重")
+    args = parser.parse_args()
+
+    if args.mode == "static" and not args.corpus:
+        parser.error("静态量化需要通过 --corpus 指定校准语料")
+
+    model_paths = get_model_paths(args.layout_model_type)
+    models = [name for name in args.models if os.path.exists(model_paths[name])]
+    for name in set(args.models) - set(models):
+        print(f"警告: 模型不存在，跳过 {name}: {model_paths[name]}")
+    if not models:
+        return 1
+
+    samples = {}
+    if args.mode == "static":
+        samples = collect_calibration_data(
+            args.corpus, models, args.layout_model_type,
+            dpi=args.dpi, max_pages=args.max_pages, max_samples=args.max_samples
+        )
+
+    failed = 0
+    for name in models:
+        model_path = model_paths[name]
+        output_path = int8_model_path(model_path)
+        if args.mode == "static" and not samples.get(name):
+            print(f"❌ {name}: 没有采集到校准数据")
+            failed += 1
+            continue
+
+        print(f"量化 {name}: {model_path} -> {output_path}")
+        start_time = time.time()
+        try:
+            quantize_model(model_path, output_path, args.mode, samples.get(name), args.per_channel)
+        except Exception as e:
+            print(f"❌ {name} 量化失败: {e}")
+            failed += 1
+            continue
+
+        fp32_size = os.path.getsize(model_path) / (1024 * 1024)
+        int8_size = os.path.getsize(output_path) / (1024 * 1024)
+        print(f"✅ {name}: {fp32_size:.1f}MB -> {int8_size:.1f}MB, 耗时 {time.time() - start_time:.1f}秒")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
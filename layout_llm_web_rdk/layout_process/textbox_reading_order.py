@@ -9,17 +9,33 @@
 import os
 import sys
 import json
-import torch
 import statistics
 from pathlib import Path
-from transformers import LayoutLMv3ForTokenClassification
 from collections import defaultdict
 
+import numpy as np
+
+# torch/transformers只有torch后端需要；使用onnxruntime后端时可以不安装
+try:
+    import torch
+    from transformers import LayoutLMv3ForTokenClassification
+except ImportError:
+    torch = None
+    LayoutLMv3ForTokenClassification = None
+
+try:
+    import onnxruntime
+    from onnx_sessions import get_shared_session
+except ImportError:
+    onnxruntime = None
+    get_shared_session = None
+
 # ==== 以下为 helpers.py 关键函数 ==== #
 MAX_LEN = 510
 CLS_TOKEN_ID = 0
 UNK_TOKEN_ID = 3
 EOS_TOKEN_ID = 2
+PAD_TOKEN_ID = 1
 
 def boxes2inputs(boxes):
     bbox = [[0, 0, 0, 0]] + boxes + [[0, 0, 0, 0]]
@@ -31,6 +47,21 @@ def boxes2inputs(boxes):
         "input_ids": torch.tensor([input_ids]),
     }
 
+def boxes2inputs_batch(boxes_list, pad_token_id=PAD_TOKEN_ID):
+    """将多个页面的bbox补齐到相同长度，补齐位置的attention_mask为0（返回int64的numpy数组）"""
+    max_len = max(len(boxes) for boxes in boxes_list) + 2
+    bbox, input_ids, attention_mask = [], [], []
+    for boxes in boxes_list:
+        pad_len = max_len - len(boxes) - 2
+        bbox.append([[0, 0, 0, 0]] + boxes + [[0, 0, 0, 0]] + [[0, 0, 0, 0]] * pad_len)
+        input_ids.append([CLS_TOKEN_ID] + [UNK_TOKEN_ID] * len(boxes) + [EOS_TOKEN_ID] + [pad_token_id] * pad_len)
+        attention_mask.append([1] * (len(boxes) + 2) + [0] * pad_len)
+    return {
+        "bbox": np.array(bbox, dtype=np.int64).reshape(len(boxes_list), max_len, 4),
+        "attention_mask": np.array(attention_mask, dtype=np.int64),
+        "input_ids": np.array(input_ids, dtype=np.int64),
+    }
+
 def prepare_inputs(inputs, model):
     ret = {}
     for k, v in inputs.items():
@@ -41,8 +72,9 @@ def prepare_inputs(inputs, model):
     return ret
 
 def parse_logits(logits, length):
-    logits = logits[1 : length + 1, :length]
-    orders = logits.argsort(descending=False).tolist()
+    # 同时支持torch张量和numpy数组
+    logits = np.asarray(logits)[1 : length + 1, :length]
+    orders = logits.argsort(axis=-1, kind="stable").tolist()
     ret = [o.pop() for o in orders]
     while True:
         order_to_idxes = defaultdict(list)
@@ -69,169 +101,350 @@ def calculate_median(numbers):
         return float('inf')  # 如果没有数字，返回无穷大，让它排在最后
     return statistics.median(numbers)
 
-def process_textboxes_reading_order(input_json_path, output_json_path, model_path=None):
+# 阅读顺序推理时每批的页面数量
+LAYOUTREADER_BATCH_SIZE = 8
+
+# LayoutReader默认模型目录，以及导出的ONNX模型文件名（见export_layoutreader_onnx.py）
+DEFAULT_LAYOUTREADER_PATH = "/home/m/.cache/modelscope/hub/models/ppaanngggg/layoutreader"
+LAYOUTREADER_ONNX_NAME = "layoutreader.onnx"
+
+# 推理后端：auto（存在导出的ONNX模型且安装了onnxruntime时使用onnx，否则使用torch）、onnx、torch
+LAYOUTREADER_BACKEND = os.environ.get("LAYOUTREADER_BACKEND", "auto")
+
+# 进程内共享的LayoutReader模型，按模型路径和后端区分
+_model_cache = {}
+
+
+class LayoutReaderOnnx:
+    """基于onnxruntime的LayoutReader推理，不依赖torch/transformers"""
+    
+    def __init__(self, onnx_path, pad_token_id=PAD_TOKEN_ID):
+        """
+        Args:
+            onnx_path: 导出的ONNX模型路径
+            pad_token_id: 补齐位置使用的token id
+        """
+        self.onnx_path = str(onnx_path)
+        self.pad_token_id = pad_token_id
+        
+        self.session = get_shared_session(self.onnx_path, ["CPUExecutionProvider"], "reading_order")
+        self.input_names = [node.name for node in self.session.get_inputs()]
+    
+    def predict_logits(self, inputs):
+        """
+        Args:
+            inputs: boxes2inputs_batch的输出
+        
+        Returns:
+            np.ndarray: logits (batch, seq_len, num_labels)
+        """
+        feed = {name: inputs[name] for name in self.input_names}
+        return self.session.run(None, feed)[0]
+
+
+def resolve_layoutreader_backend(model_path, backend=None):
     """
-    处理合并后的JSON文件，为文本框添加阅读顺序信息
+    确定LayoutReader推理后端
     
-    Args:
-        input_json_path: 输入JSON文件路径 (merged_blocks_ocr_result.json)
-        output_json_path: 输出JSON文件路径
-        model_path: 模型路径（如果为None，使用默认路径）
+    Returns:
+        tuple: (后端名称, 模型路径)，onnx后端返回ONNX文件路径
     """
+    backend = backend or LAYOUTREADER_BACKEND
     
-    # 加载模型
-    print("加载LayoutReader模型...")
+    if str(model_path).endswith(".onnx"):
+        onnx_path = str(model_path)
+    else:
+        onnx_path = os.path.join(model_path, LAYOUTREADER_ONNX_NAME)
+    
+    if backend == "auto":
+        if onnxruntime is not None and os.path.exists(onnx_path):
+            backend = "onnx"
+        else:
+            backend = "torch"
+    
+    if backend == "onnx":
+        if onnxruntime is None:
+            raise ImportError("使用onnx后端需要安装onnxruntime")
+        return backend, onnx_path
+    if backend == "torch":
+        if torch is None:
+            raise ImportError("使用torch后端需要安装torch和transformers")
+        return backend, str(model_path)
+    raise ValueError(f"不支持的LayoutReader后端: {backend}")
+
+def load_layoutreader_model(model_path=None, backend=None):
+    """
+    加载LayoutReader模型，同一进程内相同路径的模型只加载一次
+    
+    Args:
+        model_path: 模型目录或导出的ONNX文件路径（如果为None，使用默认路径）
+        backend: 推理后端，auto/onnx/torch，默认取LAYOUTREADER_BACKEND环境变量
+    
+    Returns:
+        LayoutLMv3ForTokenClassification或LayoutReaderOnnx: 可用于推理的模型
+    """
     if model_path is None:
-        model_path = "/home/m/.cache/modelscope/hub/models/ppaanngggg/layoutreader"
+        model_path = DEFAULT_LAYOUTREADER_PATH
     
-    model = LayoutLMv3ForTokenClassification.from_pretrained(model_path)
-    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-    print(f"使用设备: {device}")
-    model = model.to(device)
-    model.eval()
+    backend, model_path = resolve_layoutreader_backend(model_path, backend)
+    cache_key = (backend, model_path)
     
-    # 读取JSON文件
-    print(f"读取JSON文件: {input_json_path}")
-    with open(input_json_path, 'r', encoding='utf-8') as f:
-        merged_data = json.load(f)
+    model = _model_cache.get(cache_key)
+    if model is None:
+        print(f"加载LayoutReader模型（{backend}）...")
+        if backend == "onnx":
+            model = LayoutReaderOnnx(model_path)
+        else:
+            model = LayoutLMv3ForTokenClassification.from_pretrained(model_path)
+            device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+            print(f"使用设备: {device}")
+            model = model.to(device)
+            model.eval()
+        _model_cache[cache_key] = model
+    return model
+
+def predict_logits(model, inputs):
+    """
+    对一批输入运行LayoutReader
     
-    # 创建输出结构
-    output_data = {}
-    global_textbox_order = 0  # 全局文本框阅读顺序计数器
+    Args:
+        model: load_layoutreader_model返回的模型
+        inputs: boxes2inputs_batch的输出
     
-    # 按页码顺序处理每个页面 - 使用page_index排序而不是字符串排序
-    page_items = [(page_key, page_data) for page_key, page_data in merged_data.items()]
-    page_items.sort(key=lambda x: x[1]["page_info"]["page_index"])
+    Returns:
+        np.ndarray: logits (batch, seq_len, num_labels)
+    """
+    if isinstance(model, LayoutReaderOnnx):
+        return model.predict_logits(inputs)
     
-    # 处理每个页面
-    for page_key, page_data in page_items:
-        page_idx = page_data["page_info"]["page_index"]
-        
-        print(f"\n处理 {page_key} (第{page_idx+1}页)")
-        
-        # 收集页面中所有的文本框（包括虚拟文本框）
-        all_textboxes = []
-        textbox_metadata = []  # 存储文本框的元数据（块索引、文本框在块中的索引）
-        
-        for block_idx, block in enumerate(page_data["blocks"]):
-            for textbox_idx_in_block, textbox in enumerate(block["contained_text_boxes"]):
-                # 处理所有文本框（包括虚拟文本框）
-                bbox = textbox.get("bbox", [])
-                if len(bbox) >= 4:
-                    all_textboxes.append(textbox)
-                    textbox_metadata.append({
-                        "block_idx": block_idx,
-                        "textbox_idx_in_block": textbox_idx_in_block,
-                        "original_textbox": textbox,
-                        "is_virtual": textbox.get("is_virtual", False)
-                    })
-        
-        # print(f"页面中共有 {len(all_textboxes)} 个文本框（包括虚拟文本框）")
-        
-        # 如果没有文本框，跳过
-        if not all_textboxes:
-            output_data[page_key] = page_data.copy()
-            continue
-        
-        # 提取bbox并归一化
-        boxes = []
-        for textbox in all_textboxes:
-            bbox = textbox["bbox"]
-            x1, y1, x2, y2 = bbox[:4]
-            
-            # 归一化坐标到0-1000范围 (假设页面尺寸为1700x2200)
-            x1 = min(1000, max(0, int(x1 * 1000 / 1700)))
-            y1 = min(1000, max(0, int(y1 * 1000 / 2200)))
-            x2 = min(1000, max(0, int(x2 * 1000 / 1700)))
-            y2 = min(1000, max(0, int(y2 * 1000 / 2200)))
-            boxes.append([x1, y1, x2, y2])
-        
-        # 使用模型推理阅读顺序
-        inputs = boxes2inputs(boxes)
-        inputs = prepare_inputs(inputs, model)
+    inputs = prepare_inputs({k: torch.from_numpy(v) for k, v in inputs.items()}, model)
+    with torch.no_grad():
+        return model(**inputs).logits.float().cpu().numpy()
+
+def collect_page_textboxes(page_data):
+    """
+    收集页面中的所有文本框（包括虚拟文本框）并归一化坐标
+    
+    Args:
+        page_data: 合并后的页面数据（包含page_info和blocks）
+    
+    Returns:
+        tuple: (文本框列表, 文本框元数据列表, 归一化到0-1000的bbox列表)
+    """
+    all_textboxes = []
+    textbox_metadata = []  # 存储文本框的元数据（块索引、文本框在块中的索引）
+    
+    for block_idx, block in enumerate(page_data["blocks"]):
+        for textbox_idx_in_block, textbox in enumerate(block["contained_text_boxes"]):
+            # 处理所有文本框（包括虚拟文本框）
+            bbox = textbox.get("bbox", [])
+            if len(bbox) >= 4:
+                all_textboxes.append(textbox)
+                textbox_metadata.append({
+                    "block_idx": block_idx,
+                    "textbox_idx_in_block": textbox_idx_in_block,
+                    "original_textbox": textbox,
+                    "is_virtual": textbox.get("is_virtual", False)
+                })
+    
+    # 提取bbox并归一化
+    boxes = []
+    for textbox in all_textboxes:
+        bbox = textbox["bbox"]
+        x1, y1, x2, y2 = bbox[:4]
         
-        with torch.no_grad():
-            logits = model(**inputs).logits.cpu().squeeze(0)
+        # 归一化坐标到0-1000范围 (假设页面尺寸为1700x2200)
+        x1 = min(1000, max(0, int(x1 * 1000 / 1700)))
+        y1 = min(1000, max(0, int(y1 * 1000 / 2200)))
+        x2 = min(1000, max(0, int(x2 * 1000 / 1700)))
+        y2 = min(1000, max(0, int(y2 * 1000 / 2200)))
+        boxes.append([x1, y1, x2, y2])
+    
+    return all_textboxes, textbox_metadata, boxes
+
+def predict_reading_orders(model, boxes_list, batch_size=LAYOUTREADER_BATCH_SIZE):
+    """
+    批量推理多个页面的阅读顺序
+    
+    页面按文本框数量排序后分批，同一批内补齐到相同长度，一次前向计算整批页面
+    
+    Args:
+        model: LayoutReader模型
+        boxes_list: 每个页面的归一化bbox列表（不能为空）
+        batch_size: 每批的页面数量
+    
+    Returns:
+        list: 每个页面的阅读顺序（与boxes_list一一对应）
+    """
+    if isinstance(model, LayoutReaderOnnx):
+        pad_token_id = model.pad_token_id
+    else:
+        pad_token_id = getattr(model.config, "pad_token_id", None)
+    if pad_token_id is None:
+        pad_token_id = PAD_TOKEN_ID
+    
+    orders = [None] * len(boxes_list)
+    # 长度相近的页面放在同一批，减少补齐带来的无效计算
+    indices = sorted(range(len(boxes_list)), key=lambda i: len(boxes_list[i]))
+    
+    for start in range(0, len(indices), max(1, batch_size)):
+        batch_indices = indices[start:start + max(1, batch_size)]
+        inputs = boxes2inputs_batch([boxes_list[i] for i in batch_indices], pad_token_id)
+        logits = predict_logits(model, inputs)
         
         # 解析阅读顺序
-        orders = parse_logits(logits, len(boxes))
-        # print(f"文本框阅读顺序: {orders}")
-        
-        # 创建阅读顺序映射 - 从原始文本框索引到阅读顺序的映射
-        reading_order_map = {}
-        for reading_order, original_textbox_idx in enumerate(orders):
-            if 0 <= original_textbox_idx < len(textbox_metadata):
-                metadata = textbox_metadata[original_textbox_idx]
-                key = (metadata["block_idx"], metadata["textbox_idx_in_block"])
-                reading_order_map[key] = {
-                    "page_reading_order": reading_order,
-                    "global_reading_order": global_textbox_order
-                }
-                global_textbox_order += 1
-        
-        # 创建输出页面数据
-        output_page_data = {
-            "page_info": page_data["page_info"].copy(),
-            "blocks": []
+        for row, i in enumerate(batch_indices):
+            orders[i] = parse_logits(logits[row], len(boxes_list[i]))
+    
+    return orders
+
+def apply_reading_orders(page_data, all_textboxes, textbox_metadata, orders, global_textbox_order=0):
+    """
+    将阅读顺序写入页面数据，并按块的中位数阅读顺序排序
+    
+    Returns:
+        tuple: (排序后的页面数据, 下一页起始的全局阅读顺序)
+    """
+    # 创建阅读顺序映射 - 从原始文本框索引到阅读顺序的映射
+    reading_order_map = {}
+    for reading_order, original_textbox_idx in enumerate(orders):
+        if 0 <= original_textbox_idx < len(textbox_metadata):
+            metadata = textbox_metadata[original_textbox_idx]
+            key = (metadata["block_idx"], metadata["textbox_idx_in_block"])
+            reading_order_map[key] = {
+                "page_reading_order": reading_order,
+                "global_reading_order": global_textbox_order
+            }
+            global_textbox_order += 1
+    
+    # 创建输出页面数据
+    output_page_data = {
+        "page_info": page_data["page_info"].copy(),
+        "blocks": []
+    }
+    
+    # 添加文本框统计信息
+    virtual_count = sum(1 for textbox in all_textboxes if textbox.get("is_virtual", False))
+    real_count = len(all_textboxes) - virtual_count
+    output_page_data["page_info"]["total_textboxes"] = len(all_textboxes)
+    output_page_data["page_info"]["virtual_textboxes"] = virtual_count
+    output_page_data["page_info"]["real_textboxes"] = real_count
+    
+    # 处理每个块
+    for block_idx, block in enumerate(page_data["blocks"]):
+        output_block = {
+            "block_info": block["block_info"].copy(),
+            "contained_text_boxes": []
         }
         
-        # 添加文本框统计信息
-        virtual_count = sum(1 for textbox in all_textboxes if textbox.get("is_virtual", False))
-        real_count = len(all_textboxes) - virtual_count
-        output_page_data["page_info"]["total_textboxes"] = len(all_textboxes)
-        output_page_data["page_info"]["virtual_textboxes"] = virtual_count
-        output_page_data["page_info"]["real_textboxes"] = real_count
+        # 收集该块中非虚拟文本框的阅读顺序
+        block_reading_orders = []
         
-        # 处理每个块
-        for block_idx, block in enumerate(page_data["blocks"]):
-            output_block = {
-                "block_info": block["block_info"].copy(),
-                "contained_text_boxes": []
-            }
-            
-            # 收集该块中非虚拟文本框的阅读顺序
-            block_reading_orders = []
+        # 处理块中的文本框
+        for textbox_idx_in_block, textbox in enumerate(block["contained_text_boxes"]):
+            output_textbox = textbox.copy()
             
-            # 处理块中的文本框
-            for textbox_idx_in_block, textbox in enumerate(block["contained_text_boxes"]):
-                output_textbox = textbox.copy()
-                
-                # 为所有文本框（包括虚拟文本框）添加阅读顺序信息
-                key = (block_idx, textbox_idx_in_block)
-                if key in reading_order_map:
-                    reading_info = reading_order_map[key]
-                    output_textbox["page_reading_order"] = reading_info["page_reading_order"]
-                    output_textbox["global_reading_order"] = reading_info["global_reading_order"]
-                    block_reading_orders.append(reading_info["page_reading_order"])
-                    
-                    # 添加文本框类型标识
-                    # if textbox.get("is_virtual", False):
-                    #     print(f"  虚拟文本框 块{block_idx}-文本框{textbox_idx_in_block}: 页面顺序={reading_info['page_reading_order']}, 全局顺序={reading_info['global_reading_order']}")
-                    # else:
-                    #     print(f"  真实文本框 块{block_idx}-文本框{textbox_idx_in_block}: 页面顺序={reading_info['page_reading_order']}, 全局顺序={reading_info['global_reading_order']}")
-                else:
-                    # 如果没有找到阅读顺序信息，设置为-1
-                    output_textbox["page_reading_order"] = -1
-                    output_textbox["global_reading_order"] = -1
+            # 为所有文本框（包括虚拟文本框）添加阅读顺序信息
+            key = (block_idx, textbox_idx_in_block)
+            if key in reading_order_map:
+                reading_info = reading_order_map[key]
+                output_textbox["page_reading_order"] = reading_info["page_reading_order"]
+                output_textbox["global_reading_order"] = reading_info["global_reading_order"]
+                block_reading_orders.append(reading_info["page_reading_order"])
                 
-                output_block["contained_text_boxes"].append(output_textbox)
-            
-            # 计算块的阅读顺序中位数
-            block_median_order = calculate_median(block_reading_orders)
-            output_block["block_info"]["textbox_reading_order_median"] = block_median_order
-            output_block["block_info"]["textbox_count_for_median"] = len(block_reading_orders)
+                # 添加文本框类型标识
+                # if textbox.get("is_virtual", False):
+                #     print(f"  虚拟文本框 块{block_idx}-文本框{textbox_idx_in_block}: 页面顺序={reading_info['page_reading_order']}, 全局顺序={reading_info['global_reading_order']}")
+                # else:
+                #     print(f"  真实文本框 块{block_idx}-文本框{textbox_idx_in_block}: 页面顺序={reading_info['page_reading_order']}, 全局顺序={reading_info['global_reading_order']}")
+            else:
+                # 如果没有找到阅读顺序信息，设置为-1
+                output_textbox["page_reading_order"] = -1
+                output_textbox["global_reading_order"] = -1
             
-            output_page_data["blocks"].append(output_block)
+            output_block["contained_text_boxes"].append(output_textbox)
         
-        # 按块的中位数阅读顺序对块进行排序
-        output_page_data["blocks"].sort(key=lambda block: block["block_info"]["textbox_reading_order_median"])
+        # 计算块的阅读顺序中位数
+        block_median_order = calculate_median(block_reading_orders)
+        output_block["block_info"]["textbox_reading_order_median"] = block_median_order
+        output_block["block_info"]["textbox_count_for_median"] = len(block_reading_orders)
         
-        output_data[page_key] = output_page_data
+        output_page_data["blocks"].append(output_block)
+    
+    # 按块的中位数阅读顺序对块进行排序
+    output_page_data["blocks"].sort(key=lambda block: block["block_info"]["textbox_reading_order_median"])
+    
+    # 打印页面处理结果
+    # print(f"页面 {page_idx+1} 处理完成，共 {len(all_textboxes)} 个文本框已排序")
+    # print(f"块按中位数阅读顺序重新排列")
+    
+    return output_page_data, global_textbox_order
+
+def sort_page_textboxes(page_key, page_data, model, global_textbox_order=0):
+    """
+    使用LayoutReader模型为单个页面的文本框添加阅读顺序，并按块的中位数阅读顺序排序
+    
+    Args:
+        page_key: 页面键名，如 page0
+        page_data: 合并后的页面数据（包含page_info和blocks）
+        model: LayoutReader模型
+        global_textbox_order: 本页第一个文本框的全局阅读顺序
+    
+    Returns:
+        tuple: (排序后的页面数据, 下一页起始的全局阅读顺序)
+    """
+    output_data, global_textbox_order = sort_pages_textboxes(
+        [(page_key, page_data)], model, global_textbox_order
+    )
+    return output_data[page_key], global_textbox_order
+
+def sort_pages_textboxes(page_items, model, global_textbox_order=0, batch_size=LAYOUTREADER_BATCH_SIZE):
+    """
+    批量为多个页面的文本框添加阅读顺序
+    
+    Args:
+        page_items: 按页码排好序的 (page_key, page_data) 列表
+        model: LayoutReader模型
+        global_textbox_order: 第一页第一个文本框的全局阅读顺序
+        batch_size: 每次前向计算的页面数量
+    
+    Returns:
+        tuple: ({page_key: 排序后的页面数据}, 下一页起始的全局阅读顺序)
+    """
+    collected = []
+    for page_key, page_data in page_items:
+        page_idx = page_data["page_info"]["page_index"]
+        print(f"\n处理 {page_key} (第{page_idx+1}页)")
+        collected.append(collect_page_textboxes(page_data))
+    
+    # 只对有文本框的页面进行推理
+    boxes_list = [boxes for _, _, boxes in collected if boxes]
+    predicted = iter(predict_reading_orders(model, boxes_list, batch_size) if boxes_list else [])
+    
+    # 全局阅读顺序按页码顺序依次分配
+    output_data = {}
+    for (page_key, page_data), (all_textboxes, textbox_metadata, boxes) in zip(page_items, collected):
+        # 如果没有文本框，跳过
+        if not all_textboxes:
+            output_data[page_key] = page_data.copy()
+            continue
         
-        # 打印页面处理结果
-        # print(f"页面 {page_idx+1} 处理完成，共 {len(all_textboxes)} 个文本框已排序")
-        # print(f"块按中位数阅读顺序重新排列")
+        output_data[page_key], global_textbox_order = apply_reading_orders(
+            page_data, all_textboxes, textbox_metadata, next(predicted), global_textbox_order
+        )
+    
+    return output_data, global_textbox_order
+
+def build_reading_order_output(output_data):
+    """
+    将各页面的排序结果组织为最终的有序输出结构
     
+    Args:
+        output_data: {page_key: 排序后的页面数据}
+    
+    Returns:
+        dict: 包含metadata和pages的最终输出
+    """
     # 创建最终的有序输出结构：按页码和块的中位数顺序
     final_output = {
         "metadata": {
@@ -268,6 +481,37 @@ def process_textboxes_reading_order(input_json_path, output_json_path, model_pat
         
         final_output["pages"].append(page_output)
     
+    return final_output
+
+def process_textboxes_reading_order(input_json_path, output_json_path, model_path=None):
+    """
+    处理合并后的JSON文件，为文本框添加阅读顺序信息
+    
+    Args:
+        input_json_path: 输入JSON文件路径 (merged_blocks_ocr_result.json)
+        output_json_path: 输出JSON文件路径
+        model_path: 模型路径（如果为None，使用默认路径）
+    """
+    
+    # 加载模型
+    model = load_layoutreader_model(model_path)
+    
+    # 读取JSON文件
+    print(f"读取JSON文件: {input_json_path}")
+    with open(input_json_path, 'r', encoding='utf-8') as f:
+        merged_data = json.load(f)
+    
+    global_textbox_order = 0  # 全局文本框阅读顺序计数器
+    
+    # 按页码顺序处理每个页面 - 使用page_index排序而不是字符串排序
+    page_items = [(page_key, page_data) for page_key, page_data in merged_data.items()]
+    page_items.sort(key=lambda x: x[1]["page_info"]["page_index"])
+    
+    # 多个页面打包成批次推理
+    output_data, global_textbox_order = sort_pages_textboxes(page_items, model, global_textbox_order)
+    
+    final_output = build_reading_order_output(output_data)
+    
     # 保存处理后的结果
     os.makedirs(os.path.dirname(output_json_path), exist_ok=True)
     with open(output_json_path, 'w', encoding='utf-8') as f:
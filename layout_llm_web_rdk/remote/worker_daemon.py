@@ -0,0 +1,360 @@
+# -*- coding: utf-8 -*-
+"""
+常驻文档处理服务
+启动时一次性加载版面分析、OCR和LayoutReader模型，通过本地socket接收处理任务，
+避免每次上传都重新启动进程、导入torch/transformers并重新打开ONNX会话
+
+启动: python remote/worker_daemon.py
+app.py检测到服务可用时提交任务，不可用时回退为启动remote/exe.py子进程
+"""
+import os
+import sys
+import time
+import uuid
+import queue
+import secrets
+import subprocess
+import threading
+from multiprocessing.connection import Listener, Client
+
+__dir__ = os.path.dirname(os.path.abspath(__file__))
+
+# 服务地址与认证密钥
+# 请求以pickle传输，密钥必须保密：未设置PIPELINE_WORKER_AUTHKEY时，Unix socket模式由服务启动时
+# 随机生成密钥写入socket旁的密钥文件（仅属主可读写）；TCP模式必须显式设置密钥
+WORKER_ADDRESS = os.environ.get('PIPELINE_WORKER_ADDRESS', os.path.join(__dir__, "pipeline_worker.sock"))
+WORKER_AUTHKEY = os.environ.get('PIPELINE_WORKER_AUTHKEY', '')
+
+# 任务状态
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_CANCELLING = 'cancelling'
+JOB_DONE = 'done'
+JOB_CANCELLED = 'cancelled'
+
+
+def _parse_address(address):
+    """"host:port"形式使用TCP，其余视为Unix socket路径"""
+    host, sep, port = address.rpartition(':')
+    if sep and port.isdigit() and '/' not in address:
+        return (host or '127.0.0.1', int(port))
+    return address
+
+
+def get_authkey_file(address):
+    """Unix socket对应的密钥文件路径"""
+    return os.path.splitext(address)[0] + '.key'
+
+
+def load_authkey(address):
+    """
+    读取认证密钥
+
+    Raises:
+        ValueError: TCP地址未设置PIPELINE_WORKER_AUTHKEY
+        OSError: 密钥文件不存在（服务未启动）
+    """
+    if WORKER_AUTHKEY:
+        return WORKER_AUTHKEY.encode('utf-8')
+    address = _parse_address(address)
+    if not isinstance(address, str):
+        raise ValueError("使用TCP地址时必须设置环境变量PIPELINE_WORKER_AUTHKEY")
+    with open(get_authkey_file(address), 'rb') as f:
+        return f.read().strip()
+
+
+def create_authkey_file(address):
+    """生成随机密钥并写入仅属主可读写的密钥文件"""
+    authkey = secrets.token_hex(32).encode('ascii')
+    key_file = get_authkey_file(address)
+    if os.path.lexists(key_file):
+        os.remove(key_file)
+    fd = os.open(key_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(authkey)
+    return authkey
+
+
+def send_request(request, address=WORKER_ADDRESS, authkey=None):
+    """
+    向常驻服务发送一次请求并返回响应
+
+    Raises:
+        OSError: 服务未启动或无法连接
+        ValueError: TCP地址未设置认证密钥
+    """
+    parsed_address = _parse_address(address)
+    if isinstance(parsed_address, str) and not os.path.exists(parsed_address):
+        raise ConnectionRefusedError(f"服务socket不存在: {parsed_address}")
+    if authkey is None:
+        authkey = load_authkey(address)
+    with Client(parsed_address, authkey=authkey) as conn:
+        conn.send(request)
+        return conn.recv()
+
+
+def is_worker_available(address=WORKER_ADDRESS):
+    """检查常驻服务是否可用"""
+    try:
+        return send_request({'cmd': 'ping'}, address).get('ok', False)
+    except Exception:
+        return False
+
+
+class JobOutput:
+    """
+    按线程分发的输出流，服务启动时替换sys.stdout/sys.stderr
+
+    任务运行期间，任务线程及其创建的线程（如并行执行步骤的线程池）的输出写入任务日志；
+    标记为服务线程的监听与连接处理线程始终写入原输出流，不会混入任务日志
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._log = None
+        self._local = threading.local()
+
+    def mark_service_thread(self):
+        """当前线程的输出始终写入原输出流"""
+        self._local.service = True
+
+    def set_log(self, log):
+        """设置当前任务的日志文件，None表示没有运行中的任务"""
+        self._log = log
+
+    def _target(self):
+        log = self._log
+        if log is None or getattr(self._local, 'service', False):
+            return self._stream
+        return log
+
+    def write(self, text):
+        return self._target().write(text)
+
+    def flush(self):
+        self._target().flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+class PipelineWorker:
+    """常驻文档处理服务"""
+
+    def __init__(self, address=WORKER_ADDRESS, authkey=None):
+        self.address = _parse_address(address)
+        if authkey is None and WORKER_AUTHKEY:
+            authkey = WORKER_AUTHKEY.encode('utf-8')
+        # TCP端口可能被其他主机访问，不允许使用自动生成的密钥文件
+        if authkey is None and not isinstance(self.address, str):
+            raise ValueError("使用TCP地址时必须设置环境变量PIPELINE_WORKER_AUTHKEY")
+        self.authkey = authkey
+        self.stdout = None
+        self.stderr = None
+        self.jobs = {}
+        self.job_queue = queue.Queue()
+        self._lock = threading.Lock()
+
+        self.layout_analyzer = None
+        self.ocr_stage = None
+
+    def load_models(self):
+        """加载并常驻所有模型"""
+        import exe
+        from pipeline import LAYOUT_ANALYZER_KWARGS, OCR_STAGE_KWARGS, LayoutAnalyzer, OCRStage
+        from page_cache import PageResultCache
+        from textbox_reading_order import load_layoutreader_model
+
+        cache = None
+        if exe.PAGE_CACHE_DIR:
+            cache = PageResultCache(exe.PAGE_CACHE_DIR, max_size_mb=exe.PAGE_CACHE_SIZE_MB)
+
+        print("加载版面分析模型...")
+        self.layout_analyzer = LayoutAnalyzer(**LAYOUT_ANALYZER_KWARGS, cache=cache)
+        print("加载OCR模型...")
+        self.ocr_stage = OCRStage(**OCR_STAGE_KWARGS, cache=cache)
+        load_layoutreader_model()
+        print("模型加载完成")
+
+    def _run_job(self, job):
+        """执行单个任务，输出写入任务日志文件供app.py解析进度"""
+        import exe
+
+        with open(job['log_file'], 'a', encoding='utf-8', buffering=1) as log:
+            self.stdout.set_log(log)
+            self.stderr.set_log(log)
+            try:
+                return exe.process_document(
+                    job['pdf_file_path'],
+                    layout_analyzer=self.layout_analyzer,
+                    ocr_stage=self.ocr_stage,
+                    cancel_event=job['cancel_event']
+                )
+            except Exception as e:
+                print(f"处理文档时出错: {e}")
+                import traceback
+                traceback.print_exc()
+                return 1
+            finally:
+                self.stdout.set_log(None)
+                self.stderr.set_log(None)
+
+    def _job_loop(self):
+        """任务按提交顺序逐个执行（模型实例与临时目录不支持并发使用）"""
+        while True:
+            job_id = self.job_queue.get()
+            with self._lock:
+                job = self.jobs.get(job_id)
+                if job is None or job['state'] == JOB_CANCELLED:
+                    continue
+                job['state'] = JOB_RUNNING
+
+            returncode = self._run_job(job)
+
+            with self._lock:
+                # 运行中被取消的任务在当前步骤结束后停止，结果按失败上报
+                if job['state'] == JOB_CANCELLING:
+                    job['state'] = JOB_CANCELLED
+                    returncode = -1
+                else:
+                    job['state'] = JOB_DONE
+                job['returncode'] = returncode
+
+    def handle_request(self, request):
+        """处理一次请求"""
+        cmd = request.get('cmd')
+
+        if cmd == 'ping':
+            return {'ok': True}
+
+        if cmd == 'submit':
+            job_id = str(uuid.uuid4())
+            with self._lock:
+                self.jobs[job_id] = {
+                    'pdf_file_path': request['pdf_file_path'],
+                    'log_file': request['log_file'],
+                    'state': JOB_QUEUED,
+                    'returncode': None,
+                    'cancel_event': threading.Event(),
+                }
+            self.job_queue.put(job_id)
+            return {'ok': True, 'job_id': job_id}
+
+        job_id = request.get('job_id')
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return {'ok': False, 'error': '任务不存在'}
+
+            if cmd == 'status':
+                result = {'ok': True, 'state': job['state'], 'returncode': job['returncode']}
+                # 已结束的任务查询后即可清理
+                if job['state'] in (JOB_DONE, JOB_CANCELLED) and job['returncode'] is not None:
+                    self.jobs.pop(job_id, None)
+                return result
+
+            if cmd == 'cancel':
+                if job['state'] == JOB_QUEUED:
+                    job['returncode'] = -1
+                    job['state'] = JOB_CANCELLED
+                elif job['state'] == JOB_RUNNING:
+                    # 流水线在步骤之间检查取消标志
+                    job['cancel_event'].set()
+                    job['state'] = JOB_CANCELLING
+                return {'ok': True, 'state': job['state']}
+
+        return {'ok': False, 'error': f'未知命令: {cmd}'}
+
+    def _handle_connection(self, conn):
+        self.stdout.mark_service_thread()
+        self.stderr.mark_service_thread()
+        try:
+            with conn:
+                conn.send(self.handle_request(conn.recv()))
+        except Exception as e:
+            print(f"处理请求时出错: {e}")
+
+    def serve_forever(self):
+        """加载模型并开始接收任务"""
+        self.load_models()
+
+        # 任务输出按线程写入任务日志，服务自身的输出保留在原输出流
+        self.stdout = sys.stdout = JobOutput(sys.stdout)
+        self.stderr = sys.stderr = JobOutput(sys.stderr)
+        self.stdout.mark_service_thread()
+        self.stderr.mark_service_thread()
+
+        if isinstance(self.address, str):
+            # 清理上次异常退出残留的socket文件
+            if os.path.exists(self.address):
+                os.remove(self.address)
+            if self.authkey is None:
+                self.authkey = create_authkey_file(self.address)
+
+        threading.Thread(target=self._job_loop, daemon=True).start()
+
+        with Listener(self.address, authkey=self.authkey) as listener:
+            if isinstance(self.address, str):
+                os.chmod(self.address, 0o600)
+            print(f"文档处理服务已启动: {self.address}")
+            while True:
+                try:
+                    conn = listener.accept()
+                except Exception as e:
+                    print(f"接收连接失败: {e}")
+                    continue
+                threading.Thread(target=self._handle_connection, args=(conn,), daemon=True).start()
+
+
+class WorkerJob:
+    """
+    已提交到常驻服务的任务
+
+    提供与subprocess.Popen相同的poll/wait/terminate接口，app.py可以不区分两种执行方式
+    """
+
+    def __init__(self, pdf_file_path, log_file, address=WORKER_ADDRESS):
+        self.address = address
+        self.returncode = None
+        # 运行中的任务已请求取消，将在当前步骤结束后停止
+        self.cancel_pending = False
+        response = send_request({
+            'cmd': 'submit',
+            'pdf_file_path': pdf_file_path,
+            'log_file': log_file,
+        }, self.address)
+        if not response.get('ok'):
+            raise RuntimeError(response.get('error', '提交任务失败'))
+        self.job_id = response['job_id']
+
+    def poll(self):
+        if self.returncode is None:
+            response = send_request({'cmd': 'status', 'job_id': self.job_id}, self.address)
+            if not response.get('ok'):
+                self.returncode = 1
+            elif response['state'] in (JOB_DONE, JOB_CANCELLED) and response['returncode'] is not None:
+                self.returncode = response['returncode']
+        return self.returncode
+
+    def wait(self, timeout=None, interval=1.0):
+        deadline = None if timeout is None else time.time() + timeout
+        while self.poll() is None:
+            if deadline is not None and time.time() >= deadline:
+                raise subprocess.TimeoutExpired(f"worker job {self.job_id}", timeout)
+            time.sleep(interval)
+        return self.returncode
+
+    def terminate(self):
+        """取消任务（排队中的任务立即取消，运行中的任务在当前步骤结束后停止）"""
+        try:
+            response = send_request({'cmd': 'cancel', 'job_id': self.job_id}, self.address)
+            self.cancel_pending = response.get('state') == JOB_CANCELLING
+        except OSError:
+            pass
+
+
+if __name__ == '__main__':
+    # exe.py与pipeline.py所在目录
+    sys.path.append(__dir__)
+    sys.path.append(os.path.join(__dir__, '..', 'layout_process'))
+    PipelineWorker().serve_forever()